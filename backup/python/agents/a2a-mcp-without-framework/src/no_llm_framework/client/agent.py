@@ -1,7 +1,10 @@
 import asyncio
+import contextlib
 import json
+import logging
 import re
-from collections.abc import Callable, Generator
+from collections.abc import AsyncIterator, Callable, Generator
+from functools import partial
 from pathlib import Path
 from typing import Literal
 from uuid import uuid4
@@ -23,8 +26,11 @@ from a2a.types import (
 from jinja2 import Template
 
 from no_llm_framework.client.constant import GOOGLE_API_KEY
+from no_llm_framework.client.fan_out import FanOutMode, fan_out
 
 
+logger = logging.getLogger(__name__)
+
 dir_path = Path(__file__).parent
 
 with Path(dir_path / 'decide.jinja').open('r') as f:
@@ -63,10 +69,18 @@ class Agent:
         token_stream_callback: Callable[[str], None] | None = None,
         agent_urls: list[str] | None = None,
         agent_prompt: str | None = None,
+        max_concurrent_agents: int = 4,
+        agent_timeout: float | None = 120.0,
+        fan_out_mode: FanOutMode | str = FanOutMode.ALL,
+        quorum: int | None = None,
     ):
         self.mode = mode
         self.token_stream_callback = token_stream_callback
         self.agent_urls = agent_urls
+        self.max_concurrent_agents = max_concurrent_agents
+        self.agent_timeout = agent_timeout
+        self.fan_out_mode = FanOutMode(fan_out_mode)
+        self.quorum = quorum
         self.agents_registry: dict[str, AgentCard] = {}
 
     async def get_agents(self) -> tuple[dict[str, AgentCard], str]:
@@ -150,18 +164,27 @@ class Agent:
         return []
 
     async def send_message_to_an_agent(
-        self, agent_card: AgentCard, message: str
+        self,
+        agent_card: AgentCard,
+        message: str,
+        httpx_client: httpx.AsyncClient | None = None,
     ):
         """Send a message to a specific agent and yield the streaming response.
 
         Args:
             agent_card (AgentCard): The agent to send the message to.
             message (str): The message to send.
+            httpx_client (httpx.AsyncClient | None): A pooled client to send
+                the message with. A new one is created if not given.
 
         Yields:
             str: The streaming response from the agent.
         """
-        async with httpx.AsyncClient() as httpx_client:
+        async with contextlib.AsyncExitStack() as stack:
+            if httpx_client is None:
+                httpx_client = await stack.enter_async_context(
+                    httpx.AsyncClient()
+                )
             client = A2AClient(httpx_client, agent_card=agent_card)
             message = MessageSendParams(
                 message=Message(
@@ -183,6 +206,109 @@ class Agent:
                     if message:
                         yield message.parts[0].root.text
 
+    async def send_message_to_agents(
+        self,
+        calls: list[tuple[AgentCard, str]],
+        httpx_client: httpx.AsyncClient,
+    ) -> AsyncIterator[tuple[int, str]]:
+        """Send messages to several agents concurrently.
+
+        At most `max_concurrent_agents` agents are called at once, each for
+        at most `agent_timeout` seconds. How the responses are yielded
+        depends on `fan_out_mode`:
+
+        - 'all': every agent's response is streamed, one agent after the
+          other in the order of `calls`, and the responses of the agents
+          after the current one are buffered meanwhile. A failed call
+          raises its error.
+        - 'first_success' and 'quorum': the agents are called with
+          `fan_out`. As soon as one agent ('first_success'), or `quorum`
+          agents ('quorum', a majority by default), have answered, the
+          calls still running are cancelled, and the responses of the
+          agents that answered are yielded whole, in the order of `calls`.
+          Failed calls are logged and skipped.
+
+        Args:
+            calls (list[tuple[AgentCard, str]]): The agents and the message
+                to send to each of them.
+            httpx_client (httpx.AsyncClient): The pooled client shared by
+                all calls.
+
+        Yields:
+            tuple[int, str]: The index of the call in `calls` and a chunk
+            of that agent's streaming response.
+        """
+        if self.fan_out_mode != FanOutMode.ALL:
+            async for index, chunk in self._send_message_until_enough(
+                calls, httpx_client
+            ):
+                yield index, chunk
+            return
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_agents)
+
+        async def pump(agent_card: AgentCard, message: str, queue):
+            try:
+                async with semaphore, asyncio.timeout(self.agent_timeout):
+                    async for chunk in self.send_message_to_an_agent(
+                        agent_card, message, httpx_client
+                    ):
+                        queue.put_nowait(chunk)
+            except Exception as e:
+                queue.put_nowait(e)
+            finally:
+                queue.put_nowait(None)
+
+        queues = [asyncio.Queue() for _ in calls]
+        tasks = [
+            asyncio.create_task(pump(agent_card, message, queue))
+            for (agent_card, message), queue in zip(calls, queues, strict=True)
+        ]
+        try:
+            for index, queue in enumerate(queues):
+                while (chunk := await queue.get()) is not None:
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    yield index, chunk
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _send_message_until_enough(
+        self,
+        calls: list[tuple[AgentCard, str]],
+        httpx_client: httpx.AsyncClient,
+    ) -> AsyncIterator[tuple[int, str]]:
+        """Yield whole responses once enough agents have answered."""
+
+        async def collect(agent_card: AgentCard, message: str) -> list[str]:
+            return [
+                chunk
+                async for chunk in self.send_message_to_an_agent(
+                    agent_card, message, httpx_client
+                )
+            ]
+
+        results = await fan_out(
+            {
+                str(index): partial(collect, agent_card, message)
+                for index, (agent_card, message) in enumerate(calls)
+            },
+            mode=self.fan_out_mode,
+            quorum=self.quorum,
+            concurrency=self.max_concurrent_agents,
+            timeout=self.agent_timeout,
+        )
+        for key, outcome in results.items():
+            index = int(key)
+            if outcome.error is not None:
+                logger.warning(
+                    f'Agent {calls[index][0].name} failed: {outcome.error!r}'
+                )
+            for chunk in outcome.result or []:
+                yield index, chunk
+
     async def stream(self, question: str):
         """Stream the process of answering a question, possibly involving multiple agents.
 
@@ -205,33 +331,55 @@ class Agent:
                 yield chunk
 
             agents = self.extract_agents(response)
-            if agents:
-                for agent in agents:
-                    agent_response = ''
-                    agent_card = agents_registry[agent['name']]
-                    yield f'<Agent name="{agent["name"]}">\n'
-                    async for chunk in self.send_message_to_an_agent(
-                        agent_card, agent['prompt']
-                    ):
-                        agent_response += chunk
-                        if self.token_stream_callback:
-                            self.token_stream_callback(chunk)
-                        yield chunk
-                    yield '</Agent>\n'
-                    match = re.search(
-                        r'<Answer>(.*?)</Answer>', agent_response, re.DOTALL
-                    )
-                    answer = match.group(1).strip() if match else agent_response
-                    agent_answers.append(
-                        {
-                            'name': agent['name'],
-                            'prompt': agent['prompt'],
-                            'answer': answer,
-                        }
-                    )
-            else:
+            if not agents:
                 return
 
+            # The agents are queried concurrently and their answers streamed
+            # one after the other, each between its own Agent tags. Unless
+            # every agent is waited for, only the agents that answered are
+            # shown and passed on.
+            agent_responses: dict[int, str] = (
+                dict.fromkeys(range(len(agents)), '')
+                if self.fan_out_mode == FanOutMode.ALL
+                else {}
+            )
+            current = None
+            async with httpx.AsyncClient() as httpx_client:
+                async for index, chunk in self.send_message_to_agents(
+                    [
+                        (agents_registry[agent['name']], agent['prompt'])
+                        for agent in agents
+                    ],
+                    httpx_client,
+                ):
+                    if index != current:
+                        if current is not None:
+                            yield '</Agent>\n'
+                        current = index
+                        yield f'<Agent name="{agents[index]["name"]}">\n'
+                    agent_responses[index] = (
+                        agent_responses.get(index, '') + chunk
+                    )
+                    if self.token_stream_callback:
+                        self.token_stream_callback(chunk)
+                    yield chunk
+            if current is not None:
+                yield '</Agent>\n'
+
+            for index, agent_response in sorted(agent_responses.items()):
+                agent = agents[index]
+                match = re.search(
+                    r'<Answer>(.*?)</Answer>', agent_response, re.DOTALL
+                )
+                answer = match.group(1).strip() if match else agent_response
+                agent_answers.append(
+                    {
+                        'name': agent['name'],
+                        'prompt': agent['prompt'],
+                        'answer': answer,
+                    }
+                )
+
 
 if __name__ == '__main__':
     import asyncio
@@ -2,23 +2,35 @@
 
 import threading
 
+from collections import OrderedDict
 from typing import Any
 
 
 class InMemoryCache:
-    """Simple thread-safe in-memory cache with no expiration."""
+    """Simple thread-safe in-memory cache with no expiration.
 
-    def __init__(self):
+    Holds at most `max_entries` entries, evicting the least recently used
+    ones beyond that.
+    """
+
+    def __init__(self, max_entries: int = 1000):
         self._lock = threading.Lock()
-        self._store: dict[str, Any] = {}
+        self._store: OrderedDict[str, Any] = OrderedDict()
+        self.max_entries = max_entries
 
     def get(self, key: str) -> Any | None:
         with self._lock:
-            return self._store.get(key)
+            if key not in self._store:
+                return None
+            self._store.move_to_end(key)
+            return self._store[key]
 
     def set(self, key: str, value: Any) -> None:
         with self._lock:
             self._store[key] = value
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_entries:
+                self._store.popitem(last=False)
 
     def delete(self, key: str) -> None:
         with self._lock:
@@ -1,11 +1,15 @@
-import asyncio
 import logging
+import os
 import traceback
 
 from collections.abc import AsyncIterable
 
 from agents.autogen.agent import CurrencyAgent
 from common.server import utils
+from common.server.sqlite_task_manager import (
+    TASK_DB_PATH_ENV,
+    SQLiteTaskManager,
+)
 from common.server.task_manager import InMemoryTaskManager
 from common.types import (
     Artifact,
@@ -20,7 +24,6 @@ from common.types import (
     SendTaskStreamingResponse,
     Task,
     TaskArtifactUpdateEvent,
-    TaskIdParams,
     TaskSendParams,
     TaskState,
     TaskStatus,
@@ -28,6 +31,9 @@ from common.types import (
     TextPart,
 )
 from common.utils.push_notification_auth import PushNotificationSenderAuth
+from common.utils.push_notification_dispatcher import (
+    PushNotificationDispatcher,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -38,10 +44,26 @@ class AgentTaskManager(InMemoryTaskManager):
         self,
         agent: CurrencyAgent,
         notification_sender_auth: PushNotificationSenderAuth,
+        notification_dispatcher: PushNotificationDispatcher | None = None,
+        **kwargs,
     ):
-        super().__init__()
+        super().__init__(**kwargs)
         self.agent = agent
         self.notification_sender_auth = notification_sender_auth
+        self._owns_notification_dispatcher = notification_dispatcher is None
+        self.notification_dispatcher = (
+            notification_dispatcher
+            or PushNotificationDispatcher(notification_sender_auth)
+        )
+
+    async def close(self):
+        """Sends the queued push notifications and stops the manager.
+
+        A dispatcher passed in is left running, for its owner to close.
+        """
+        if self._owns_notification_dispatcher:
+            await self.notification_dispatcher.close()
+        await super().close()
 
     async def _run_streaming_agent(self, request: SendTaskStreamingRequest):
         """Runs the agent in streaming mode and updates the task store with results."""
@@ -194,7 +216,9 @@ class AgentTaskManager(InMemoryTaskManager):
                 task_send_params.id, False
             )
 
-            asyncio.create_task(self._run_streaming_agent(request))
+            self.track_agent_task(
+                task_send_params.id, self._run_streaming_agent(request)
+            )
 
             return self.dequeue_events_for_sse(
                 request.id, task_send_params.id, sse_event_queue
@@ -249,40 +273,19 @@ class AgentTaskManager(InMemoryTaskManager):
         push_info = await self.get_push_notification_info(task.id)
 
         logger.info(f'Notifying for task {task.id} => {task.status.state}')
-        await self.notification_sender_auth.send_push_notification(
-            push_info.url, data=task.model_dump(exclude_none=True)
+        # Delivered in the background, so a slow webhook does not hold up
+        # the agent.
+        self.notification_dispatcher.enqueue(
+            push_info.url, task.model_dump(exclude_none=True), task_id=task.id
         )
 
-    async def on_resubscribe_to_task(
-        self, request
-    ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
-        """Handles reconnection to task streaming."""
-        task_id_params: TaskIdParams = request.params
-        try:
-            sse_event_queue = await self.setup_sse_consumer(
-                task_id_params.id, True
-            )
-            return self.dequeue_events_for_sse(
-                request.id, task_id_params.id, sse_event_queue
-            )
-        except Exception as e:
-            logger.error(f'Error while reconnecting to SSE stream: {e}')
-            return JSONRPCResponse(
-                id=request.id,
-                error=InternalError(
-                    message=f'An error occurred while reconnecting to stream: {e}'
-                ),
-            )
-
     async def set_push_notification_info(
         self, task_id: str, push_notification_config: PushNotificationConfig
     ):
         """Set and verify push notification configuration."""
         # Verify the ownership of notification URL by issuing a challenge request.
-        is_verified = (
-            await self.notification_sender_auth.verify_push_notification_url(
-                push_notification_config.url
-            )
+        is_verified = await self.notification_dispatcher.verify_url(
+            push_notification_config.url
         )
         if not is_verified:
             return False
@@ -291,3 +294,32 @@ class AgentTaskManager(InMemoryTaskManager):
             task_id, push_notification_config
         )
         return True
+
+
+class SQLiteAgentTaskManager(AgentTaskManager, SQLiteTaskManager):
+    """AgentTaskManager that keeps its tasks in a SQLite database.
+
+    Tasks, push notification configs and the events clients resubscribe to
+    survive a restart of the agent.
+    """
+
+
+def create_task_manager(
+    agent: CurrencyAgent,
+    notification_sender_auth: PushNotificationSenderAuth,
+    db_path: str | None = None,
+    **kwargs,
+) -> AgentTaskManager:
+    """Returns the task manager the agent should serve its tasks with.
+
+    That is a SQLiteAgentTaskManager storing tasks at `db_path`, or at the
+    path in the A2A_TASK_DB_PATH environment variable when `db_path` is not
+    given, and an AgentTaskManager keeping them in memory when neither is
+    set.
+    """
+    db_path = db_path or os.environ.get(TASK_DB_PATH_ENV)
+    if not db_path:
+        return AgentTaskManager(agent, notification_sender_auth, **kwargs)
+    return SQLiteAgentTaskManager(
+        agent, notification_sender_auth, db_path=db_path, **kwargs
+    )
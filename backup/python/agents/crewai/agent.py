@@ -14,7 +14,7 @@ from typing import Any
 from uuid import uuid4
 
 from PIL import Image
-from common.utils.in_memory_cache import InMemoryCache
+from common.utils.shared_cache import get_cache
 from crewai import LLM, Agent, Crew, Task
 from crewai.process import Process
 from crewai.tools import tool
@@ -56,7 +56,7 @@ def generate_image_tool(
         raise ValueError('Prompt cannot be empty')
 
     client = genai.Client()
-    cache = InMemoryCache()
+    cache = get_cache()
 
     text_input = (
         prompt,
@@ -127,8 +127,10 @@ def generate_image_tool(
                     # Session doesn't exist, create it with the new item
                     cache.set(session_id, {data.id: data})
                 else:
-                    # Session exists, update the existing dictionary directly
+                    # Session exists, store it again so the cache accounts
+                    # for the size of the new image.
                     session_data[data.id] = data
+                    cache.set(session_id, session_data)
 
                 return data.id
             except Exception as e:
@@ -227,7 +229,7 @@ class ImageGenerationAgent:
 
     def get_image_data(self, session_id: str, image_key: str) -> Imagedata:
         """Return Imagedata given a key. This is a helper method from the agent."""
-        cache = InMemoryCache()
+        cache = get_cache()
         session_data = cache.get(session_id)
         try:
             cache.get(session_id)
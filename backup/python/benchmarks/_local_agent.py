@@ -0,0 +1,114 @@
+"""A minimal echo agent, and other apps, served locally for the benchmarks."""
+
+import asyncio
+import contextlib
+import socket
+import threading
+import time
+
+import uvicorn
+
+from common.server import A2AServer, InMemoryTaskManager
+from common.types import (
+    AgentCapabilities,
+    AgentCard,
+    Artifact,
+    SendTaskResponse,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+)
+
+
+class EchoTaskManager(InMemoryTaskManager):
+    """Completes every task immediately, optionally after a delay."""
+
+    def __init__(self, delay: float = 0.0, stream_events: int = 10):
+        super().__init__()
+        self.delay = delay
+        self.stream_events = stream_events
+
+    async def on_send_task(self, request):
+        await self.upsert_task(request.params)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        task = await self.update_store(
+            request.params.id,
+            TaskStatus(state=TaskState.COMPLETED),
+            [Artifact(parts=request.params.message.parts)],
+        )
+        return SendTaskResponse(id=request.id, result=task)
+
+    async def on_send_task_subscribe(self, request):
+        task_id = request.params.id
+        await self.upsert_task(request.params)
+        queue = await self.setup_sse_consumer(task_id)
+
+        async def stream():
+            for i in range(self.stream_events):
+                final = i == self.stream_events - 1
+                status = TaskStatus(
+                    state=TaskState.COMPLETED if final else TaskState.WORKING
+                )
+                await self.update_store(task_id, status, None)
+                await self.enqueue_events_for_sse(
+                    task_id,
+                    TaskStatusUpdateEvent(
+                        id=task_id, status=status, final=final
+                    ),
+                )
+                await asyncio.sleep(0)
+
+        self.track_agent_task(task_id, stream())
+        return self.dequeue_events_for_sse(request.id, task_id, queue)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def _serve(app, port: int):
+    uvicorn_server = uvicorn.Server(
+        uvicorn.Config(app, host='127.0.0.1', port=port, log_level='error')
+    )
+    thread = threading.Thread(target=uvicorn_server.run, daemon=True)
+    thread.start()
+    while not uvicorn_server.started:
+        time.sleep(0.01)
+    try:
+        yield
+    finally:
+        uvicorn_server.should_exit = True
+        thread.join()
+
+
+@contextlib.contextmanager
+def run_local_app(app):
+    """Serves an ASGI app on a free local port and yields its base URL."""
+    port = _free_port()
+    with _serve(app, port):
+        yield f'http://127.0.0.1:{port}/'
+
+
+@contextlib.contextmanager
+def run_local_agent(task_manager: InMemoryTaskManager | None = None):
+    """Serves an A2AServer on a free local port and yields its URL."""
+    port = _free_port()
+    url = f'http://127.0.0.1:{port}/'
+    server = A2AServer(
+        host='127.0.0.1',
+        port=port,
+        agent_card=AgentCard(
+            name='Echo Agent',
+            url=url,
+            version='1.0.0',
+            capabilities=AgentCapabilities(streaming=True),
+            skills=[],
+        ),
+        task_manager=task_manager or EchoTaskManager(),
+    )
+    with _serve(server.app, port):
+        yield url
@@ -0,0 +1,62 @@
+"""Per-call latency of A2AClient against a local agent.
+
+Compares a fresh `httpx.AsyncClient` per call, which is what A2AClient used
+to do, with the pooled keep-alive client it now owns.
+
+Run from the directory containing `common`:
+
+    python -m benchmarks.client_pooling
+"""
+
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from benchmarks._local_agent import run_local_agent
+from common.client import A2AClient
+from common.types import GetTaskRequest
+
+
+CALLS = 500
+
+
+async def per_call_client(url: str) -> list[float]:
+    samples = []
+    for _ in range(CALLS):
+        request = GetTaskRequest(params={'id': 'missing'})
+        start = time.perf_counter()
+        async with httpx.AsyncClient() as client:
+            response = await client.post(url, json=request.model_dump())
+            response.json()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def pooled_client(url: str) -> list[float]:
+    samples = []
+    async with A2AClient(url=url) as client:
+        for _ in range(CALLS):
+            start = time.perf_counter()
+            await client.get_task({'id': 'missing'})
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(name: str, samples: list[float]):
+    quantiles = statistics.quantiles(samples, n=100)
+    print(
+        f'{name:<18} p50 {quantiles[49] * 1e3:6.2f} ms   '
+        f'p99 {quantiles[98] * 1e3:6.2f} ms'
+    )
+
+
+def main():
+    with run_local_agent() as url:
+        _report('client per call', asyncio.run(per_call_client(url)))
+        _report('pooled client', asyncio.run(pooled_client(url)))
+
+
+if __name__ == '__main__':
+    main()
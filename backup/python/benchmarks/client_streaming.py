@@ -0,0 +1,76 @@
+"""Concurrent streaming throughput of A2AClient in a single event loop.
+
+Opens many `send_task_streaming` calls at once against a local agent and
+reports the event throughput, together with the worst delay seen by a
+ticker coroutine that shares the loop. A blocking stream reader shows up as
+a large ticker delay.
+
+Run from the directory containing `common`:
+
+    python -m benchmarks.client_streaming
+"""
+
+import asyncio
+import time
+import uuid
+
+from benchmarks._local_agent import EchoTaskManager, run_local_agent
+from common.client import A2AClient
+
+
+STREAM_COUNTS = [1, 10, 50, 100]
+EVENTS_PER_STREAM = 20
+TICK = 0.005
+
+
+async def _stream(client: A2AClient) -> int:
+    events = 0
+    async for _ in client.send_task_streaming(
+        {
+            'id': uuid.uuid4().hex,
+            'message': {
+                'role': 'user',
+                'parts': [{'type': 'text', 'text': 'hi'}],
+            },
+        }
+    ):
+        events += 1
+    return events
+
+
+async def run(url: str, streams: int) -> tuple[float, float]:
+    max_delay = 0.0
+    stop = asyncio.Event()
+
+    async def ticker():
+        nonlocal max_delay
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            max_delay = max(max_delay, time.perf_counter() - start - TICK)
+
+    async with A2AClient(url=url) as client:
+        # Open the pool before measuring, creating it loads the TLS context.
+        await client.get_task({'id': 'warmup'})
+        ticker_task = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        counts = await asyncio.gather(*(_stream(client) for _ in range(streams)))
+        elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker_task
+    return sum(counts) / elapsed, max_delay
+
+
+def main():
+    task_manager = EchoTaskManager(stream_events=EVENTS_PER_STREAM)
+    with run_local_agent(task_manager) as url:
+        print(f'{"streams":>8} {"events/s":>10} {"max loop delay":>16}')
+        for streams in STREAM_COUNTS:
+            throughput, max_delay = asyncio.run(run(url, streams))
+            print(
+                f'{streams:>8} {throughput:>10.0f} {max_delay * 1e3:>13.1f} ms'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Request parse-and-dispatch micro-benchmark for A2AServer.
+
+Reports p50/p99 latency per JSON-RPC method for the method-keyed dispatch
+in `A2AServer._resolve`, next to the previous approach of validating
+against the whole `A2ARequest` union and walking an isinstance chain.
+
+Run from the directory containing `common`:
+
+    python -m benchmarks.dispatch
+"""
+
+import json
+import statistics
+import time
+
+from common.server import A2AServer
+from common.types import (
+    A2ARequest,
+    CancelTaskRequest,
+    GetTaskPushNotificationRequest,
+    GetTaskRequest,
+    SendTaskRequest,
+    SendTaskStreamingRequest,
+    SetTaskPushNotificationRequest,
+    TaskResubscriptionRequest,
+)
+from common.utils import json_utils
+
+
+ITERATIONS = 5000
+
+_MESSAGE = {'role': 'user', 'parts': [{'type': 'text', 'text': 'hello'}]}
+_PAYLOADS = {
+    'tasks/send': {'id': 't1', 'message': _MESSAGE},
+    'tasks/sendSubscribe': {'id': 't1', 'message': _MESSAGE},
+    'tasks/get': {'id': 't1', 'historyLength': 5},
+    'tasks/cancel': {'id': 't1'},
+    'tasks/pushNotification/set': {
+        'id': 't1',
+        'pushNotificationConfig': {'url': 'http://localhost/notify'},
+    },
+    'tasks/pushNotification/get': {'id': 't1'},
+    'tasks/resubscribe': {'id': 't1'},
+}
+_UNION_ORDER = [
+    GetTaskRequest,
+    SendTaskRequest,
+    SendTaskStreamingRequest,
+    CancelTaskRequest,
+    SetTaskPushNotificationRequest,
+    GetTaskPushNotificationRequest,
+    TaskResubscriptionRequest,
+]
+
+
+def _keyed_dispatch(server: A2AServer):
+    def dispatch(body: bytes):
+        json_rpc_request, entry = server._resolve(json_utils.loads(body))
+        return json_rpc_request, entry.handler
+
+    return dispatch
+
+
+def _union_dispatch(body: bytes):
+    request = A2ARequest.validate_python(json.loads(body))
+    for request_type in _UNION_ORDER:
+        if isinstance(request, request_type):
+            return request
+    raise ValueError('unexpected request type')
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float]:
+    quantiles = statistics.quantiles(samples, n=100)
+    return quantiles[49] * 1e6, quantiles[98] * 1e6
+
+
+def _measure(fn, body: bytes) -> tuple[float, float]:
+    samples = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        fn(body)
+        samples.append(time.perf_counter() - start)
+    return _percentiles(samples)
+
+
+def main():
+    keyed_dispatch = _keyed_dispatch(A2AServer())
+    print(
+        f'{"method":<28} {"keyed p50":>10} {"keyed p99":>10} '
+        f'{"union p50":>10} {"union p99":>10}  (us)'
+    )
+    for method, params in _PAYLOADS.items():
+        body = json.dumps(
+            {'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params}
+        ).encode()
+        keyed = _measure(keyed_dispatch, body)
+        union = _measure(_union_dispatch, body)
+        print(
+            f'{method:<28} {keyed[0]:>10.1f} {keyed[1]:>10.1f} '
+            f'{union[0]:>10.1f} {union[1]:>10.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
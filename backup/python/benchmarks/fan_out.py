@@ -0,0 +1,77 @@
+"""Wall-clock time to send one task to several local agents.
+
+Compares sending to each agent in turn with `send_task_to_agents` in its
+gather-all and first-success modes. The agents answer after different
+delays, like real agents of uneven speed.
+
+Run from the directory containing `common`:
+
+    python -m benchmarks.fan_out
+"""
+
+import asyncio
+import contextlib
+import time
+import uuid
+
+from benchmarks._local_agent import EchoTaskManager, run_local_agent
+from common.client import A2AClient, FanOutMode, send_task_to_agents
+
+
+DELAYS = [0.05, 0.08, 0.1, 0.12, 0.15, 0.2, 0.25, 0.3]
+ROUNDS = 5
+
+
+def _payload() -> dict:
+    return {
+        'id': uuid.uuid4().hex,
+        'message': {'role': 'user', 'parts': [{'type': 'text', 'text': 'hi'}]},
+    }
+
+
+async def sequential(clients: dict[str, A2AClient]) -> float:
+    start = time.perf_counter()
+    for client in clients.values():
+        await client.send_task(_payload())
+    return time.perf_counter() - start
+
+
+async def concurrent(clients: dict[str, A2AClient], mode: FanOutMode) -> float:
+    start = time.perf_counter()
+    await send_task_to_agents(clients, _payload(), mode=mode)
+    return time.perf_counter() - start
+
+
+async def run(urls: list[str]):
+    clients = {url: A2AClient(url=url) for url in urls}
+    try:
+        # Open the pooled connections before timing anything.
+        await asyncio.gather(
+            *(client.get_task({'id': 'missing'}) for client in clients.values())
+        )
+        for name, send in [
+            ('sequential', lambda: sequential(clients)),
+            ('fan-out, all', lambda: concurrent(clients, FanOutMode.ALL)),
+            (
+                'fan-out, first',
+                lambda: concurrent(clients, FanOutMode.FIRST_SUCCESS),
+            ),
+        ]:
+            samples = [await send() for _ in range(ROUNDS)]
+            print(f'{name:<16} {min(samples) * 1e3:7.1f} ms')
+    finally:
+        await asyncio.gather(*(client.aclose() for client in clients.values()))
+
+
+def main():
+    print(f'{len(DELAYS)} agents, delays {DELAYS[0]}s to {DELAYS[-1]}s')
+    with contextlib.ExitStack() as stack:
+        urls = [
+            stack.enter_context(run_local_agent(EchoTaskManager(delay=delay)))
+            for delay in DELAYS
+        ]
+        asyncio.run(run(urls))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Time an agent spends notifying a slow webhook about task updates.
+
+A streaming agent sends a push notification for every status update of its
+tasks. Compares awaiting `send_push_notification` for each update with
+handing it to a `PushNotificationDispatcher`, and reports how long the
+dispatcher took to deliver everything and how many superseded updates it
+coalesced.
+
+Run from the directory containing `common`:
+
+    python -m benchmarks.push_dispatch
+"""
+
+import asyncio
+import time
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+
+from benchmarks._local_agent import run_local_app
+from common.types import Task, TaskState, TaskStatus
+from common.utils.push_notification_auth import PushNotificationSenderAuth
+from common.utils.push_notification_dispatcher import (
+    PushNotificationDispatcher,
+)
+
+
+WEBHOOK_DELAY = 0.02
+TASKS = 20
+UPDATES_PER_TASK = 10
+
+
+def _webhook() -> Starlette:
+    async def notify(request: Request):
+        await request.body()
+        await asyncio.sleep(WEBHOOK_DELAY)
+        return Response(status_code=200)
+
+    app = Starlette()
+    app.add_route('/notify', notify, methods=['POST'])
+    return app
+
+
+def _updates() -> list[dict]:
+    updates = []
+    for update in range(UPDATES_PER_TASK):
+        state = (
+            TaskState.COMPLETED
+            if update == UPDATES_PER_TASK - 1
+            else TaskState.WORKING
+        )
+        for task in range(TASKS):
+            updates.append(
+                Task(id=f'task-{task}', status=TaskStatus(state=state))
+                .model_dump(exclude_none=True)
+            )
+    return updates
+
+
+async def inline(sender: PushNotificationSenderAuth, url: str) -> float:
+    start = time.perf_counter()
+    for data in _updates():
+        await sender.send_push_notification(url, data)
+    return time.perf_counter() - start
+
+
+async def dispatched(sender: PushNotificationSenderAuth, url: str):
+    dispatcher = PushNotificationDispatcher(sender)
+    start = time.perf_counter()
+    for data in _updates():
+        dispatcher.enqueue(url, data)
+        # The agent yields to the loop between updates.
+        await asyncio.sleep(0)
+    enqueued = time.perf_counter() - start
+    await dispatcher.join()
+    delivered = time.perf_counter() - start
+    stats = dispatcher.stats()
+    await dispatcher.close()
+    return enqueued, delivered, next(iter(stats.values()))
+
+
+async def run(url: str):
+    sender = PushNotificationSenderAuth()
+    sender.generate_jwk()
+    print(f'{"inline":<12} agent blocked {await inline(sender, url):7.3f} s')
+    enqueued, delivered, stats = await dispatched(sender, url)
+    print(
+        f'{"dispatcher":<12} agent blocked {enqueued:7.3f} s, '
+        f'all delivered after {delivered:.3f} s'
+    )
+    print(
+        f'{"":<12} {stats.delivered} delivered, {stats.coalesced} coalesced, '
+        f'mean latency {stats.latency_mean * 1e3:.1f} ms'
+    )
+
+
+def main():
+    print(
+        f'{TASKS} tasks x {UPDATES_PER_TASK} updates, '
+        f'webhook takes {WEBHOOK_DELAY * 1e3:.0f} ms'
+    )
+    with run_local_app(_webhook()) as base_url:
+        asyncio.run(run(f'{base_url}notify'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Push-notification signing throughput per algorithm.
+
+Times `sign_request_body`, which serializes a task once and signs its
+digest, for each supported algorithm. The "before" row is the previous
+RS256 path, which serialized the task once for the digest and once more
+for the HTTP body.
+
+Run from the directory containing `common`:
+
+    python -m benchmarks.push_signing
+"""
+
+import json
+import time
+
+from common.types import Artifact, Task, TaskState, TaskStatus, TextPart
+from common.utils.push_notification_auth import (
+    PushNotificationSenderAuth,
+    SigningAlgorithm,
+)
+
+
+DURATION = 2.0
+
+
+def _task() -> dict:
+    return Task(
+        id='task-1',
+        sessionId='session-1',
+        status=TaskStatus(state=TaskState.COMPLETED),
+        artifacts=[
+            Artifact(parts=[TextPart(text='lorem ipsum ' * 200)])
+            for _ in range(5)
+        ],
+    ).model_dump(exclude_none=True)
+
+
+def _throughput(sign) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        sign()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    data = _task()
+    print(f'payload {len(json.dumps(data))} bytes')
+
+    sender = PushNotificationSenderAuth(SigningAlgorithm.RS256)
+    sender.generate_jwk()
+
+    def before():
+        sender._generate_jwt(data)
+        json.dumps(data).encode()
+
+    print(f'{"RS256 (before)":<16} {_throughput(before):8.0f} signs/s')
+    for algorithm in SigningAlgorithm:
+        sender = PushNotificationSenderAuth(algorithm)
+        sender.generate_jwk()
+        rate = _throughput(lambda: sender.sign_request_body(data))
+        print(f'{algorithm.value:<16} {rate:8.0f} signs/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""SSE fan-out serialization benchmark.
+
+Enqueues status events for a task watched by a growing number of subscribers
+and splits the time spent per event into:
+
+- serialization: turning the event into JSON, which InMemoryTaskManager
+  does once per event however many subscribers there are, so this column
+  stays flat;
+- delivery: queueing the event and wrapping it in each subscriber's SSE
+  frame, reported per subscriber, which is the part that grows with the
+  number of subscribers;
+- the previous approach, running `model_dump_json` on a fresh response in
+  every subscriber, where serialization itself grows with the subscribers.
+
+Run from the directory containing `common`:
+
+    python -m benchmarks.sse_fanout
+"""
+
+import asyncio
+import contextlib
+import time
+
+from common.server.frames import LoggedEvent
+from common.server.task_manager import InMemoryTaskManager
+from common.types import (
+    Message,
+    SendTaskStreamingResponse,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+
+EVENTS = 500
+SUBSCRIBER_COUNTS = [1, 10, 50, 200]
+TASK_ID = 'task-0'
+
+
+class BenchmarkTaskManager(InMemoryTaskManager):
+    async def on_send_task(self, request):
+        raise NotImplementedError
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+def _events() -> list[TaskStatusUpdateEvent]:
+    message = Message(role='agent', parts=[TextPart(text='x' * 256)])
+    events = [
+        TaskStatusUpdateEvent(
+            id=TASK_ID,
+            status=TaskStatus(state=TaskState.WORKING, message=message),
+        )
+        for _ in range(EVENTS - 1)
+    ]
+    events.append(
+        TaskStatusUpdateEvent(
+            id=TASK_ID,
+            status=TaskStatus(state=TaskState.COMPLETED),
+            final=True,
+        )
+    )
+    return events
+
+
+@contextlib.contextmanager
+def _timed_serialization():
+    """Accumulates the time spent serializing events into the yielded dict."""
+    totals = {'seconds': 0.0, 'calls': 0}
+    from_event = LoggedEvent.from_event.__func__
+
+    def timed(cls, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return from_event(cls, *args, **kwargs)
+        finally:
+            totals['seconds'] += time.perf_counter() - start
+            totals['calls'] += 1
+
+    LoggedEvent.from_event = classmethod(timed)
+    try:
+        yield totals
+    finally:
+        LoggedEvent.from_event = classmethod(from_event)
+
+
+async def serialize_once(subscribers: int) -> tuple[float, float, float]:
+    """Measures fan-out through InMemoryTaskManager.
+
+    Returns the serialization seconds and calls per event, and the delivery
+    seconds per event and subscriber.
+    """
+    manager = BenchmarkTaskManager(sse_queue_size=EVENTS)
+    await manager.upsert_task(
+        TaskSendParams(
+            id=TASK_ID, message=Message(role='user', parts=[TextPart(text='')])
+        )
+    )
+    queues = [
+        await manager.setup_sse_consumer(TASK_ID) for _ in range(subscribers)
+    ]
+
+    async def consume(request_id, queue):
+        async for item in manager.dequeue_events_for_sse(
+            request_id, TASK_ID, queue
+        ):
+            _ = item.frame
+
+    events = _events()
+    with _timed_serialization() as serialization:
+        start = time.perf_counter()
+        consumers = [
+            asyncio.create_task(consume(i, queue))
+            for i, queue in enumerate(queues)
+        ]
+        for event in events:
+            await manager.enqueue_events_for_sse(TASK_ID, event)
+        await asyncio.gather(*consumers)
+        total = time.perf_counter() - start
+    delivery = (total - serialization['seconds']) / (EVENTS * subscribers)
+    return (
+        serialization['seconds'] / EVENTS,
+        serialization['calls'] / EVENTS,
+        delivery,
+    )
+
+
+async def serialize_per_subscriber(subscribers: int) -> float:
+    events = _events()
+    start = time.perf_counter()
+    for event in events:
+        for request_id in range(subscribers):
+            SendTaskStreamingResponse(id=request_id, result=event).model_dump_json(
+                exclude_none=True
+            )
+    return (time.perf_counter() - start) / EVENTS
+
+
+def main():
+    print(
+        f'{"subscribers":>12} {"serialize us/event":>19} {"calls/event":>12} '
+        f'{"deliver us/event/sub":>21} {"per-sub serialize us/event":>27}'
+    )
+    serialize_costs = []
+    for subscribers in SUBSCRIBER_COUNTS:
+        serialize, calls, delivery = asyncio.run(serialize_once(subscribers))
+        per_subscriber = asyncio.run(serialize_per_subscriber(subscribers))
+        # Each event is serialized once, whatever the number of subscribers.
+        assert calls == 1, calls
+        serialize_costs.append(serialize)
+        print(
+            f'{subscribers:>12} {serialize * 1e6:>19.1f} {calls:>12.1f} '
+            f'{delivery * 1e6:>21.1f} {per_subscriber * 1e6:>27.1f}'
+        )
+    print(
+        f'serialization per event ranges {min(serialize_costs) * 1e6:.1f}-'
+        f'{max(serialize_costs) * 1e6:.1f} us from {SUBSCRIBER_COUNTS[0]} to '
+        f'{SUBSCRIBER_COUNTS[-1]} subscribers'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""Contention benchmark for InMemoryTaskManager.
+
+Drives many concurrent streaming tasks through `update_store` and
+`enqueue_events_for_sse`, each with one SSE subscriber, while one extra
+subscriber of the first task reads slowly, and reports the aggregate update
+throughput for an increasing number of concurrent tasks. Each figure is the
+best of a few rounds.
+
+The baseline columns reproduce the original manager: a single lock for all
+tasks, with the fan-out awaiting each subscriber's `put()` while holding
+it. With the original unbounded queues `put()` never waits, so nothing
+stalls, and the baseline is even faster since it neither logs nor encodes
+events, but the slow subscriber's backlog grows with every update
+("backlog" column). Bounding those queues, at the size the new manager
+uses, makes every task wait behind the slow subscriber whenever its queue
+is full ("bounded" column). The new manager keeps queues bounded and fans
+out without waiting, outside the lock, so the slow subscriber neither
+stalls the other tasks nor holds more than `SSE_QUEUE_SIZE` events.
+
+Lock striping itself does not show up here: no critical section awaits,
+so on one event loop a single lock is not where the time goes.
+
+Run from the directory containing `common`:
+
+    python -m benchmarks.task_manager_contention
+"""
+
+import asyncio
+import time
+
+from common.server.task_manager import InMemoryTaskManager
+from common.types import (
+    Message,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+
+UPDATES_PER_TASK = 200
+CONCURRENCY_LEVELS = [1, 10, 100, 500]
+ROUNDS = 3
+SSE_QUEUE_SIZE = 32
+# Seconds the slow subscriber spends on each event.
+SLOW_READ = 0.005
+
+
+class BenchmarkTaskManager(InMemoryTaskManager):
+    async def on_send_task(self, request):
+        raise NotImplementedError
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+class BaselineTaskManager(BenchmarkTaskManager):
+    """The original locking and fan-out, on top of the current manager.
+
+    One lock guards every task, and events are put into plain asyncio
+    queues while it is held.
+    """
+
+    def __init__(self, queue_size: int = 0):
+        super().__init__(lock_stripes=1)
+        self.queue_size = queue_size
+
+    async def setup_sse_consumer(
+        self, task_id: str, is_resubscribe: bool = False
+    ):
+        async with self.subscriber_lock(task_id):
+            queue = asyncio.Queue(maxsize=self.queue_size)
+            self.task_sse_subscribers.setdefault(task_id, []).append(queue)
+            return queue
+
+    async def enqueue_events_for_sse(self, task_id, task_update_event):
+        async with self.subscriber_lock(task_id):
+            for subscriber in self.task_sse_subscribers.get(task_id, []):
+                await subscriber.put(task_update_event)
+
+    async def dequeue_events_for_sse(self, request_id, task_id, queue):
+        try:
+            while True:
+                event = await queue.get()
+                yield event
+                if event.final:
+                    break
+        finally:
+            async with self.subscriber_lock(task_id):
+                self.task_sse_subscribers[task_id].remove(queue)
+
+
+async def _consume(
+    manager: InMemoryTaskManager, task_id: str, queue, delay: float = 0
+):
+    async for _ in manager.dequeue_events_for_sse(task_id, task_id, queue):
+        if delay:
+            await asyncio.sleep(delay)
+
+
+async def _drive_task(manager: InMemoryTaskManager, task_id: str, queue):
+    consumer = asyncio.create_task(_consume(manager, task_id, queue))
+    for i in range(UPDATES_PER_TASK):
+        final = i == UPDATES_PER_TASK - 1
+        status = TaskStatus(
+            state=TaskState.COMPLETED if final else TaskState.WORKING
+        )
+        await manager.update_store(task_id, status, None)
+        await manager.enqueue_events_for_sse(
+            task_id, TaskStatusUpdateEvent(id=task_id, status=status, final=final)
+        )
+    await consumer
+
+
+async def run(manager: InMemoryTaskManager, concurrency: int):
+    """Returns updates per second, and the slow subscriber's peak backlog."""
+    message = Message(role='user', parts=[TextPart(text='hello')])
+    task_ids = [f'task-{i}' for i in range(concurrency)]
+    queues = []
+    for task_id in task_ids:
+        await manager.upsert_task(TaskSendParams(id=task_id, message=message))
+        queues.append(await manager.setup_sse_consumer(task_id))
+    slow_queue = await manager.setup_sse_consumer(task_ids[0])
+    slow = asyncio.create_task(
+        _consume(manager, task_ids[0], slow_queue, SLOW_READ)
+    )
+    backlog = 0
+
+    async def watch():
+        nonlocal backlog
+        while True:
+            backlog = max(backlog, slow_queue.qsize())
+            await asyncio.sleep(0.001)
+
+    watcher = asyncio.create_task(watch())
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _drive_task(manager, task_id, queue)
+            for task_id, queue in zip(task_ids, queues, strict=True)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    # Only the updates count, not how long the slow reader takes to finish.
+    for task in (slow, watcher):
+        task.cancel()
+    await asyncio.gather(slow, watcher, return_exceptions=True)
+    return concurrency * UPDATES_PER_TASK / elapsed, backlog
+
+
+def best_of(make_manager, concurrency: int) -> tuple[float, int]:
+    results = [
+        asyncio.run(run(make_manager(), concurrency)) for _ in range(ROUNDS)
+    ]
+    return max(r[0] for r in results), max(r[1] for r in results)
+
+
+def main():
+    print(
+        f'{"tasks":>6} {"baseline":>10} {"backlog":>8} '
+        f'{"bounded":>10} {"new":>10} {"backlog":>8}  updates/s'
+    )
+    for concurrency in CONCURRENCY_LEVELS:
+        baseline, baseline_backlog = best_of(BaselineTaskManager, concurrency)
+        bounded, _ = best_of(
+            lambda: BaselineTaskManager(SSE_QUEUE_SIZE), concurrency
+        )
+        new, new_backlog = best_of(
+            lambda: BenchmarkTaskManager(sse_queue_size=SSE_QUEUE_SIZE),
+            concurrency,
+        )
+        print(
+            f'{concurrency:>6} {baseline:>10.0f} {baseline_backlog:>8} '
+            f'{bounded:>10.0f} {new:>10.0f} {new_backlog:>8}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Task store throughput benchmark.
+
+Compares `update_store` throughput of the in-memory task manager with the
+SQLite-backed one, including the time to flush every pending write.
+
+Run from the directory containing `common`:
+
+    python -m benchmarks.task_store_throughput
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+from common.server.sqlite_task_manager import SQLiteTaskManager
+from common.server.task_manager import InMemoryTaskManager
+from common.types import (
+    Message,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+
+
+TASKS = 200
+UPDATES_PER_TASK = 50
+
+
+class BenchmarkInMemoryTaskManager(InMemoryTaskManager):
+    async def on_send_task(self, request):
+        raise NotImplementedError
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+class BenchmarkSQLiteTaskManager(SQLiteTaskManager):
+    async def on_send_task(self, request):
+        raise NotImplementedError
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+async def _drive_task(manager: InMemoryTaskManager, task_id: str):
+    message = Message(role='agent', parts=[TextPart(text='working on it')])
+    await manager.upsert_task(TaskSendParams(id=task_id, message=message))
+    for _ in range(UPDATES_PER_TASK):
+        await manager.update_store(
+            task_id, TaskStatus(state=TaskState.WORKING, message=message), None
+        )
+        await asyncio.sleep(0)
+
+
+async def run(manager: InMemoryTaskManager) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(_drive_task(manager, f'task-{i}') for i in range(TASKS))
+    )
+    if isinstance(manager, SQLiteTaskManager):
+        await manager.close()
+    elapsed = time.perf_counter() - start
+    return TASKS * UPDATES_PER_TASK / elapsed
+
+
+def main():
+    in_memory = asyncio.run(run(BenchmarkInMemoryTaskManager()))
+    print(f'in-memory: {in_memory:>10.0f} updates/s')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = BenchmarkSQLiteTaskManager(
+            db_path=os.path.join(tmp, 'tasks.db')
+        )
+        sqlite = asyncio.run(run(manager))
+        stats = manager.write_stats
+        print(
+            f'sqlite:    {sqlite:>10.0f} updates/s '
+            f'({stats["batches"]} batches, {stats["rows"]} rows written)'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,16 @@
 from .card_resolver import A2ACardResolver
 from .client import A2AClient
+from .fan_out import FanOutMode, FanOutResult, fan_out, send_task_to_agents
+from .retry import HedgePolicy, RetryPolicy
 
 
-__all__ = ['A2ACardResolver', 'A2AClient']
+__all__ = [
+    'A2ACardResolver',
+    'A2AClient',
+    'FanOutMode',
+    'FanOutResult',
+    'HedgePolicy',
+    'RetryPolicy',
+    'fan_out',
+    'send_task_to_agents',
+]
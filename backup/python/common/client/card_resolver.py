@@ -1,23 +1,50 @@
-import json
-
 import httpx
 
+from pydantic import ValidationError
+
 from common.types import (
     A2AClientJSONError,
     AgentCard,
 )
+from common.utils.card_cache import AgentCardCache
+
+
+def _parse_agent_card(body: bytes) -> AgentCard:
+    try:
+        return AgentCard.model_validate_json(body)
+    except ValidationError as e:
+        raise A2AClientJSONError(str(e)) from e
+
+
+# Shared by every resolver in the process unless one is given its own cache.
+default_card_cache = AgentCardCache(_parse_agent_card)
 
 
 class A2ACardResolver:
-    def __init__(self, base_url, agent_card_path='/.well-known/agent.json'):
+    def __init__(
+        self,
+        base_url,
+        agent_card_path='/.well-known/agent.json',
+        httpx_client: httpx.AsyncClient | None = None,
+        cache: AgentCardCache | None = None,
+    ):
         self.base_url = base_url.rstrip('/')
         self.agent_card_path = agent_card_path.lstrip('/')
+        self.httpx_client = httpx_client
+        self.cache = cache or default_card_cache
+
+    @property
+    def card_url(self) -> str:
+        return self.base_url + '/' + self.agent_card_path
 
     def get_agent_card(self) -> AgentCard:
-        with httpx.Client() as client:
-            response = client.get(self.base_url + '/' + self.agent_card_path)
-            response.raise_for_status()
-            try:
-                return AgentCard(**response.json())
-            except json.JSONDecodeError as e:
-                raise A2AClientJSONError(str(e)) from e
+        """Returns the agent card, from the cache when it is still valid.
+
+        Blocks while the card is fetched, use `get_agent_card_async` on an
+        event loop.
+        """
+        return self.cache.get_sync(self.card_url)
+
+    async def get_agent_card_async(self) -> AgentCard:
+        """Returns the agent card, from the cache when it is still valid."""
+        return await self.cache.get(self.card_url, self.httpx_client)
@@ -1,13 +1,23 @@
+import asyncio
 import json
+import logging
+import time
 
-from collections.abc import AsyncIterable
+from collections.abc import AsyncIterable, Awaitable, Callable
 from typing import Any
 
 import httpx
 
 from httpx._types import TimeoutTypes
-from httpx_sse import connect_sse
+from httpx_sse import aconnect_sse
 
+from common.client.retry import (
+    ClientMetrics,
+    HedgePolicy,
+    LatencyTracker,
+    RetryBudget,
+    RetryPolicy,
+)
 from common.types import (
     A2AClientHTTPError,
     A2AClientJSONError,
@@ -28,12 +38,34 @@ from common.types import (
 )
 
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0
+)
+
+
 class A2AClient:
+    """JSON-RPC client for an A2A agent.
+
+    Requests go through one long-lived `httpx.AsyncClient`, so connections to
+    the agent's host are kept alive and reused across calls. Pass
+    `httpx_client` to share a pool between several clients, otherwise the
+    client owns its pool and should be closed with `aclose()` or used as an
+    async context manager.
+    """
+
     def __init__(
         self,
         agent_card: AgentCard = None,
         url: str = None,
         timeout: TimeoutTypes = 60.0,
+        httpx_client: httpx.AsyncClient | None = None,
+        limits: httpx.Limits = DEFAULT_POOL_LIMITS,
+        http2: bool = False,
+        stream_idle_timeout: float | None = None,
+        retry_policy: RetryPolicy | None = None,
+        hedge_policy: HedgePolicy | None = None,
     ):
         if agent_card:
             self.url = agent_card.url
@@ -42,6 +74,45 @@ class A2AClient:
         else:
             raise ValueError('Must provide either agent_card or url')
         self.timeout = timeout
+        self.limits = limits
+        self.http2 = http2
+        self.stream_idle_timeout = stream_idle_timeout
+        self.retry_policy = retry_policy
+        self.hedge_policy = hedge_policy
+        self.metrics = ClientMetrics()
+        self._retry_budget = RetryBudget(
+            retry_policy.budget_ratio if retry_policy else 0,
+            retry_policy.budget_burst if retry_policy else 0,
+        )
+        self._latencies = LatencyTracker(
+            window=hedge_policy.window if hedge_policy else 200
+        )
+        self._httpx_client = httpx_client
+        self._owns_httpx_client = httpx_client is None
+
+    @property
+    def httpx_client(self) -> httpx.AsyncClient:
+        """The pooled client, created on first use when not provided."""
+        if self._httpx_client is None or (
+            self._owns_httpx_client and self._httpx_client.is_closed
+        ):
+            # http2=True requires the optional `h2` package.
+            self._httpx_client = httpx.AsyncClient(
+                limits=self.limits, http2=self.http2, timeout=self.timeout
+            )
+        return self._httpx_client
+
+    async def aclose(self):
+        """Closes the connection pool if this client created it."""
+        if self._owns_httpx_client and self._httpx_client is not None:
+            await self._httpx_client.aclose()
+            self._httpx_client = None
+
+    async def __aenter__(self) -> 'A2AClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
 
     async def send_task(self, payload: dict[str, Any]) -> SendTaskResponse:
         request = SendTaskRequest(params=payload)
@@ -50,37 +121,213 @@ class A2AClient:
     async def send_task_streaming(
         self, payload: dict[str, Any]
     ) -> AsyncIterable[SendTaskStreamingResponse]:
+        """Streams task updates without blocking the event loop.
+
+        Events are parsed incrementally as they arrive on the pooled
+        connection. If no data arrives for `stream_idle_timeout` seconds the
+        stream fails with a 408 error. Leaving the iteration early closes the
+        underlying response, deterministically so when the generator is
+        wrapped in `contextlib.aclosing`.
+        """
         request = SendTaskStreamingRequest(params=payload)
-        with httpx.Client(timeout=None) as client:
-            with connect_sse(
-                client, 'POST', self.url, json=request.model_dump()
+        timeout = httpx.Timeout(self.timeout, read=self.stream_idle_timeout)
+        try:
+            async with aconnect_sse(
+                self.httpx_client,
+                'POST',
+                self.url,
+                json=request.model_dump(),
+                timeout=timeout,
             ) as event_source:
-                try:
-                    for sse in event_source.iter_sse():
-                        yield SendTaskStreamingResponse(**json.loads(sse.data))
-                except json.JSONDecodeError as e:
-                    raise A2AClientJSONError(str(e)) from e
-                except httpx.RequestError as e:
-                    raise A2AClientHTTPError(400, str(e)) from e
+                response = event_source.response
+                response.raise_for_status()
+                if response.headers.get('content-type', '').startswith(
+                    'application/json'
+                ):
+                    # The request was rejected before a stream was opened.
+                    await response.aread()
+                    yield SendTaskStreamingResponse(**response.json())
+                    return
+
+                async for sse in event_source.aiter_sse():
+                    yield SendTaskStreamingResponse(**json.loads(sse.data))
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except httpx.ReadTimeout as e:
+            raise A2AClientHTTPError(
+                408, f'No stream data for {self.stream_idle_timeout}s'
+            ) from e
+        except httpx.RequestError as e:
+            raise A2AClientHTTPError(400, str(e)) from e
+
+    async def _post(self, request: JSONRPCRequest) -> dict[str, Any]:
+        start = time.monotonic()
+        try:
+            # Image generation could take time, adding timeout
+            response = await self.httpx_client.post(
+                self.url, json=request.model_dump(), timeout=self.timeout
+            )
+            response.raise_for_status()
+            result = response.json()
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+        if self.hedge_policy and request.method in self.hedge_policy.methods:
+            self._latencies.record(time.monotonic() - start)
+        return result
 
     async def _send_request(self, request: JSONRPCRequest) -> dict[str, Any]:
-        async with httpx.AsyncClient() as client:
+        return await self._with_retries(
+            [request.method], lambda: self._send_once(request)
+        )
+
+    async def _with_retries(
+        self,
+        methods: list[str],
+        send: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Calls `send`, retrying it if every method it sends may be retried."""
+        self.metrics.requests += 1
+        policy = self.retry_policy
+        if policy is None or not set(methods) <= policy.methods:
+            return await send()
+
+        self._retry_budget.record_request()
+        retry = 0
+        while True:
             try:
-                # Image generation could take time, adding timeout
-                response = await client.post(
-                    self.url, json=request.model_dump(), timeout=self.timeout
+                return await send()
+            except (A2AClientHTTPError, httpx.TransportError) as e:
+                if not self._is_retryable(e):
+                    raise
+                if retry + 1 >= policy.max_attempts:
+                    self.metrics.retries_exhausted += 1
+                    raise
+                if not self._retry_budget.try_spend():
+                    self.metrics.retry_budget_exhausted += 1
+                    raise
+                delay = policy.backoff(retry)
+                logger.info(
+                    f'Retrying {", ".join(methods)} after {e!r} in '
+                    f'{delay:.2f}s'
                 )
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPStatusError as e:
-                raise A2AClientHTTPError(e.response.status_code, str(e)) from e
-            except json.JSONDecodeError as e:
-                raise A2AClientJSONError(str(e)) from e
+                await asyncio.sleep(delay)
+                retry += 1
+                self.metrics.retries += 1
+
+    def _is_retryable(self, e: Exception) -> bool:
+        if isinstance(e, A2AClientHTTPError):
+            return e.status_code in self.retry_policy.retryable_status_codes
+        return True
+
+    def _hedge_delay(self, method: str) -> float | None:
+        policy = self.hedge_policy
+        if policy is None or method not in policy.methods:
+            return None
+        if policy.delay is not None:
+            return policy.delay
+        if len(self._latencies.samples) < policy.min_samples:
+            return None
+        return self._latencies.percentile(policy.percentile)
+
+    async def _send_once(self, request: JSONRPCRequest) -> dict[str, Any]:
+        """Sends the request, hedging it with a second copy when it is slow."""
+        hedge_delay = self._hedge_delay(request.method)
+        if hedge_delay is None:
+            return await self._post(request)
+
+        primary = asyncio.create_task(self._post(request))
+        attempts = {primary}
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=hedge_delay)
+            if done:
+                return primary.result()
+
+            self.metrics.hedges += 1
+            hedge = asyncio.create_task(self._post(request))
+            attempts.add(hedge)
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for attempt in done:
+                    if attempt.exception() is None:
+                        if attempt is hedge:
+                            self.metrics.hedge_wins += 1
+                        return attempt.result()
+            # Both attempts failed, report the original one's error.
+            return primary.result()
+        finally:
+            # Also reached when the caller is cancelled while waiting, which
+            # must not leave an attempt running.
+            for attempt in attempts:
+                attempt.cancel()
+
+    async def _send_batch(
+        self, requests: list[JSONRPCRequest]
+    ) -> list[dict[str, Any]]:
+        """Sends requests in one JSON-RPC batch, returning their responses.
+
+        A batch is retried like a single call when every request in it may
+        be, but never hedged, since a hedge would resend the whole batch.
+
+        Raises:
+            A2AClientJSONError: If the server left out the response to any
+                of the requests.
+        """
+        return await self._with_retries(
+            [request.method for request in requests],
+            lambda: self._post_batch(requests),
+        )
+
+    async def _post_batch(
+        self, requests: list[JSONRPCRequest]
+    ) -> list[dict[str, Any]]:
+        try:
+            response = await self.httpx_client.post(
+                self.url,
+                json=[request.model_dump() for request in requests],
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            result = response.json()
+        except httpx.HTTPStatusError as e:
+            raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        except json.JSONDecodeError as e:
+            raise A2AClientJSONError(str(e)) from e
+
+        if not isinstance(result, list):
+            # The whole batch was rejected with a single error response.
+            raise A2AClientJSONError(f'Batch request failed: {result}')
+        # Responses may arrive in any order, match them up by id.
+        by_id = {item.get('id'): item for item in result}
+        missing = [
+            request.id for request in requests if request.id not in by_id
+        ]
+        if missing:
+            raise A2AClientJSONError(
+                f'Batch response has no reply to requests {missing}'
+            )
+        return [by_id[request.id] for request in requests]
 
     async def get_task(self, payload: dict[str, Any]) -> GetTaskResponse:
         request = GetTaskRequest(params=payload)
         return GetTaskResponse(**await self._send_request(request))
 
+    async def get_tasks(
+        self, payloads: list[dict[str, Any]]
+    ) -> list[GetTaskResponse]:
+        """Fetches several tasks in one JSON-RPC batch request."""
+        requests = [GetTaskRequest(params=payload) for payload in payloads]
+        return [
+            GetTaskResponse(**response)
+            for response in await self._send_batch(requests)
+        ]
+
     async def cancel_task(self, payload: dict[str, Any]) -> CancelTaskResponse:
         request = CancelTaskRequest(params=payload)
         return CancelTaskResponse(**await self._send_request(request))
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Generic, TypeVar
+
+from common.client.client import A2AClient
+from common.types import SendTaskResponse
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class FanOutMode(str, Enum):
+    """When a fan-out is complete.
+
+    FIRST_SUCCESS: as soon as one call succeeds.
+    QUORUM: as soon as `quorum` calls have succeeded.
+    ALL: once every call has finished.
+    """
+
+    FIRST_SUCCESS = 'first_success'
+    QUORUM = 'quorum'
+    ALL = 'all'
+
+
+@dataclass
+class FanOutResult(Generic[T]):
+    """The outcome of one call of a fan-out.
+
+    A call either returned a `result`, raised an `error` (a TimeoutError if
+    it ran out of time) or was `canceled`, because the fan-out completed
+    before it did or because the call canceled itself.
+    """
+
+    key: str
+    result: T | None = None
+    error: BaseException | None = None
+    canceled: bool = False
+    succeeded: bool = False
+    latency: float = 0.0
+
+
+async def fan_out(
+    calls: Mapping[str, Callable[[], Awaitable[T]]],
+    mode: FanOutMode = FanOutMode.ALL,
+    quorum: int | None = None,
+    concurrency: int = 10,
+    timeout: float | None = None,
+    is_success: Callable[[T], bool] | None = None,
+) -> dict[str, FanOutResult[T]]:
+    """Runs `calls` concurrently and returns their results by key.
+
+    At most `concurrency` calls are in flight at once and each one gets
+    `timeout` seconds once it starts. A call succeeds if it returns without
+    raising and `is_success` accepts its result. Calls still pending when
+    the mode is satisfied, or when it can no longer be satisfied, are
+    canceled. `quorum` defaults to a majority of the calls.
+    """
+    if mode == FanOutMode.FIRST_SUCCESS:
+        needed = 1
+    elif mode == FanOutMode.QUORUM:
+        needed = quorum if quorum is not None else len(calls) // 2 + 1
+    else:
+        needed = None
+    semaphore = asyncio.Semaphore(concurrency)
+    results = {key: FanOutResult(key=key) for key in calls}
+
+    async def run(key: str, call: Callable[[], Awaitable[T]]):
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                result = await asyncio.wait_for(call(), timeout)
+            finally:
+                results[key].latency = time.monotonic() - start
+            return result
+
+    tasks = {
+        asyncio.create_task(run(key, call)): key for key, call in calls.items()
+    }
+    pending = set(tasks)
+    successes = 0
+    try:
+        while pending:
+            if needed is not None and (
+                successes >= needed or successes + len(pending) < needed
+            ):
+                break
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                outcome = results[tasks[task]]
+                # exception() raises for a call that canceled itself.
+                if task.cancelled():
+                    outcome.canceled = True
+                    continue
+                if task.exception() is not None:
+                    outcome.error = task.exception()
+                    continue
+                outcome.result = task.result()
+                outcome.succeeded = is_success is None or is_success(
+                    outcome.result
+                )
+                successes += outcome.succeeded
+    finally:
+        for task in pending:
+            task.cancel()
+            results[tasks[task]].canceled = True
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    return results
+
+
+async def send_task_to_agents(
+    clients: Mapping[str, A2AClient],
+    payload: dict[str, Any] | None = None,
+    payloads: Mapping[str, dict[str, Any]] | None = None,
+    **kwargs,
+) -> dict[str, FanOutResult[SendTaskResponse]]:
+    """Sends a task to several agents at once with `fan_out`.
+
+    Every agent gets `payload`, unless `payloads` gives one per agent key.
+    A JSON-RPC error response counts as a failed call. Keyword arguments
+    are passed on to `fan_out`.
+    """
+    if payloads is None:
+        if payload is None:
+            raise ValueError('Must provide either payload or payloads')
+        payloads = {key: payload for key in clients}
+
+    calls = {
+        key: (lambda client=client, key=key: client.send_task(payloads[key]))
+        for key, client in clients.items()
+    }
+    return await fan_out(
+        calls, is_success=lambda response: response.error is None, **kwargs
+    )
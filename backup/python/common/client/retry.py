@@ -0,0 +1,107 @@
+import random
+
+from collections import deque
+from dataclasses import dataclass, field
+
+
+IDEMPOTENT_METHODS = frozenset({'tasks/get', 'tasks/pushNotification/get'})
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with jitter for idempotent A2A calls.
+
+    Attributes:
+        max_attempts: Total attempts per call, including the first one.
+        initial_backoff: Delay in seconds before the first retry.
+        max_backoff: Upper bound for the delay between attempts.
+        multiplier: Factor the delay grows by after every retry.
+        jitter: Fraction of each delay that is randomized, 1.0 meaning
+            "full jitter" (uniform between zero and the delay).
+        budget_ratio: Retries earned per request sent. Once the budget is
+            spent, failures are raised without retrying.
+        budget_burst: Most retries that can be saved up and spent at once.
+        retryable_status_codes: HTTP statuses that are worth retrying.
+        methods: JSON-RPC methods that are safe to retry.
+    """
+
+    max_attempts: int = 3
+    initial_backoff: float = 0.1
+    max_backoff: float = 2.0
+    multiplier: float = 2.0
+    jitter: float = 1.0
+    budget_ratio: float = 0.2
+    budget_burst: float = 10.0
+    retryable_status_codes: frozenset[int] = frozenset(
+        {429, 500, 502, 503, 504}
+    )
+    methods: frozenset[str] = IDEMPOTENT_METHODS
+
+    def backoff(self, retry: int) -> float:
+        """Returns the delay before the given retry, counting from zero."""
+        delay = min(
+            self.initial_backoff * self.multiplier**retry, self.max_backoff
+        )
+        return delay * (1 - self.jitter) + random.uniform(0, delay * self.jitter)
+
+
+@dataclass
+class HedgePolicy:
+    """Sends a second copy of a slow read to cut tail latency.
+
+    The hedge fires after `delay` seconds when set, otherwise after the
+    observed latency percentile once `min_samples` calls have completed.
+    """
+
+    delay: float | None = None
+    percentile: float = 0.95
+    min_samples: int = 20
+    window: int = 200
+    methods: frozenset[str] = frozenset({'tasks/get'})
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of the request rate."""
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.max_tokens = burst
+        self.tokens = burst
+
+    def record_request(self):
+        self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+@dataclass
+class LatencyTracker:
+    """Keeps recent call latencies to derive the hedge delay."""
+
+    window: int = 200
+    samples: deque[float] = field(default_factory=deque)
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+        if len(self.samples) > self.window:
+            self.samples.popleft()
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+@dataclass
+class ClientMetrics:
+    """Counters for the resilience features of A2AClient."""
+
+    requests: int = 0
+    retries: int = 0
+    retries_exhausted: int = 0
+    retry_budget_exhausted: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
@@ -1,5 +1,16 @@
 from .server import A2AServer
+from .retention import RetentionPolicy
+from .sqlite_task_manager import SQLiteTaskManager
+from .sse_queue import OverflowPolicy, SubscriberQueue
 from .task_manager import InMemoryTaskManager, TaskManager
 
 
-__all__ = ['A2AServer', 'InMemoryTaskManager', 'TaskManager']
+__all__ = [
+    'A2AServer',
+    'InMemoryTaskManager',
+    'OverflowPolicy',
+    'RetentionPolicy',
+    'SQLiteTaskManager',
+    'SubscriberQueue',
+    'TaskManager',
+]
@@ -0,0 +1,83 @@
+import gzip
+import hashlib
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from common.types import AgentCard
+
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional compression
+    brotli = None
+
+
+class CachedAgentCard:
+    """An agent card serialized and compressed once, served conditionally.
+
+    Responses carry a strong ETag derived from the serialized card, with
+    the content coding appended for compressed variants since their bytes
+    differ, so clients revalidating with If-None-Match get an empty 304
+    while the card is unchanged, whichever variant they cached.
+    """
+
+    def __init__(self, agent_card: AgentCard, max_age: int = 300):
+        self.agent_card = agent_card
+        self.body = agent_card.model_dump_json(exclude_none=True).encode()
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.cache_control = f'public, max-age={max_age}'
+        # Precomputed variants, in order of preference.
+        self.variants: dict[str, bytes] = {}
+        if brotli is not None:
+            self.variants['br'] = brotli.compress(self.body)
+        self.variants['gzip'] = gzip.compress(self.body, mtime=0)
+        self.variant_etags = {
+            encoding: f'"{digest}-{encoding}"' for encoding in self.variants
+        }
+        self._etags = {self.etag, *self.variant_etags.values()}
+
+    def _matches(self, if_none_match: str) -> bool:
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag == '*' or tag in self._etags:
+                return True
+        return False
+
+    def _accepted_encodings(self, accept_encoding: str) -> set[str]:
+        accepted = set()
+        for item in accept_encoding.split(','):
+            coding, _, params = item.strip().partition(';')
+            if params.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00'):
+                continue
+            accepted.add(coding.strip().lower())
+        return accepted
+
+    def respond(self, request: Request) -> Response:
+        accepted = self._accepted_encodings(
+            request.headers.get('accept-encoding', '')
+        )
+        encoding = next((e for e in self.variants if e in accepted), None)
+        headers = {
+            'ETag': self.variant_etags.get(encoding, self.etag),
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+        # The 304 carries the ETag of the variant a 200 would have sent.
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match and self._matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is None:
+            return Response(
+                self.body, media_type='application/json', headers=headers
+            )
+        headers['Content-Encoding'] = encoding
+        return Response(
+            self.variants[encoding],
+            media_type='application/json',
+            headers=headers,
+        )
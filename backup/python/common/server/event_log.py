@@ -0,0 +1,59 @@
+from collections import deque
+from itertools import islice
+from typing import Any
+
+from common.server.frames import LoggedEvent
+
+
+class TaskEventLog:
+    """Bounded ring buffer of the events streamed for a single task.
+
+    Event ids start at 1 and increase by one per event, so a subscriber that
+    reconnects with the last id it saw can be sent exactly the events it
+    missed, as long as they are still retained.
+    """
+
+    def __init__(self, maxlen: int = 128):
+        self._events: deque[LoggedEvent] = deque(maxlen=maxlen)
+        self.last_event_id = 0
+        self.closed = False
+
+    @classmethod
+    def restore(
+        cls, events: list[LoggedEvent], maxlen: int = 128
+    ) -> 'TaskEventLog':
+        """Rebuilds a log from events recorded earlier, oldest first."""
+        event_log = cls(maxlen=maxlen)
+        event_log._events.extend(events)
+        if event_log._events:
+            last = event_log._events[-1]
+            event_log.last_event_id = last.event_id
+            event_log.closed = last.is_terminal
+        return event_log
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def first_event_id(self) -> int | None:
+        return self._events[0].event_id if self._events else None
+
+    def append(self, event: Any) -> LoggedEvent:
+        self.last_event_id += 1
+        logged = LoggedEvent.from_event(event, event_id=self.last_event_id)
+        self._events.append(logged)
+        if logged.is_terminal:
+            self.closed = True
+        return logged
+
+    def since(self, last_event_id: int) -> list[LoggedEvent]:
+        """Returns the retained events with an id greater than last_event_id."""
+        if not self._events or last_event_id >= self.last_event_id:
+            return []
+        start = max(last_event_id + 1 - self.first_event_id, 0)
+        return list(islice(self._events, start, None))
+
+    def is_complete_since(self, last_event_id: int) -> bool:
+        """True if every event after last_event_id is still retained."""
+        first_event_id = self.first_event_id
+        return first_event_id is None or last_event_id + 1 >= first_event_id
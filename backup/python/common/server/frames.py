@@ -0,0 +1,91 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from common.types import (
+    JSONRPCError,
+    SendTaskStreamingResponse,
+    TaskStatusUpdateEvent,
+)
+from common.utils.json_utils import dumps
+
+
+@dataclass(frozen=True)
+class LoggedEvent:
+    """A streaming event, its per-task event id and its serialized payload.
+
+    The payload is produced once when the event is enqueued and shared as is
+    by every subscriber. The id is None for events that are only meant for
+    one subscriber and are never recorded in the task's event log.
+    """
+
+    event_id: int | None
+    event: Any
+    payload: bytes = field(repr=False)
+
+    @classmethod
+    def from_event(cls, event: Any, event_id: int | None = None):
+        return cls(event_id=event_id, event=event, payload=dumps(event))
+
+    @property
+    def is_error(self) -> bool:
+        return isinstance(self.event, JSONRPCError)
+
+    @property
+    def is_terminal(self) -> bool:
+        """True if no further events follow this one on the stream."""
+        if self.is_error:
+            return True
+        return isinstance(self.event, TaskStatusUpdateEvent) and self.event.final
+
+
+@dataclass(frozen=True)
+class SSEResponse:
+    """A streaming response for one subscriber, with its encoded SSE frame."""
+
+    request_id: int | str | None
+    logged_event: LoggedEvent
+    frame: bytes = field(repr=False)
+
+    @property
+    def event_id(self) -> int | None:
+        return self.logged_event.event_id
+
+    @property
+    def response(self) -> SendTaskStreamingResponse:
+        """The response as a model, for in-process consumers of the stream."""
+        if self.logged_event.is_error:
+            return SendTaskStreamingResponse(
+                id=self.request_id, error=self.logged_event.event
+            )
+        return SendTaskStreamingResponse(
+            id=self.request_id, result=self.logged_event.event
+        )
+
+
+class SSEFrameEncoder:
+    """Wraps pre-serialized events in one subscriber's JSON-RPC envelope.
+
+    The envelope only depends on the subscriber's request id, so it is built
+    once per subscriber and each event costs a few byte concatenations.
+    """
+
+    def __init__(self, request_id: int | str | None):
+        self.request_id = request_id
+        head = b'{"jsonrpc":"2.0"'
+        if request_id is not None:
+            head += b',"id":' + dumps(request_id)
+        self._result_head = b'data: ' + head + b',"result":'
+        self._error_head = b'data: ' + head + b',"error":'
+
+    def encode(self, logged_event: LoggedEvent) -> SSEResponse:
+        head = (
+            self._error_head if logged_event.is_error else self._result_head
+        )
+        parts = [head, logged_event.payload, b'}\n\n']
+        if logged_event.event_id is not None:
+            parts.insert(0, b'id: %d\n' % logged_event.event_id)
+        return SSEResponse(
+            request_id=self.request_id,
+            logged_event=logged_event,
+            frame=b''.join(parts),
+        )
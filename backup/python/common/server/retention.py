@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class RetentionPolicy:
+    """Limits on how long and how much finished task state is kept.
+
+    Only tasks in a terminal state (completed, failed or canceled) are ever
+    evicted. Any limit set to None is disabled, and all of them are by
+    default, so finished tasks stay available to tasks/get until a policy
+    is set.
+
+    Attributes:
+        terminal_ttl: Seconds a task is kept after reaching a terminal state.
+        max_tasks: Maximum number of stored tasks. Least recently used
+            terminal tasks are evicted beyond it.
+        max_bytes: Budget for the serialized size of task history and
+            artifacts. Least recently used terminal tasks are evicted beyond
+            it.
+        sweep_interval: Seconds between background cleanup runs.
+    """
+
+    terminal_ttl: float | None = None
+    max_tasks: int | None = None
+    max_bytes: int | None = None
+    sweep_interval: float = 30
+
+
+@dataclass
+class RetentionStats:
+    """Counters describing what the retention sweeper has evicted."""
+
+    sweeps: int = 0
+    evicted_ttl: int = 0
+    evicted_lru: int = 0
+    evicted_bytes: int = 0
+    bytes_freed: int = 0
+
+    def record(self, reason: str, size: int):
+        if reason == 'ttl':
+            self.evicted_ttl += 1
+        elif reason == 'lru':
+            self.evicted_lru += 1
+        elif reason == 'bytes':
+            self.evicted_bytes += 1
+        self.bytes_freed += size
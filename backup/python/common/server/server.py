@@ -1,18 +1,20 @@
+import asyncio
 import json
 import logging
 
-from collections.abc import AsyncIterable
-from typing import Any
+from collections.abc import AsyncIterable, Awaitable, Callable
+from typing import Any, NamedTuple
 
 from pydantic import ValidationError
 from sse_starlette.sse import EventSourceResponse
 from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
+from common.server.agent_card_cache import CachedAgentCard
+from common.server.frames import SSEResponse
 from common.server.task_manager import TaskManager
 from common.types import (
-    A2ARequest,
     AgentCard,
     CancelTaskRequest,
     GetTaskPushNotificationRequest,
@@ -20,16 +22,37 @@ from common.types import (
     InternalError,
     InvalidRequestError,
     JSONParseError,
+    JSONRPCError,
+    JSONRPCRequest,
     JSONRPCResponse,
+    MethodNotFoundError,
     SendTaskRequest,
     SendTaskStreamingRequest,
     SetTaskPushNotificationRequest,
     TaskResubscriptionRequest,
 )
+from common.utils import json_utils
 
 
 logger = logging.getLogger(__name__)
 
+RequestHandler = Callable[[JSONRPCRequest, Request], Awaitable[Any]]
+
+
+class MethodEntry(NamedTuple):
+    request_model: type[JSONRPCRequest]
+    handler: RequestHandler
+    streaming: bool
+
+
+class InvalidRequestRPCError(Exception):
+    """Raised for requests that are rejected before reaching a handler."""
+
+    def __init__(self, request_id: int | str | None, error: JSONRPCError):
+        self.request_id = request_id
+        self.error = error
+        super().__init__(error.message)
+
 
 class A2AServer:
     def __init__(
@@ -39,12 +62,20 @@ class A2AServer:
         endpoint='/',
         agent_card: AgentCard = None,
         task_manager: TaskManager = None,
+        max_batch_size: int = 100,
+        batch_concurrency: int = 16,
+        agent_card_max_age: int = 300,
     ):
         self.host = host
         self.port = port
         self.endpoint = endpoint
         self.task_manager = task_manager
+        self.agent_card_max_age = agent_card_max_age
         self.agent_card = agent_card
+        self.max_batch_size = max_batch_size
+        self.batch_concurrency = batch_concurrency
+        self._methods: dict[str, MethodEntry] = {}
+        self._register_default_methods()
         self.app = Starlette()
         self.app.add_route(
             self.endpoint, self._process_request, methods=['POST']
@@ -64,74 +95,242 @@ class A2AServer:
 
         uvicorn.run(self.app, host=self.host, port=self.port)
 
-    def _get_agent_card(self, request: Request) -> JSONResponse:
-        return JSONResponse(self.agent_card.model_dump(exclude_none=True))
+    @property
+    def agent_card(self) -> AgentCard | None:
+        return self._agent_card
+
+    @agent_card.setter
+    def agent_card(self, agent_card: AgentCard | None):
+        self.update_agent_card(agent_card)
+
+    def update_agent_card(self, agent_card: AgentCard | None):
+        """Replaces the served agent card and re-serializes it once."""
+        self._agent_card = agent_card
+        self._cached_agent_card = (
+            CachedAgentCard(agent_card, max_age=self.agent_card_max_age)
+            if agent_card is not None
+            else None
+        )
+
+    def _get_agent_card(self, request: Request) -> Response:
+        if self._cached_agent_card is None:
+            return Response(status_code=404)
+        return self._cached_agent_card.respond(request)
+
+    def register_method(
+        self,
+        method: str,
+        request_model: type[JSONRPCRequest],
+        handler: RequestHandler,
+        streaming: bool = False,
+    ):
+        """Routes a JSON-RPC method to a handler.
+
+        The request body is validated against request_model alone, and the
+        handler is called with the validated request and the HTTP request.
+        Streaming methods are rejected inside batch requests. Registering an
+        existing method replaces its handler.
+        """
+        self._methods[method] = MethodEntry(request_model, handler, streaming)
+
+    def _register_default_methods(self):
+        self.register_method(
+            'tasks/get',
+            GetTaskRequest,
+            lambda r, _: self.task_manager.on_get_task(r),
+        )
+        self.register_method(
+            'tasks/send',
+            SendTaskRequest,
+            lambda r, _: self.task_manager.on_send_task(r),
+        )
+        self.register_method(
+            'tasks/sendSubscribe',
+            SendTaskStreamingRequest,
+            lambda r, _: self.task_manager.on_send_task_subscribe(r),
+            streaming=True,
+        )
+        self.register_method(
+            'tasks/cancel',
+            CancelTaskRequest,
+            lambda r, _: self.task_manager.on_cancel_task(r),
+        )
+        self.register_method(
+            'tasks/pushNotification/set',
+            SetTaskPushNotificationRequest,
+            lambda r, _: self.task_manager.on_set_task_push_notification(r),
+        )
+        self.register_method(
+            'tasks/pushNotification/get',
+            GetTaskPushNotificationRequest,
+            lambda r, _: self.task_manager.on_get_task_push_notification(r),
+        )
+        self.register_method(
+            'tasks/resubscribe',
+            TaskResubscriptionRequest,
+            self._resubscribe,
+            streaming=True,
+        )
+
+    async def _resubscribe(
+        self, json_rpc_request: TaskResubscriptionRequest, request: Request
+    ):
+        self._apply_last_event_id(request, json_rpc_request)
+        return await self.task_manager.on_resubscribe_to_task(json_rpc_request)
+
+    def _resolve(self, payload: Any) -> tuple[JSONRPCRequest, MethodEntry]:
+        if not isinstance(payload, dict):
+            raise InvalidRequestRPCError(None, InvalidRequestError())
+
+        method = payload.get('method')
+        entry = self._methods.get(method) if isinstance(method, str) else None
+        if entry is None:
+            raise InvalidRequestRPCError(
+                payload.get('id'), MethodNotFoundError()
+            )
+
+        return entry.request_model.model_validate(payload), entry
+
+    @staticmethod
+    def _payload_id(payload: Any) -> int | str | None:
+        """The id of a raw call, for errors raised before it is validated."""
+        if isinstance(payload, dict):
+            request_id = payload.get('id')
+            if isinstance(request_id, int | str):
+                return request_id
+        return None
 
     async def _process_request(self, request: Request):
+        payload = None
         try:
-            body = await request.json()
-            json_rpc_request = A2ARequest.validate_python(body)
-
-            if isinstance(json_rpc_request, GetTaskRequest):
-                result = await self.task_manager.on_get_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskRequest):
-                result = await self.task_manager.on_send_task(json_rpc_request)
-            elif isinstance(json_rpc_request, SendTaskStreamingRequest):
-                result = await self.task_manager.on_send_task_subscribe(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, CancelTaskRequest):
-                result = await self.task_manager.on_cancel_task(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, SetTaskPushNotificationRequest):
-                result = await self.task_manager.on_set_task_push_notification(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, GetTaskPushNotificationRequest):
-                result = await self.task_manager.on_get_task_push_notification(
-                    json_rpc_request
-                )
-            elif isinstance(json_rpc_request, TaskResubscriptionRequest):
-                result = await self.task_manager.on_resubscribe_to_task(
-                    json_rpc_request
-                )
-            else:
-                logger.warning(
-                    f'Unexpected request type: {type(json_rpc_request)}'
-                )
-                raise ValueError(f'Unexpected request type: {type(request)}')
+            payload = json_utils.loads(await request.body())
+            if isinstance(payload, list):
+                return await self._process_batch(payload, request)
 
+            json_rpc_request, entry = self._resolve(payload)
+            result = await entry.handler(json_rpc_request, request)
             return self._create_response(result)
 
         except Exception as e:
-            return self._handle_exception(e)
+            return self._handle_exception(e, self._payload_id(payload))
 
-    def _handle_exception(self, e: Exception) -> JSONResponse:
+    async def _process_batch(
+        self, payloads: list[Any], request: Request
+    ) -> Response:
+        """Runs the calls of a JSON-RPC batch concurrently.
+
+        All responses are returned in a single JSON array. Streaming methods
+        cannot be answered inside an array and are rejected per call.
+        Notifications, calls without an id, are run but never answered, not
+        even with an error, and a batch of only notifications gets an empty
+        204 response.
+        """
+        if not payloads:
+            raise InvalidRequestRPCError(
+                None, InvalidRequestError(message='Empty batch request')
+            )
+        if len(payloads) > self.max_batch_size:
+            raise InvalidRequestRPCError(
+                None,
+                InvalidRequestError(
+                    message=f'Batch exceeds {self.max_batch_size} requests'
+                ),
+            )
+
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+
+        async def run(payload: Any) -> JSONRPCResponse | None:
+            # Checked on the raw payload, the request models default the id.
+            is_notification = isinstance(payload, dict) and 'id' not in payload
+            try:
+                json_rpc_request, entry = self._resolve(payload)
+                if entry.streaming:
+                    raise InvalidRequestRPCError(
+                        json_rpc_request.id,
+                        InvalidRequestError(
+                            message='Streaming methods are not allowed in '
+                            'batch requests'
+                        ),
+                    )
+                async with semaphore:
+                    result = await entry.handler(json_rpc_request, request)
+                if not isinstance(result, JSONRPCResponse):
+                    raise ValueError(
+                        f'Unexpected result type: {type(result)}'
+                    )
+                return None if is_notification else result
+            except Exception as e:
+                if is_notification:
+                    logger.warning(f'Error while handling notification: {e}')
+                    return None
+                return self._error_response(e, self._payload_id(payload))
+
+        responses = [
+            response
+            for response in await asyncio.gather(*(run(p) for p in payloads))
+            if response is not None
+        ]
+        if not responses:
+            return Response(status_code=204)
+        body = b'[%s]' % b','.join(
+            response.model_dump_json(exclude_none=True).encode()
+            for response in responses
+        )
+        return Response(body, media_type='application/json')
+
+    def _apply_last_event_id(
+        self, request: Request, json_rpc_request: TaskResubscriptionRequest
+    ):
+        """Passes the SSE `Last-Event-ID` header on to the task manager."""
+        last_event_id = request.headers.get('last-event-id')
+        if not last_event_id:
+            return
+        metadata = json_rpc_request.params.metadata or {}
+        metadata.setdefault('lastEventId', last_event_id)
+        json_rpc_request.params.metadata = metadata
+
+    def _handle_exception(
+        self, e: Exception, request_id: int | str | None = None
+    ) -> JSONResponse:
+        response = self._error_response(e, request_id)
+        return JSONResponse(
+            response.model_dump(exclude_none=True), status_code=400
+        )
+
+    def _error_response(
+        self, e: Exception, request_id: int | str | None = None
+    ) -> JSONRPCResponse:
         if isinstance(e, json.decoder.JSONDecodeError):
             json_rpc_error = JSONParseError()
         elif isinstance(e, ValidationError):
             json_rpc_error = InvalidRequestError(data=json.loads(e.json()))
+        elif isinstance(e, InvalidRequestRPCError):
+            request_id = e.request_id
+            json_rpc_error = e.error
         else:
             logger.error(f'Unhandled exception: {e}')
             json_rpc_error = InternalError()
 
-        response = JSONRPCResponse(id=None, error=json_rpc_error)
-        return JSONResponse(
-            response.model_dump(exclude_none=True), status_code=400
-        )
+        return JSONRPCResponse(id=request_id, error=json_rpc_error)
 
-    def _create_response(
-        self, result: Any
-    ) -> JSONResponse | EventSourceResponse:
+    def _create_response(self, result: Any) -> Response | EventSourceResponse:
         if isinstance(result, AsyncIterable):
 
-            async def event_generator(result) -> AsyncIterable[dict[str, str]]:
+            async def event_generator(
+                result,
+            ) -> AsyncIterable[bytes | dict[str, str]]:
                 async for item in result:
-                    yield {'data': item.model_dump_json(exclude_none=True)}
+                    if isinstance(item, SSEResponse):
+                        # Already serialized once for all subscribers.
+                        yield item.frame
+                    else:
+                        yield {'data': item.model_dump_json(exclude_none=True)}
 
             return EventSourceResponse(event_generator(result))
         if isinstance(result, JSONRPCResponse):
-            return JSONResponse(result.model_dump(exclude_none=True))
+            return Response(
+                result.model_dump_json(exclude_none=True),
+                media_type='application/json',
+            )
         logger.error(f'Unexpected result type: {type(result)}')
         raise ValueError(f'Unexpected result type: {type(result)}')
@@ -0,0 +1,444 @@
+import asyncio
+import contextlib
+import logging
+import sqlite3
+import time
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from common.server.event_log import TaskEventLog
+from common.server.frames import LoggedEvent
+from common.server.task_manager import TERMINAL_STATES, InMemoryTaskManager
+from common.types import (
+    Artifact,
+    JSONRPCError,
+    Message,
+    PushNotificationConfig,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+
+logger = logging.getLogger(__name__)
+
+TASK_DB_PATH_ENV = 'A2A_TASK_DB_PATH'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    session_id TEXT,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS push_notification_configs (
+    task_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS task_events (
+    task_id TEXT NOT NULL,
+    event_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (task_id, event_id)
+);
+"""
+
+# The event types recorded in a task's event log, by the kind stored with
+# them.
+_EVENT_TYPES = {
+    'status': TaskStatusUpdateEvent,
+    'artifact': TaskArtifactUpdateEvent,
+    'error': JSONRPCError,
+}
+
+
+def _event_kind(event: Any) -> str | None:
+    for kind, event_type in _EVENT_TYPES.items():
+        if isinstance(event, event_type):
+            return kind
+    return None
+
+
+@dataclass
+class _Batch:
+    """Changes taken from the pending sets to be written in one transaction."""
+
+    task_ids: list[str] = field(default_factory=list)
+    push_config_ids: list[str] = field(default_factory=list)
+    task_rows: list[tuple[Any, ...]] = field(default_factory=list)
+    push_rows: list[tuple[str, str]] = field(default_factory=list)
+    event_rows: list[tuple[str, int, str, bytes]] = field(default_factory=list)
+    events: list[tuple[str, LoggedEvent]] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+
+    @property
+    def rows(self) -> int:
+        return (
+            len(self.task_rows)
+            + len(self.push_rows)
+            + len(self.event_rows)
+            + len(self.deleted)
+        )
+
+
+class SQLiteTaskManager(InMemoryTaskManager):
+    """InMemoryTaskManager that persists tasks to a local SQLite database.
+
+    Tasks, including their history and artifacts, push notification configs
+    and the events logged for resubscribing clients are written behind:
+    updates only mark a task dirty, and a background writer commits all
+    dirty tasks in one transaction per batch, so bursts of `update_store`
+    calls share a single fsync. A batch that fails to commit is marked
+    dirty again and retried with exponential backoff, up to
+    `max_retry_interval` seconds apart. Reads are served from the in-memory
+    store, which is loaded from the database on startup.
+
+    Tasks that were not finished when the process stopped have no agent
+    left to finish them, so on startup they are marked failed, and their
+    streams ended, unless `fail_interrupted_tasks` is False for agents that
+    resume such tasks themselves.
+
+    Agents use it exactly like InMemoryTaskManager, by subclassing it and
+    implementing `on_send_task` and `on_send_task_subscribe`.
+    """
+
+    def __init__(
+        self,
+        db_path: str = 'tasks.db',
+        flush_interval: float = 0.05,
+        max_batch_size: int = 500,
+        max_retry_interval: float = 30.0,
+        fail_interrupted_tasks: bool = True,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.max_retry_interval = max_retry_interval
+        self.fail_interrupted_tasks = fail_interrupted_tasks
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._dirty_tasks: set[str] = set()
+        self._dirty_push_configs: set[str] = set()
+        self._deleted_tasks: set[str] = set()
+        self._pending_events: list[tuple[str, LoggedEvent]] = []
+        self._dirty = asyncio.Event()
+        self._writer: asyncio.Task | None = None
+        self._closing = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self.write_stats = {
+            'batches': 0,
+            'rows': 0,
+            'failures': 0,
+            'flush_seconds': 0.0,
+        }
+        self._load()
+
+    def _load(self):
+        for (data,) in self._conn.execute(
+            'SELECT data FROM tasks ORDER BY updated_at'
+        ):
+            task = Task.model_validate_json(data)
+            self.tasks[task.id] = task
+            for item in [*(task.history or []), *(task.artifacts or [])]:
+                self._add_task_bytes(task.id, item)
+            if task.status.state in TERMINAL_STATES:
+                self._mark_terminal(task.id)
+        for task_id, data in self._conn.execute(
+            'SELECT task_id, data FROM push_notification_configs'
+        ):
+            self.push_notification_infos[task_id] = (
+                PushNotificationConfig.model_validate_json(data)
+            )
+        events: dict[str, list[LoggedEvent]] = {}
+        for task_id, event_id, kind, payload in self._conn.execute(
+            'SELECT task_id, event_id, kind, payload FROM task_events '
+            'ORDER BY task_id, event_id'
+        ):
+            event = _EVENT_TYPES[kind].model_validate_json(payload)
+            events.setdefault(task_id, []).append(
+                LoggedEvent(event_id=event_id, event=event, payload=payload)
+            )
+        for task_id, task_events in events.items():
+            self.task_event_logs[task_id] = TaskEventLog.restore(
+                task_events, maxlen=self.event_log_size
+            )
+        logger.info(f'Loaded {len(self.tasks)} tasks from {self.db_path}')
+        if self.fail_interrupted_tasks:
+            self._fail_interrupted_tasks()
+
+    def _fail_interrupted_tasks(self):
+        interrupted = [
+            task_id
+            for task_id, task in self.tasks.items()
+            if task.status.state not in TERMINAL_STATES
+        ]
+        for task_id in interrupted:
+            status = TaskStatus(
+                state=TaskState.FAILED,
+                message=Message(
+                    role='agent',
+                    parts=[TextPart(text='Task interrupted by a restart')],
+                ),
+            )
+            task = self.tasks[task_id]
+            task.status = status
+            task.history = [*(task.history or []), status.message]
+            self._add_task_bytes(task_id, status.message)
+            self._mark_terminal(task_id)
+            self._dirty_tasks.add(task_id)
+            event_log = self.task_event_logs.get(task_id)
+            if event_log is not None and not event_log.closed:
+                # Resubscribing clients are told the stream has ended.
+                final_event = TaskStatusUpdateEvent(
+                    id=task_id, status=status, final=True
+                )
+                logged_event = event_log.append(final_event)
+                self._pending_events.append((task_id, logged_event))
+        while self._has_pending_changes():
+            # There may be no event loop yet, so written right away.
+            self._write_batch(self._take_batch())
+        if interrupted:
+            logger.warning(
+                f'Marked {len(interrupted)} interrupted tasks as failed'
+            )
+
+    def _mark_dirty(self, task_id: str):
+        self._dirty_tasks.add(task_id)
+        self._deleted_tasks.discard(task_id)
+        self._dirty.set()
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        if self._closing.is_set():
+            return
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.get_running_loop().create_task(
+                self._run_writer()
+            )
+
+    async def upsert_task(self, task_send_params: TaskSendParams) -> Task:
+        task = await super().upsert_task(task_send_params)
+        self._mark_dirty(task.id)
+        return task
+
+    def _update_task(
+        self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
+    ) -> Task:
+        task = super()._update_task(task_id, status, artifacts)
+        self._mark_dirty(task_id)
+        return task
+
+    async def set_push_notification_info(
+        self, task_id: str, notification_config: PushNotificationConfig
+    ):
+        await super().set_push_notification_info(task_id, notification_config)
+        self._dirty_push_configs.add(task_id)
+        self._mark_dirty(task_id)
+
+    async def enqueue_events_for_sse(
+        self, task_id, task_update_event
+    ) -> LoggedEvent:
+        logged_event = await super().enqueue_events_for_sse(
+            task_id, task_update_event
+        )
+        self._pending_events.append((task_id, logged_event))
+        self._dirty.set()
+        self._ensure_writer()
+        return logged_event
+
+    async def evict_task(self, task_id: str, reason: str = 'manual'):
+        await super().evict_task(task_id, reason)
+        self._dirty_tasks.discard(task_id)
+        self._dirty_push_configs.discard(task_id)
+        self._deleted_tasks.add(task_id)
+        self._dirty.set()
+        self._ensure_writer()
+
+    async def _sleep_unless_closing(self, delay: float):
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(self._closing.wait(), delay)
+
+    async def _run_writer(self):
+        failures = 0
+        while not self._closing.is_set():
+            await self._dirty.wait()
+            # Let more updates accumulate so they share one commit.
+            await self._sleep_unless_closing(self.flush_interval)
+            try:
+                await self.flush()
+                failures = 0
+            except Exception as e:
+                # flush() put the batch back, so the next attempt retries it.
+                failures += 1
+                delay = min(
+                    self.flush_interval * 2**failures, self.max_retry_interval
+                )
+                logger.error(
+                    f'Error while persisting tasks, retrying in {delay:.2f}s: '
+                    f'{e}'
+                )
+                self._dirty.set()
+                await self._sleep_unless_closing(delay)
+
+    def _has_pending_changes(self) -> bool:
+        return bool(
+            self._dirty_tasks or self._deleted_tasks or self._pending_events
+        )
+
+    async def flush(self):
+        """Writes all pending changes to the database in batches.
+
+        If a batch fails to commit, its changes are marked pending again
+        before the error is raised, so a later flush writes them.
+        """
+        async with self._flush_lock:
+            while self._has_pending_changes():
+                self._dirty.clear()
+                batch = self._take_batch()
+                start = time.perf_counter()
+                try:
+                    await asyncio.to_thread(self._write_batch, batch)
+                except BaseException:
+                    self.write_stats['failures'] += 1
+                    self._restore_batch(batch)
+                    raise
+                self.write_stats['batches'] += 1
+                self.write_stats['rows'] += batch.rows
+                self.write_stats['flush_seconds'] += (
+                    time.perf_counter() - start
+                )
+            self._dirty.clear()
+
+    def _take_batch(self) -> _Batch:
+        # Serialize on the event loop, where the tasks are mutated, so the
+        # writer thread only ever sees consistent snapshots.
+        batch = _Batch()
+        batch.task_ids = [
+            self._dirty_tasks.pop()
+            for _ in range(min(len(self._dirty_tasks), self.max_batch_size))
+        ]
+        now = time.time()
+        for task_id in batch.task_ids:
+            task = self.tasks.get(task_id)
+            if task is None:
+                continue
+            batch.task_rows.append(
+                (
+                    task.id,
+                    task.sessionId,
+                    task.status.state.value,
+                    now,
+                    task.model_dump_json(exclude_none=True),
+                )
+            )
+            if task_id in self._dirty_push_configs:
+                self._dirty_push_configs.discard(task_id)
+                batch.push_config_ids.append(task_id)
+                batch.push_rows.append(
+                    (
+                        task_id,
+                        self.push_notification_infos[
+                            task_id
+                        ].model_dump_json(exclude_none=True),
+                    )
+                )
+        batch.events = self._pending_events[: self.max_batch_size]
+        del self._pending_events[: self.max_batch_size]
+        for task_id, logged_event in batch.events:
+            kind = _event_kind(logged_event.event)
+            # Skip events of tasks evicted since they were logged.
+            if kind is not None and task_id in self.task_event_logs:
+                batch.event_rows.append(
+                    (
+                        task_id,
+                        logged_event.event_id,
+                        kind,
+                        logged_event.payload,
+                    )
+                )
+        batch.deleted = list(self._deleted_tasks)
+        self._deleted_tasks.clear()
+        return batch
+
+    def _restore_batch(self, batch: _Batch):
+        """Marks the changes of a batch that failed to commit pending again."""
+        for task_id in batch.task_ids:
+            if task_id in self.tasks:
+                self._dirty_tasks.add(task_id)
+        for task_id in batch.push_config_ids:
+            if task_id in self.push_notification_infos:
+                self._dirty_push_configs.add(task_id)
+        self._pending_events[:0] = batch.events
+        # A task recreated since the batch was taken must not be deleted.
+        self._deleted_tasks.update(
+            task_id for task_id in batch.deleted if task_id not in self.tasks
+        )
+        self._dirty.set()
+
+    def _write_batch(self, batch: _Batch):
+        deleted = [(task_id,) for task_id in batch.deleted]
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO tasks '
+                '(id, session_id, state, updated_at, data) '
+                'VALUES (?, ?, ?, ?, ?)',
+                batch.task_rows,
+            )
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO push_notification_configs '
+                '(task_id, data) VALUES (?, ?)',
+                batch.push_rows,
+            )
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO task_events '
+                '(task_id, event_id, kind, payload) VALUES (?, ?, ?, ?)',
+                batch.event_rows,
+            )
+            # Keep only as many events per task as its in-memory log does.
+            last_event_ids: dict[str, int] = {}
+            for task_id, event_id, _, _ in batch.event_rows:
+                last_event_ids[task_id] = max(
+                    event_id, last_event_ids.get(task_id, 0)
+                )
+            self._conn.executemany(
+                'DELETE FROM task_events WHERE task_id = ? AND event_id <= ?',
+                [
+                    (task_id, event_id - self.event_log_size)
+                    for task_id, event_id in last_event_ids.items()
+                    if event_id > self.event_log_size
+                ],
+            )
+            self._conn.executemany('DELETE FROM tasks WHERE id = ?', deleted)
+            self._conn.executemany(
+                'DELETE FROM push_notification_configs WHERE task_id = ?',
+                deleted,
+            )
+            self._conn.executemany(
+                'DELETE FROM task_events WHERE task_id = ?', deleted
+            )
+
+    async def close(self):
+        """Flushes pending writes and closes the database.
+
+        The writer is not cancelled, since its thread would keep writing:
+        it is woken up and finishes the flush it is in before the final one.
+        """
+        self._closing.set()
+        if self._writer is not None:
+            self._dirty.set()
+            await self._writer
+            self._writer = None
+        await self.flush()
+        await super().close()
+        self._conn.close()
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+
+from collections import deque
+from enum import Enum
+
+from common.server.frames import LoggedEvent
+from common.types import InternalError, TaskStatusUpdateEvent
+
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(str, Enum):
+    """What a full subscriber queue does with a new event."""
+
+    DROP_OLDEST = 'drop-oldest'
+    COALESCE = 'coalesce'
+    DISCONNECT = 'disconnect'
+
+
+class SubscriberQueue:
+    """Bounded, non-blocking event queue for a single SSE subscriber.
+
+    Producers call `put_nowait`, which never waits: when the queue is full the
+    overflow policy decides which event is lost, so a slow client only ever
+    affects its own stream.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ):
+        if maxsize <= 0:
+            raise ValueError('maxsize must be positive')
+        self.maxsize = maxsize
+        self.policy = policy
+        self._events: deque[LoggedEvent] = deque()
+        self._ready = asyncio.Event()
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_lag = 0
+        self.disconnected = False
+
+    @property
+    def lag(self) -> int:
+        """Number of events waiting to be delivered."""
+        return len(self._events)
+
+    def qsize(self) -> int:
+        return len(self._events)
+
+    def empty(self) -> bool:
+        return not self._events
+
+    def put_nowait(self, event: LoggedEvent) -> bool:
+        """Queues an event, applying the overflow policy when full.
+
+        Returns False if the event was not queued because the subscriber is
+        (or just got) disconnected.
+        """
+        if self.disconnected:
+            return False
+
+        if len(self._events) >= self.maxsize:
+            if not self._handle_overflow(event):
+                return False
+        else:
+            self._events.append(event)
+
+        self.enqueued += 1
+        self.max_lag = max(self.max_lag, len(self._events))
+        self._ready.set()
+        return True
+
+    def _handle_overflow(self, event: LoggedEvent) -> bool:
+        if self.policy == OverflowPolicy.COALESCE and isinstance(
+            event.event, TaskStatusUpdateEvent
+        ):
+            if isinstance(self._events[-1].event, TaskStatusUpdateEvent):
+                # The newer status supersedes the one still waiting.
+                self._events[-1] = event
+                self.coalesced += 1
+                return True
+
+        if self.policy == OverflowPolicy.DISCONNECT:
+            self._disconnect()
+            return False
+
+        # DROP_OLDEST, or COALESCE when the tail cannot be merged.
+        self._events.popleft()
+        self._events.append(event)
+        self.dropped += 1
+        return True
+
+    def _disconnect(self):
+        logger.warning(
+            f'Disconnecting slow SSE subscriber with {len(self._events)} '
+            'pending events'
+        )
+        self.dropped += len(self._events)
+        self._events.clear()
+        self._events.append(
+            LoggedEvent.from_event(
+                InternalError(
+                    message='Subscriber fell too far behind the stream'
+                )
+            )
+        )
+        self.disconnected = True
+        self._ready.set()
+
+    async def get(self) -> LoggedEvent:
+        while not self._events:
+            self._ready.clear()
+            await self._ready.wait()
+        event = self._events.popleft()
+        self.delivered += 1
+        return event
+
+    def stats(self) -> dict[str, int | str | bool]:
+        return {
+            'policy': self.policy.value,
+            'maxsize': self.maxsize,
+            'lag': self.lag,
+            'max_lag': self.max_lag,
+            'enqueued': self.enqueued,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'disconnected': self.disconnected,
+        }
@@ -1,10 +1,18 @@
 import asyncio
+import itertools
 import logging
+import time
 
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterable
-
-from common.server.utils import new_not_implemented_error
+from collections import OrderedDict
+from collections.abc import AsyncIterable, Coroutine
+from dataclasses import asdict
+from typing import Any
+
+from common.server.event_log import TaskEventLog
+from common.server.frames import LoggedEvent, SSEFrameEncoder, SSEResponse
+from common.server.retention import RetentionPolicy, RetentionStats
+from common.server.sse_queue import OverflowPolicy, SubscriberQueue
 from common.types import (
     Artifact,
     CancelTaskRequest,
@@ -14,8 +22,9 @@ from common.types import (
     GetTaskRequest,
     GetTaskResponse,
     InternalError,
-    JSONRPCError,
+    InvalidParamsError,
     JSONRPCResponse,
+    Message,
     PushNotificationConfig,
     SendTaskRequest,
     SendTaskResponse,
@@ -39,6 +48,10 @@ from common.types import (
 
 logger = logging.getLogger(__name__)
 
+TERMINAL_STATES = frozenset(
+    {TaskState.COMPLETED, TaskState.CANCELED, TaskState.FAILED}
+)
+
 
 class TaskManager(ABC):
     @abstractmethod
@@ -58,7 +71,10 @@ class TaskManager(ABC):
     @abstractmethod
     async def on_send_task_subscribe(
         self, request: SendTaskStreamingRequest
-    ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
+    ) -> (
+        AsyncIterable[SendTaskStreamingResponse | SSEResponse]
+        | JSONRPCResponse
+    ):
         pass
 
     @abstractmethod
@@ -76,26 +92,78 @@ class TaskManager(ABC):
     @abstractmethod
     async def on_resubscribe_to_task(
         self, request: TaskResubscriptionRequest
-    ) -> AsyncIterable[SendTaskResponse] | JSONRPCResponse:
+    ) -> (
+        AsyncIterable[SendTaskStreamingResponse | SSEResponse]
+        | JSONRPCResponse
+    ):
         pass
 
 
 class InMemoryTaskManager(TaskManager):
-    def __init__(self):
-        self.tasks: dict[str, Task] = {}
+    def __init__(
+        self,
+        lock_stripes: int = 64,
+        sse_queue_size: int = 256,
+        sse_overflow_policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        event_log_size: int = 128,
+        retention: RetentionPolicy | None = None,
+        cancel_grace_period: float = 5.0,
+    ):
+        # Ordered from least to most recently used, for LRU eviction.
+        self.tasks: OrderedDict[str, Task] = OrderedDict()
         self.push_notification_infos: dict[str, PushNotificationConfig] = {}
-        self.lock = asyncio.Lock()
-        self.task_sse_subscribers: dict[str, list[asyncio.Queue]] = {}
-        self.subscriber_lock = asyncio.Lock()
+        self.task_sse_subscribers: dict[str, list[SubscriberQueue]] = {}
+        self.task_event_logs: dict[str, TaskEventLog] = {}
+        self.sse_queue_size = sse_queue_size
+        self.sse_overflow_policy = sse_overflow_policy
+        self.event_log_size = event_log_size
+        # Task state and subscriber lists are guarded by lock stripes keyed on
+        # the task id, so updates to independent tasks never wait on each
+        # other.
+        self._task_locks = [asyncio.Lock() for _ in range(lock_stripes)]
+        self._subscriber_locks = [
+            asyncio.Lock() for _ in range(lock_stripes)
+        ]
+        self.retention = retention or RetentionPolicy()
+        self.retention_stats = RetentionStats()
+        # Terminal tasks ordered by when they finished, for TTL expiry, and
+        # from least to most recently used, for LRU and byte-budget eviction.
+        self._terminal_since: dict[str, float] = {}
+        self._terminal_lru: OrderedDict[str, None] = OrderedDict()
+        self._task_sizes: dict[str, int] = {}
+        self._total_task_bytes = 0
+        self._retention_sweeper: asyncio.Task | None = None
+        self.cancel_grace_period = cancel_grace_period
+        # Agent coroutines per task id, with the time they were started.
+        self.running_agent_tasks: dict[str, tuple[asyncio.Task, float]] = {}
+        self.cancel_stats: dict[str, float] = {
+            'canceled': 0,
+            'not_cancelable': 0,
+            'agents_stopped': 0,
+            'agents_unresponsive': 0,
+            'stop_latency_seconds': 0.0,
+            'agent_runtime_seconds': 0.0,
+        }
+
+    def task_lock(self, task_id: str) -> asyncio.Lock:
+        """Returns the lock guarding the stored state of the given task."""
+        return self._task_locks[hash(task_id) % len(self._task_locks)]
+
+    def subscriber_lock(self, task_id: str) -> asyncio.Lock:
+        """Returns the lock guarding the SSE subscribers of the given task."""
+        return self._subscriber_locks[
+            hash(task_id) % len(self._subscriber_locks)
+        ]
 
     async def on_get_task(self, request: GetTaskRequest) -> GetTaskResponse:
         logger.info(f'Getting task {request.params.id}')
         task_query_params: TaskQueryParams = request.params
 
-        async with self.lock:
+        async with self.task_lock(task_query_params.id):
             task = self.tasks.get(task_query_params.id)
             if task is None:
                 return GetTaskResponse(id=request.id, error=TaskNotFoundError())
+            self._touch_task(task_query_params.id)
 
             task_result = self.append_task_history(
                 task, task_query_params.historyLength
@@ -106,17 +174,98 @@ class InMemoryTaskManager(TaskManager):
     async def on_cancel_task(
         self, request: CancelTaskRequest
     ) -> CancelTaskResponse:
+        """Cancels a task and stops the agent coroutine working on it.
+
+        The agent task registered with `track_agent_task` is cancelled and
+        given `cancel_grace_period` seconds to unwind. SSE subscribers then
+        receive a final canceled status, which ends their streams and
+        releases their queues. A task that reached a terminal state while
+        its agent was unwinding keeps that state and is reported as not
+        cancelable.
+        """
         logger.info(f'Cancelling task {request.params.id}')
         task_id_params: TaskIdParams = request.params
+        task_id = task_id_params.id
 
-        async with self.lock:
-            task = self.tasks.get(task_id_params.id)
+        async with self.task_lock(task_id):
+            task = self.tasks.get(task_id)
             if task is None:
                 return CancelTaskResponse(
                     id=request.id, error=TaskNotFoundError()
                 )
+            if task.status.state in TERMINAL_STATES:
+                self.cancel_stats['not_cancelable'] += 1
+                return CancelTaskResponse(
+                    id=request.id, error=TaskNotCancelableError()
+                )
 
-        return CancelTaskResponse(id=request.id, error=TaskNotCancelableError())
+        await self._stop_agent_task(task_id)
+
+        status = TaskStatus(state=TaskState.CANCELED)
+        # Checked again under the same lock as the write, the agent may have
+        # finished the task while it was being stopped.
+        async with self.task_lock(task_id):
+            task = self.tasks.get(task_id)
+            if task is None:
+                return CancelTaskResponse(
+                    id=request.id, error=TaskNotFoundError()
+                )
+            if task.status.state in TERMINAL_STATES:
+                self.cancel_stats['not_cancelable'] += 1
+                return CancelTaskResponse(
+                    id=request.id, error=TaskNotCancelableError()
+                )
+            task = self._update_task(task_id, status, None)
+        await self.enqueue_events_for_sse(
+            task_id, TaskStatusUpdateEvent(id=task_id, status=status, final=True)
+        )
+        self.cancel_stats['canceled'] += 1
+        return CancelTaskResponse(
+            id=request.id, result=self.append_task_history(task, None)
+        )
+
+    def track_agent_task(
+        self, task_id: str, coro: Coroutine[Any, Any, Any]
+    ) -> asyncio.Task:
+        """Runs coro as the agent work for task_id, so it can be cancelled."""
+        agent_task = asyncio.create_task(coro)
+        self.running_agent_tasks[task_id] = (agent_task, time.monotonic())
+
+        def _untrack(done: asyncio.Task):
+            entry = self.running_agent_tasks.get(task_id)
+            if entry is not None and entry[0] is done:
+                del self.running_agent_tasks[task_id]
+
+        agent_task.add_done_callback(_untrack)
+        return agent_task
+
+    async def _stop_agent_task(self, task_id: str):
+        entry = self.running_agent_tasks.get(task_id)
+        if entry is None:
+            return
+        agent_task, started_at = entry
+        if agent_task.done():
+            return
+
+        cancel_requested_at = time.monotonic()
+        agent_task.cancel()
+        done, _ = await asyncio.wait(
+            {agent_task}, timeout=self.cancel_grace_period
+        )
+        if done:
+            self.cancel_stats['agents_stopped'] += 1
+        else:
+            self.cancel_stats['agents_unresponsive'] += 1
+            logger.warning(
+                f'Agent for task {task_id} did not stop within '
+                f'{self.cancel_grace_period}s of being cancelled'
+            )
+        self.cancel_stats['stop_latency_seconds'] += (
+            time.monotonic() - cancel_requested_at
+        )
+        self.cancel_stats['agent_runtime_seconds'] += (
+            cancel_requested_at - started_at
+        )
 
     @abstractmethod
     async def on_send_task(self, request: SendTaskRequest) -> SendTaskResponse:
@@ -125,13 +274,16 @@ class InMemoryTaskManager(TaskManager):
     @abstractmethod
     async def on_send_task_subscribe(
         self, request: SendTaskStreamingRequest
-    ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
+    ) -> (
+        AsyncIterable[SendTaskStreamingResponse | SSEResponse]
+        | JSONRPCResponse
+    ):
         pass
 
     async def set_push_notification_info(
         self, task_id: str, notification_config: PushNotificationConfig
     ):
-        async with self.lock:
+        async with self.task_lock(task_id):
             task = self.tasks.get(task_id)
             if task is None:
                 raise ValueError(f'Task not found for {task_id}')
@@ -141,7 +293,7 @@ class InMemoryTaskManager(TaskManager):
     async def get_push_notification_info(
         self, task_id: str
     ) -> PushNotificationConfig:
-        async with self.lock:
+        async with self.task_lock(task_id):
             task = self.tasks.get(task_id)
             if task is None:
                 raise ValueError(f'Task not found for {task_id}')
@@ -149,7 +301,7 @@ class InMemoryTaskManager(TaskManager):
             return self.push_notification_infos[task_id]
 
     async def has_push_notification_info(self, task_id: str) -> bool:
-        async with self.lock:
+        async with self.task_lock(task_id):
             return task_id in self.push_notification_infos
 
     async def on_set_task_push_notification(
@@ -204,7 +356,7 @@ class InMemoryTaskManager(TaskManager):
 
     async def upsert_task(self, task_send_params: TaskSendParams) -> Task:
         logger.info(f'Upserting task {task_send_params.id}')
-        async with self.lock:
+        async with self.task_lock(task_send_params.id):
             task = self.tasks.get(task_send_params.id)
             if task is None:
                 task = Task(
@@ -217,35 +369,187 @@ class InMemoryTaskManager(TaskManager):
                 self.tasks[task_send_params.id] = task
             else:
                 task.history.append(task_send_params.message)
+                self._touch_task(task_send_params.id)
+            self._add_task_bytes(task_send_params.id, task_send_params.message)
 
-            return task
+        self._ensure_retention_sweeper()
+        if (
+            self.retention.max_tasks is not None
+            and len(self.tasks) > self.retention.max_tasks
+        ):
+            await self.enforce_retention()
+        return task
 
     async def on_resubscribe_to_task(
         self, request: TaskResubscriptionRequest
-    ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
-        return new_not_implemented_error(request.id)
+    ) -> AsyncIterable[SSEResponse] | JSONRPCResponse:
+        """Reconnects a client to a task's event stream.
+
+        The id of the last event the client received is read from the
+        `lastEventId` metadata field, which A2AServer fills in from the
+        `Last-Event-ID` header. Only the events after it are replayed before
+        switching to live events.
+        """
+        task_id_params: TaskIdParams = request.params
+        logger.info(f'Resubscribing to task {task_id_params.id}')
+        metadata = task_id_params.metadata or {}
+        try:
+            last_event_id = int(metadata.get('lastEventId') or 0)
+        except (TypeError, ValueError):
+            return JSONRPCResponse(
+                id=request.id,
+                error=InvalidParamsError(message='Invalid lastEventId'),
+            )
+
+        try:
+            sse_event_queue, missed_events = await self.setup_sse_resubscriber(
+                task_id_params.id, last_event_id
+            )
+        except ValueError as e:
+            logger.error(f'Error while reconnecting to SSE stream: {e}')
+            return JSONRPCResponse(id=request.id, error=TaskNotFoundError())
+
+        return self.dequeue_events_for_sse(
+            request.id, task_id_params.id, sse_event_queue, missed_events
+        )
 
     async def update_store(
         self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
     ) -> Task:
-        async with self.lock:
-            try:
-                task = self.tasks[task_id]
-            except KeyError:
+        async with self.task_lock(task_id):
+            if task_id not in self.tasks:
                 logger.error(f'Task {task_id} not found for updating the task')
                 raise ValueError(f'Task {task_id} not found')
+            return self._update_task(task_id, status, artifacts)
 
-            task.status = status
+    def _update_task(
+        self, task_id: str, status: TaskStatus, artifacts: list[Artifact]
+    ) -> Task:
+        """Applies an update to a stored task, with its task lock held."""
+        task = self.tasks[task_id]
+        task.status = status
+        self.tasks.move_to_end(task_id)
+        self._terminal_since.pop(task_id, None)
+        self._terminal_lru.pop(task_id, None)
+        if status.state in TERMINAL_STATES:
+            self._mark_terminal(task_id)
+
+        if status.message is not None:
+            task.history.append(status.message)
+            self._add_task_bytes(task_id, status.message)
+
+        if artifacts is not None:
+            if task.artifacts is None:
+                task.artifacts = []
+            task.artifacts.extend(artifacts)
+            for artifact in artifacts:
+                self._add_task_bytes(task_id, artifact)
+
+        return task
+
+    def _touch_task(self, task_id: str):
+        self.tasks.move_to_end(task_id)
+        if task_id in self._terminal_lru:
+            self._terminal_lru.move_to_end(task_id)
+
+    def _mark_terminal(self, task_id: str):
+        self._terminal_since[task_id] = time.monotonic()
+        self._terminal_lru[task_id] = None
+
+    def _add_task_bytes(self, task_id: str, item: Message | Artifact):
+        if self.retention.max_bytes is None:
+            return
+        size = len(item.model_dump_json(exclude_none=True))
+        self._task_sizes[task_id] = self._task_sizes.get(task_id, 0) + size
+        self._total_task_bytes += size
+
+    def _ensure_retention_sweeper(self):
+        if self.retention.terminal_ttl is None and (
+            self.retention.max_bytes is None
+        ):
+            # Nothing to sweep for; max_tasks is enforced on insert.
+            return
+        if self._retention_sweeper is None or self._retention_sweeper.done():
+            self._retention_sweeper = asyncio.get_running_loop().create_task(
+                self._run_retention_sweeper()
+            )
 
-            if status.message is not None:
-                task.history.append(status.message)
+    async def _run_retention_sweeper(self):
+        while True:
+            await asyncio.sleep(self.retention.sweep_interval)
+            try:
+                await self.enforce_retention()
+            except Exception as e:
+                logger.error(f'Error while enforcing task retention: {e}')
+
+    async def stop_retention_sweeper(self):
+        if self._retention_sweeper is not None:
+            self._retention_sweeper.cancel()
+            self._retention_sweeper = None
+
+    async def close(self):
+        """Stops the manager's background work."""
+        await self.stop_retention_sweeper()
+
+    async def enforce_retention(self):
+        """Evicts terminal tasks that exceed the TTL, count or byte limits."""
+        self.retention_stats.sweeps += 1
+
+        if self.retention.terminal_ttl is not None:
+            deadline = time.monotonic() - self.retention.terminal_ttl
+            expired = []
+            for task_id, finished_at in self._terminal_since.items():
+                if finished_at > deadline:
+                    break
+                expired.append(task_id)
+            for task_id in expired:
+                await self.evict_task(task_id, 'ttl')
+
+        if (
+            self.retention.max_tasks is not None
+            and len(self.tasks) > self.retention.max_tasks
+        ):
+            excess = len(self.tasks) - self.retention.max_tasks
+            for task_id in self._lru_terminal_tasks(excess):
+                await self.evict_task(task_id, 'lru')
+
+        if self.retention.max_bytes is not None:
+            while self._total_task_bytes > self.retention.max_bytes:
+                candidates = self._lru_terminal_tasks(1)
+                if not candidates:
+                    break
+                await self.evict_task(candidates[0], 'bytes')
 
-            if artifacts is not None:
-                if task.artifacts is None:
-                    task.artifacts = []
-                task.artifacts.extend(artifacts)
+    def _lru_terminal_tasks(self, count: int) -> list[str]:
+        return list(itertools.islice(self._terminal_lru, count))
 
-            return task
+    async def evict_task(self, task_id: str, reason: str = 'manual'):
+        """Drops a task and everything stored alongside it."""
+        async with self.task_lock(task_id):
+            if self.tasks.pop(task_id, None) is None:
+                return
+            self.push_notification_infos.pop(task_id, None)
+            self._terminal_since.pop(task_id, None)
+            self._terminal_lru.pop(task_id, None)
+            size = self._task_sizes.pop(task_id, 0)
+            self._total_task_bytes -= size
+
+        async with self.subscriber_lock(task_id):
+            self.task_event_logs.pop(task_id, None)
+            if not self.task_sse_subscribers.get(task_id):
+                self.task_sse_subscribers.pop(task_id, None)
+
+        logger.info(f'Evicted task {task_id} ({reason})')
+        self.retention_stats.record(reason, size)
+
+    def get_retention_stats(self) -> dict[str, Any]:
+        """Returns eviction counters and the current size of the store."""
+        return {
+            **asdict(self.retention_stats),
+            'tasks': len(self.tasks),
+            'terminal_tasks': len(self._terminal_since),
+            'tracked_bytes': self._total_task_bytes,
+        }
 
     def append_task_history(self, task: Task, historyLength: int | None):
         new_task = task.model_copy()
@@ -259,39 +563,125 @@ class InMemoryTaskManager(TaskManager):
     async def setup_sse_consumer(
         self, task_id: str, is_resubscribe: bool = False
     ):
-        async with self.subscriber_lock:
+        async with self.subscriber_lock(task_id):
             if task_id not in self.task_sse_subscribers:
                 if is_resubscribe:
                     raise ValueError('Task not found for resubscription')
                 self.task_sse_subscribers[task_id] = []
 
-            sse_event_queue = asyncio.Queue(maxsize=0)  # <=0 is unlimited
+            sse_event_queue = SubscriberQueue(
+                maxsize=self.sse_queue_size, policy=self.sse_overflow_policy
+            )
             self.task_sse_subscribers[task_id].append(sse_event_queue)
             return sse_event_queue
 
-    async def enqueue_events_for_sse(self, task_id, task_update_event):
-        async with self.subscriber_lock:
-            if task_id not in self.task_sse_subscribers:
-                return
+    async def setup_sse_resubscriber(
+        self, task_id: str, last_event_id: int
+    ) -> tuple[SubscriberQueue | None, list[LoggedEvent]]:
+        """Returns a live queue and the logged events after last_event_id.
+
+        Both are taken under the subscriber lock, so no event is missed or
+        delivered twice between the replay and the live stream. The queue is
+        None when the stream has already ended.
+        """
+        async with self.subscriber_lock(task_id):
+            event_log = self.task_event_logs.get(task_id)
+            task = self.tasks.get(task_id)
+            if event_log is None and task is None:
+                raise ValueError('Task not found for resubscription')
+
+            if event_log is None and task.status.state in TERMINAL_STATES:
+                # Nothing was ever streamed for this task, report where it
+                # ended instead of waiting for events that will not come.
+                final_event = TaskStatusUpdateEvent(
+                    id=task_id, status=task.status, final=True
+                )
+                return None, [LoggedEvent.from_event(final_event)]
+
+            missed_events = []
+            if event_log is not None:
+                if not event_log.is_complete_since(last_event_id):
+                    logger.warning(
+                        f'Events after {last_event_id} for task {task_id} are '
+                        'no longer retained, replaying the remaining ones'
+                    )
+                missed_events = event_log.since(last_event_id)
+                if event_log.closed:
+                    return None, missed_events
+
+            sse_event_queue = SubscriberQueue(
+                maxsize=self.sse_queue_size, policy=self.sse_overflow_policy
+            )
+            self.task_sse_subscribers.setdefault(task_id, []).append(
+                sse_event_queue
+            )
+            return sse_event_queue, missed_events
+
+    async def enqueue_events_for_sse(
+        self, task_id, task_update_event
+    ) -> LoggedEvent:
+        """Records an event in the task's log and sends it to subscribers."""
+        async with self.subscriber_lock(task_id):
+            event_log = self.task_event_logs.get(task_id)
+            if event_log is None:
+                event_log = TaskEventLog(maxlen=self.event_log_size)
+                self.task_event_logs[task_id] = event_log
+            logged_event = event_log.append(task_update_event)
+
+            # Snapshot the subscribers so the fan-out happens outside the lock.
+            current_subscribers = list(
+                self.task_sse_subscribers.get(task_id, [])
+            )
 
-            current_subscribers = self.task_sse_subscribers[task_id]
-            for subscriber in current_subscribers:
-                await subscriber.put(task_update_event)
+        # Never blocks: a full queue applies its overflow policy instead of
+        # making the other subscribers wait.
+        for subscriber in current_subscribers:
+            subscriber.put_nowait(logged_event)
+        return logged_event
+
+    async def get_subscriber_stats(
+        self, task_id: str | None = None
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Returns lag and drop counters for the SSE subscribers of each task."""
+        task_ids = (
+            [task_id] if task_id is not None else list(self.task_sse_subscribers)
+        )
+        stats = {}
+        for tid in task_ids:
+            async with self.subscriber_lock(tid):
+                subscribers = self.task_sse_subscribers.get(tid, [])
+                stats[tid] = [subscriber.stats() for subscriber in subscribers]
+        return stats
 
     async def dequeue_events_for_sse(
-        self, request_id, task_id, sse_event_queue: asyncio.Queue
-    ) -> AsyncIterable[SendTaskStreamingResponse] | JSONRPCResponse:
+        self,
+        request_id,
+        task_id,
+        sse_event_queue: SubscriberQueue | None,
+        replay_events: list[LoggedEvent] | None = None,
+    ) -> AsyncIterable[SSEResponse] | JSONRPCResponse:
+        encoder = SSEFrameEncoder(request_id)
         try:
-            while True:
-                event = await sse_event_queue.get()
-                if isinstance(event, JSONRPCError):
-                    yield SendTaskStreamingResponse(id=request_id, error=event)
-                    break
+            for logged_event in replay_events or []:
+                yield encoder.encode(logged_event)
+                if logged_event.is_terminal:
+                    return
 
-                yield SendTaskStreamingResponse(id=request_id, result=event)
-                if isinstance(event, TaskStatusUpdateEvent) and event.final:
+            if sse_event_queue is None:
+                return
+
+            while True:
+                logged_event = await sse_event_queue.get()
+                yield encoder.encode(logged_event)
+                if logged_event.is_terminal:
                     break
         finally:
-            async with self.subscriber_lock:
-                if task_id in self.task_sse_subscribers:
-                    self.task_sse_subscribers[task_id].remove(sse_event_queue)
+            if sse_event_queue is not None:
+                async with self.subscriber_lock(task_id):
+                    subscribers = self.task_sse_subscribers.get(task_id, [])
+                    if sse_event_queue in subscribers:
+                        subscribers.remove(sse_event_queue)
+                    event_log = self.task_event_logs.get(task_id)
+                    if not subscribers and event_log and event_log.closed:
+                        # The stream has ended, nothing will be fanned out.
+                        self.task_sse_subscribers.pop(task_id, None)
@@ -0,0 +1,202 @@
+"""Async agent card cache with HTTP revalidation."""
+
+import asyncio
+import copy
+import logging
+import re
+import time
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+@dataclass
+class _CardEntry:
+    card: Any
+    etag: str | None
+    fetched_at: float
+    ttl: float
+
+
+class AgentCardCache:
+    """Caches agent cards in process, keyed by card URL.
+
+    A card younger than its TTL is served without any request. The TTL is
+    the `max-age` the agent sent in Cache-Control, or `ttl` otherwise. An
+    expired card is revalidated with If-None-Match, so an unchanged card
+    costs a 304 and no parsing. For `stale_while_revalidate` seconds past
+    its TTL an expired card is still served immediately while it is
+    revalidated in the background, unless the caller has closed its client
+    by then, in which case the next lookup revalidates it. Concurrent
+    lookups of the same URL share a single fetch. Every caller gets its own
+    deep copy of the card, so changing it does not alter the cached one.
+    """
+
+    def __init__(
+        self,
+        parse: Callable[[bytes], Any],
+        ttl: float = 300,
+        stale_while_revalidate: float = 3600,
+    ):
+        self.parse = parse
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self._entries: dict[str, _CardEntry] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'not_modified': 0,
+            'fetches': 0,
+            'errors': 0,
+            'skipped_refreshes': 0,
+        }
+
+    async def get(
+        self, url: str, httpx_client: httpx.AsyncClient | None = None
+    ) -> Any:
+        """Returns the card at `url`, fetching it only when needed."""
+        return copy.deepcopy(await self._get(url, httpx_client))
+
+    async def _get(
+        self, url: str, httpx_client: httpx.AsyncClient | None
+    ) -> Any:
+        entry = self._entries.get(url)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < entry.ttl:
+                self.stats['hits'] += 1
+                return entry.card
+            if age < entry.ttl + self.stale_while_revalidate:
+                self.stats['stale_hits'] += 1
+                # Failures are logged and the stale card kept, so nobody
+                # needs to wait on the background fetch.
+                self._fetch(
+                    url, httpx_client, background=True
+                ).add_done_callback(lambda t: t.cancelled() or t.exception())
+                return entry.card
+        self.stats['misses'] += 1
+        # Shielded so that a caller giving up does not cancel the fetch
+        # other callers are waiting on.
+        return await asyncio.shield(self._fetch(url, httpx_client))
+
+    def get_sync(
+        self, url: str, httpx_client: httpx.Client | None = None
+    ) -> Any:
+        """Like `get`, for callers that cannot await.
+
+        With no event loop to refresh it in the background, an expired card
+        is revalidated before it is returned.
+        """
+        entry = self._entries.get(url)
+        if (
+            entry is not None
+            and time.monotonic() - entry.fetched_at < entry.ttl
+        ):
+            self.stats['hits'] += 1
+            return copy.deepcopy(entry.card)
+        self.stats['misses'] += 1
+        try:
+            headers = self._request_headers(entry)
+            if httpx_client is None:
+                with httpx.Client() as client:
+                    response = client.get(url, headers=headers)
+            else:
+                response = httpx_client.get(url, headers=headers)
+            card = self._update(url, entry, response)
+        except Exception as e:
+            self._fetch_failed(url, e)
+            raise
+        return copy.deepcopy(card)
+
+    def invalidate(self, url: str | None = None):
+        """Drops the cached card for `url`, or every card if not given."""
+        if url is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(url, None)
+
+    def _fetch(
+        self,
+        url: str,
+        httpx_client: httpx.AsyncClient | None,
+        background: bool = False,
+    ) -> asyncio.Task:
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(
+                self._revalidate(url, httpx_client, background)
+            )
+            self._inflight[url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(url, None))
+        return task
+
+    async def _revalidate(
+        self,
+        url: str,
+        httpx_client: httpx.AsyncClient | None,
+        background: bool = False,
+    ) -> Any:
+        entry = self._entries.get(url)
+        if (
+            background
+            and entry is not None
+            and httpx_client is not None
+            and httpx_client.is_closed
+        ):
+            # The caller closed its client as soon as it had the stale card.
+            self.stats['skipped_refreshes'] += 1
+            return entry.card
+        try:
+            headers = self._request_headers(entry)
+            if httpx_client is None:
+                async with httpx.AsyncClient() as client:
+                    response = await client.get(url, headers=headers)
+            else:
+                response = await httpx_client.get(url, headers=headers)
+            return self._update(url, entry, response)
+        except Exception as e:
+            self._fetch_failed(url, e)
+            raise
+
+    def _request_headers(self, entry: _CardEntry | None) -> dict[str, str]:
+        self.stats['fetches'] += 1
+        if entry is not None and entry.etag:
+            return {'If-None-Match': entry.etag}
+        return {}
+
+    def _update(
+        self, url: str, entry: _CardEntry | None, response: httpx.Response
+    ) -> Any:
+        """Caches the card in `response`, or renews `entry` on a 304."""
+        if response.status_code == 304 and entry is not None:
+            self.stats['not_modified'] += 1
+            entry.fetched_at = time.monotonic()
+            entry.ttl = self._ttl(response)
+            return entry.card
+        response.raise_for_status()
+        card = self.parse(response.content)
+        self._entries[url] = _CardEntry(
+            card=card,
+            etag=response.headers.get('etag'),
+            fetched_at=time.monotonic(),
+            ttl=self._ttl(response),
+        )
+        return card
+
+    def _fetch_failed(self, url: str, error: Exception):
+        self.stats['errors'] += 1
+        logger.warning(f'Failed to fetch agent card from {url}: {error}')
+
+    def _ttl(self, response: httpx.Response) -> float:
+        match = _MAX_AGE.search(response.headers.get('cache-control', ''))
+        return float(match.group(1)) if match else self.ttl
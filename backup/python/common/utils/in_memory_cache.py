@@ -1,21 +1,599 @@
 """In Memory Cache utility."""
 
+import asyncio
+import itertools
+import logging
+import sys
 import threading
 import time
 
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, fields
+from enum import Enum
 from typing import Any, Optional
 
 
-class InMemoryCache:
+logger = logging.getLogger(__name__)
+
+DEFAULT_NAMESPACE = 'default'
+
+# Returned by lookups of missing keys, since None is a valid cached value.
+_MISSING = object()
+
+# Orders accesses across all stripes, for cache-wide eviction. next() on a
+# count is atomic under the GIL.
+_access_ticks = itertools.count()
+
+
+class EvictionPolicy(str, Enum):
+    """Which entry is evicted first when the cache is full."""
+
+    LRU = 'lru'
+    LFU = 'lfu'
+
+
+@dataclass
+class CacheStats:
+    """Counters for one namespace of the cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    coalesced: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    def add(self, other: 'CacheStats'):
+        for field in fields(self):
+            setattr(
+                self,
+                field.name,
+                getattr(self, field.name) + getattr(other, field.name),
+            )
+
+
+def estimate_size(value: Any) -> int:
+    """Approximates the memory held by a value, in bytes.
+
+    Strings and bytes count their length, containers and objects the sum
+    of their items and attributes. This is cheap and close enough for the
+    large payloads that matter, such as base64 encoded images.
+    """
+    seen = set()
+    stack = [value]
+    size = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if isinstance(item, str | bytes | bytearray | memoryview):
+            size += len(item)
+        elif isinstance(item, dict):
+            size += sys.getsizeof(item)
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, list | tuple | set | frozenset):
+            size += sys.getsizeof(item)
+            stack.extend(item)
+        elif hasattr(item, '__dict__'):
+            size += sys.getsizeof(item)
+            stack.append(vars(item))
+        else:
+            size += sys.getsizeof(item)
+    return size
+
+
+class _Entry:
+    __slots__ = ('expires_at', 'frequency', 'size', 'tick', 'value')
+
+    def __init__(self, value: Any, size: int, expires_at: float | None):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.frequency = 1
+        self.tick = next(_access_ticks)
+
+
+class _Flight:
+    """A computation of a missing value that other callers wait on."""
+
+    __slots__ = ('done', 'error', 'value')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: BaseException | None = None
+
+
+class _Store:
+    """One stripe of the cache: entries, eviction order and statistics.
+
+    Keys are (namespace, key) pairs. LRU order is kept by the entries'
+    OrderedDict. LFU order is kept by buckets of keys per access frequency,
+    each in LRU order, so both policies find their victim in constant time.
+    Limits are enforced by the cache across stripes, using `victim` to
+    compare the stripes' candidates. Everything is guarded by the stripe's
+    lock, which callers hold.
+    """
+
+    def __init__(self, policy: EvictionPolicy):
+        self.lock = threading.Lock()
+        self.policy = EvictionPolicy(policy)
+        self.entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self.bytes = 0
+        self.stats: dict[str, CacheStats] = {}
+        self.flights: dict[tuple[str, str], _Flight] = {}
+        self.async_flights: dict[tuple[str, str], asyncio.Future] = {}
+        self._buckets: dict[int, OrderedDict[tuple[str, str], None]] = {}
+        self._min_frequency = 0
+
+    def _stats(self, namespace: str) -> CacheStats:
+        stats = self.stats.get(namespace)
+        if stats is None:
+            stats = self.stats[namespace] = CacheStats()
+        return stats
+
+    def get(self, key: tuple[str, str], now: float) -> _Entry | None:
+        stats = self._stats(key[0])
+        entry = self.entries.get(key)
+        if entry is None:
+            stats.misses += 1
+            return None
+        if entry.expires_at is not None and now >= entry.expires_at:
+            self._remove(key)
+            stats.expirations += 1
+            stats.misses += 1
+            return None
+        stats.hits += 1
+        self._touch(key, entry)
+        return entry
+
+    def set(self, key: tuple[str, str], entry: _Entry):
+        self.remove(key)
+        stats = self._stats(key[0])
+        self.entries[key] = entry
+        self.bytes += entry.size
+        stats.entries += 1
+        stats.bytes += entry.size
+        if self.policy == EvictionPolicy.LFU:
+            self._buckets.setdefault(1, OrderedDict())[key] = None
+            self._min_frequency = 1
+
+    def remove(self, key: tuple[str, str]) -> bool:
+        if key not in self.entries:
+            return False
+        self._remove(key)
+        return True
+
+    def _remove(self, key: tuple[str, str]):
+        entry = self.entries.pop(key)
+        self.bytes -= entry.size
+        stats = self._stats(key[0])
+        stats.entries -= 1
+        stats.bytes -= entry.size
+        if self.policy == EvictionPolicy.LFU:
+            bucket = self._buckets[entry.frequency]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[entry.frequency]
+
+    def _touch(self, key: tuple[str, str], entry: _Entry):
+        entry.tick = next(_access_ticks)
+        if self.policy == EvictionPolicy.LRU:
+            self.entries.move_to_end(key)
+            return
+        bucket = self._buckets[entry.frequency]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[entry.frequency]
+            if self._min_frequency == entry.frequency:
+                self._min_frequency += 1
+        entry.frequency += 1
+        self._buckets.setdefault(entry.frequency, OrderedDict())[key] = None
+
+    def _candidates(self):
+        """Yields the keys in eviction order."""
+        if self.policy == EvictionPolicy.LRU:
+            yield from self.entries
+            return
+        if self._min_frequency not in self._buckets:
+            self._min_frequency = min(self._buckets)
+        yield from self._buckets[self._min_frequency]
+        for frequency in sorted(self._buckets):
+            if frequency != self._min_frequency:
+                yield from self._buckets[frequency]
+
+    def victim(
+        self, keep: tuple[str, str] | None = None
+    ) -> tuple[tuple[str, str], tuple[int, int]] | None:
+        """Returns the next key to evict other than `keep`, and its rank.
+
+        Ranks of different stripes compare, the lowest one is evicted first.
+        """
+        if not self.entries:
+            return None
+        for key in self._candidates():
+            if key != keep:
+                entry = self.entries[key]
+                if self.policy == EvictionPolicy.LRU:
+                    return key, (0, entry.tick)
+                return key, (entry.frequency, entry.tick)
+        return None
+
+    def evict(self, key: tuple[str, str]) -> bool:
+        if key not in self.entries:
+            return False
+        self._remove(key)
+        self._stats(key[0]).evictions += 1
+        return True
+
+    def sweep(self, now: float) -> int:
+        expired = [
+            key
+            for key, entry in self.entries.items()
+            if entry.expires_at is not None and now >= entry.expires_at
+        ]
+        for key in expired:
+            self._remove(key)
+            self._stats(key[0]).expirations += 1
+        return len(expired)
+
+    def clear(self, namespace: str | None = None):
+        if namespace is None:
+            self.entries.clear()
+            self._buckets.clear()
+            self.bytes = 0
+            for stats in self.stats.values():
+                stats.entries = 0
+                stats.bytes = 0
+            return
+        for key in [key for key in self.entries if key[0] == namespace]:
+            self._remove(key)
+
+
+class CacheNamespace:
+    """A view of the cache whose keys and statistics are kept apart.
+
+    It has the same API as the cache, with `clear` only removing the
+    namespace's own entries.
+    """
+
+    def __init__(self, cache: 'BaseCache', name: str):
+        self._cache = cache
+        self.name = name
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int | None = None,
+        size: int | None = None,
+    ) -> None:
+        self._cache._set(self.name, key, value, ttl, size)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._cache._get(self.name, key, default)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: int | None = None,
+        negative_ttl: int | None = None,
+    ) -> Any:
+        return self._cache._get_or_compute(
+            self.name, key, compute, ttl, negative_ttl
+        )
+
+    async def aget_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int | None = None,
+        negative_ttl: int | None = None,
+    ) -> Any:
+        return await self._cache._aget_or_compute(
+            self.name, key, compute, ttl, negative_ttl
+        )
+
+    def delete(self, key: str) -> bool:
+        return self._cache._delete(self.name, key)
+
+    def clear(self) -> bool:
+        return self._cache._clear(self.name)
+
+    def stats(self) -> CacheStats:
+        return self._cache.stats().get(self.name, CacheStats())
+
+
+class BaseCache(ABC):
+    """The API shared by cache backends.
+
+    Backends store values by (namespace, key) and provide the hooks used
+    by `get_or_compute` to coalesce concurrent computations: a lock and
+    the in-flight computations for a key, and a lookup made under that
+    lock.
+    """
+
+    def namespace(self, name: str) -> CacheNamespace:
+        """Returns a view of the cache for the given namespace."""
+        return CacheNamespace(self, name)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int | None = None,
+        size: int | None = None,
+    ) -> None:
+        """Set a key-value pair.
+
+        Args:
+            key: The key for the data.
+            value: The data to store.
+            ttl: Time to live in seconds. If None, data will not expire.
+            size: Size of the value in bytes. Estimated if not given.
+        """
+        self._set(DEFAULT_NAMESPACE, key, value, ttl, size)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get the value associated with a key.
+
+        Args:
+            key: The key for the data within the session.
+            default: The value to return if the session or key is not found.
+
+        Returns:
+            The cached value, or the default value if not found.
+        """
+        return self._get(DEFAULT_NAMESPACE, key, default)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: int | None = None,
+        negative_ttl: int | None = None,
+    ) -> Any:
+        """Get the value of a key, computing and caching it if missing.
+
+        Concurrent calls for the same missing key share one call of
+        `compute`: the first caller runs it and the others wait for its
+        result, or its exception. Exceptions are not cached.
+
+        Args:
+            key: The key for the data.
+            compute: Returns the value of the key.
+            ttl: Time to live of the computed value in seconds.
+            negative_ttl: Time to live of a None result in seconds. If None,
+                None results are not cached.
+
+        Returns:
+            The cached or computed value.
+        """
+        return self._get_or_compute(
+            DEFAULT_NAMESPACE, key, compute, ttl, negative_ttl
+        )
+
+    async def aget_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int | None = None,
+        negative_ttl: int | None = None,
+    ) -> Any:
+        """Async version of `get_or_compute` for coroutine computations.
+
+        Concurrent callers on the same event loop share one computation.
+        """
+        return await self._aget_or_compute(
+            DEFAULT_NAMESPACE, key, compute, ttl, negative_ttl
+        )
+
+    def delete(self, key: str) -> bool:
+        """Delete a specific key-value pair from a cache.
+
+        Args:
+            key: The key to delete.
+
+        Returns:
+            True if the key was found and deleted, False otherwise.
+        """
+        return self._delete(DEFAULT_NAMESPACE, key)
+
+    def clear(self) -> bool:
+        """Remove all data, in every namespace.
+
+        Returns:
+            True if the data was cleared, False otherwise.
+        """
+        return self._clear(None)
+
+    @abstractmethod
+    def stats(self) -> dict[str, CacheStats]:
+        """Returns a snapshot of the statistics of every namespace."""
+
+    @abstractmethod
+    def _set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        ttl: int | None,
+        size: int | None,
+    ):
+        pass
+
+    @abstractmethod
+    def _get(self, namespace: str, key: str, default: Any) -> Any:
+        pass
+
+    @abstractmethod
+    def _delete(self, namespace: str, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def _clear(self, namespace: str | None) -> bool:
+        pass
+
+    @abstractmethod
+    def _flight_scope(
+        self, cache_key: tuple[str, str]
+    ) -> tuple[
+        threading.Lock,
+        dict[tuple[str, str], _Flight],
+        dict[tuple[str, str], asyncio.Future],
+    ]:
+        pass
+
+    @abstractmethod
+    def _lookup(self, cache_key: tuple[str, str]) -> Any:
+        """Returns the value of a key or _MISSING, under its flight lock."""
+
+    def _record_coalesced(self, cache_key: tuple[str, str]):
+        pass
+
+    def _store_computed(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        ttl: int | None,
+        negative_ttl: int | None,
+    ):
+        if value is not None:
+            self._set(namespace, key, value, ttl, None)
+        elif negative_ttl is not None:
+            self._set(namespace, key, None, negative_ttl, 0)
+
+    def _get_or_compute(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: int | None,
+        negative_ttl: int | None,
+    ) -> Any:
+        cache_key = (namespace, key)
+        lock, flights, _ = self._flight_scope(cache_key)
+        with lock:
+            value = self._lookup(cache_key)
+            if value is not _MISSING:
+                return value
+            flight = flights.get(cache_key)
+            if flight is None:
+                flight = flights[cache_key] = _Flight()
+                leader = True
+            else:
+                self._record_coalesced(cache_key)
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            self._store_computed(
+                namespace, key, flight.value, ttl, negative_ttl
+            )
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with lock:
+                flights.pop(cache_key, None)
+            flight.done.set()
+
+    async def _aget_or_compute(
+        self,
+        namespace: str,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: int | None,
+        negative_ttl: int | None,
+    ) -> Any:
+        cache_key = (namespace, key)
+        lock, _, flights = self._flight_scope(cache_key)
+        loop = asyncio.get_running_loop()
+        while True:
+            with lock:
+                value = self._lookup(cache_key)
+                if value is not _MISSING:
+                    return value
+                future = flights.get(cache_key)
+                if future is None or future.get_loop() is not loop:
+                    future = loop.create_future()
+                    flights[cache_key] = future
+                    break
+                self._record_coalesced(cache_key)
+            try:
+                # Shielded so a waiter being canceled does not cancel the
+                # computation for the others.
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The computing task was canceled, but this one was not:
+                # try again, possibly computing the value itself.
+                if not future.cancelled() or (
+                    asyncio.current_task().cancelling()
+                ):
+                    raise
+
+        try:
+            value = await compute()
+            self._store_computed(namespace, key, value, ttl, negative_ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved in case nobody else was waiting.
+            future.exception()
+            raise
+        finally:
+            with lock:
+                if flights.get(cache_key) is future:
+                    del flights[cache_key]
+
+
+class InMemoryCache(BaseCache):
     """A thread-safe Singleton class to manage cache data.
 
     Ensures only one instance of the cache exists across the application.
+
+    The cache holds at most `max_entries` entries and `max_bytes` bytes of
+    estimated value size, evicting in LRU or LFU order beyond either limit.
+    Entries with a TTL are removed when read after expiring, and by a
+    background sweeper every `sweep_interval` seconds. Use `configure` to
+    change these limits, and `namespace` to get a view with its own keys
+    and statistics.
+
+    Keys are spread over `stripes` independently locked stripes, so
+    unrelated reads and writes do not contend. Both limits apply to the
+    whole cache: while either is exceeded, the stripes' next victims are
+    compared and the least recently (or frequently) used one is evicted,
+    so eviction order is cache-wide.
     """
 
     _instance: Optional['InMemoryCache'] = None
     _lock: threading.Lock = threading.Lock()
     _initialized: bool = False
 
+    max_entries: int | None = 10_000
+    max_bytes: int | None = 256 * 1024 * 1024
+    policy: EvictionPolicy = EvictionPolicy.LRU
+    sweep_interval: float = 60.0
+    stripes: int = 16
+
     def __new__(cls):
         """Override __new__ to control instance creation (Singleton pattern).
 
@@ -39,70 +617,179 @@ class InMemoryCache:
         if not self._initialized:
             with self._lock:
                 if not self._initialized:
-                    # print("Initializing SessionCache storage")
-                    self._cache_data: dict[str, dict[str, Any]] = {}
-                    self._ttl: dict[str, float] = {}
-                    self._data_lock: threading.Lock = threading.Lock()
+                    self._stores = [
+                        _Store(self.policy) for _ in range(self.stripes)
+                    ]
+                    self._sweeper: threading.Thread | None = None
+                    self._stop_sweeper = threading.Event()
                     self._initialized = True
 
-    def set(self, key: str, value: Any, ttl: int | None = None) -> None:
-        """Set a key-value pair.
+    def _store_for(self, key: tuple[str, str]) -> _Store:
+        return self._stores[hash(key) % len(self._stores)]
 
-        Args:
-            key: The key for the data.
-            value: The data to store.
-            ttl: Time to live in seconds. If None, data will not expire.
+    def configure(
+        self,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        policy: EvictionPolicy | str | None = None,
+        sweep_interval: float | None = None,
+    ) -> None:
+        """Changes the cache limits, evicting entries that no longer fit.
+
+        Arguments left as None keep their current value. Changing the
+        policy drops the current entries.
         """
-        with self._data_lock:
-            self._cache_data[key] = value
+        if max_entries is not None:
+            self.max_entries = max_entries
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if sweep_interval is not None:
+            self.sweep_interval = sweep_interval
+        policy = EvictionPolicy(policy) if policy is not None else None
+        changed_policy = policy is not None and policy != self.policy
+        if changed_policy:
+            self.policy = policy
+        if changed_policy:
+            for store in self._stores:
+                with store.lock:
+                    store.policy = policy
+                    store.clear()
+        self._evict()
 
-            if ttl is not None:
-                self._ttl[key] = time.time() + ttl
-            elif key in self._ttl:
-                del self._ttl[key]
+    def stats(self) -> dict[str, CacheStats]:
+        """Returns a snapshot of the statistics of every namespace."""
+        totals: dict[str, CacheStats] = {}
+        for store in self._stores:
+            with store.lock:
+                for name, stats in store.stats.items():
+                    totals.setdefault(name, CacheStats()).add(stats)
+        return totals
 
-    def get(self, key: str, default: Any = None) -> Any:
-        """Get the value associated with a key.
+    def _set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        ttl: int | None,
+        size: int | None,
+    ):
+        if size is None:
+            size = estimate_size(value)
+        cache_key = (namespace, key)
+        store = self._store_for(cache_key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.warning(
+                f'Not caching {key!r}: {size} bytes exceeds the cache '
+                f'budget of {self.max_bytes} bytes'
+            )
+            with store.lock:
+                store.remove(cache_key)
+                store._stats(namespace).evictions += 1
+            return
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with store.lock:
+            store.set(cache_key, _Entry(value, size, expires_at))
+        self._evict(keep=cache_key)
+        if ttl is not None:
+            self._ensure_sweeper()
 
-        Args:
-            key: The key for the data within the session.
-            default: The value to return if the session or key is not found.
+    def _excess_entries(self) -> int:
+        if self.max_entries is None:
+            return 0
+        # Reads the stripes' sizes without their locks: a slightly stale
+        # sum only delays eviction until the next write.
+        return sum(len(store.entries) for store in self._stores) - (
+            self.max_entries
+        )
 
-        Returns:
-            The cached value, or the default value if not found.
-        """
-        with self._data_lock:
-            if key in self._ttl and time.time() > self._ttl[key]:
-                del self._cache_data[key]
-                del self._ttl[key]
-                return default
-            return self._cache_data.get(key, default)
-
-    def delete(self, key: str) -> None:
-        """Delete a specific key-value pair from a cache.
+    def _excess_bytes(self) -> int:
+        if self.max_bytes is None:
+            return 0
+        return sum(store.bytes for store in self._stores) - self.max_bytes
 
-        Args:
-            key: The key to delete.
+    def _evict(self, keep: tuple[str, str] | None = None):
+        """Evicts cache-wide until both limits hold, never evicting `keep`."""
+        while self._excess_entries() > 0 or self._excess_bytes() > 0:
+            # Takes one stripe lock at a time, so stripes never wait on each
+            # other while holding a lock.
+            best = None
+            for store in self._stores:
+                with store.lock:
+                    candidate = store.victim(keep)
+                if candidate is not None and (
+                    best is None or candidate[1] < best[1]
+                ):
+                    best = (*candidate, store)
+            if best is None:
+                return
+            key, _, store = best
+            with store.lock:
+                # A concurrent write may have removed it already, the limits
+                # are checked again either way.
+                store.evict(key)
 
-        Returns:
-            True if the key was found and deleted, False otherwise.
-        """
-        with self._data_lock:
-            if key in self._cache_data:
-                del self._cache_data[key]
-                if key in self._ttl:
-                    del self._ttl[key]
-                return True
-            return False
+    def _get(self, namespace: str, key: str, default: Any) -> Any:
+        cache_key = (namespace, key)
+        store = self._store_for(cache_key)
+        with store.lock:
+            entry = store.get(cache_key, time.monotonic())
+        return default if entry is None else entry.value
 
-    def clear(self) -> bool:
-        """Remove all data.
+    def _flight_scope(self, cache_key: tuple[str, str]):
+        store = self._store_for(cache_key)
+        return store.lock, store.flights, store.async_flights
 
-        Returns:
-            True if the data was cleared, False otherwise.
-        """
-        with self._data_lock:
-            self._cache_data.clear()
-            self._ttl.clear()
-            return True
-        return False
+    def _lookup(self, cache_key: tuple[str, str]) -> Any:
+        entry = self._store_for(cache_key).get(cache_key, time.monotonic())
+        return _MISSING if entry is None else entry.value
+
+    def _record_coalesced(self, cache_key: tuple[str, str]):
+        self._store_for(cache_key)._stats(cache_key[0]).coalesced += 1
+
+    def _delete(self, namespace: str, key: str) -> bool:
+        cache_key = (namespace, key)
+        store = self._store_for(cache_key)
+        with store.lock:
+            return store.remove(cache_key)
+
+    def _clear(self, namespace: str | None) -> bool:
+        for store in self._stores:
+            with store.lock:
+                store.clear(namespace)
+        return True
+
+    def sweep(self) -> int:
+        """Removes every expired entry and returns how many there were."""
+        expired = 0
+        for store in self._stores:
+            with store.lock:
+                expired += store.sweep(time.monotonic())
+        return expired
+
+    def _ensure_sweeper(self):
+        if self._sweeper is not None:
+            return
+        with self._lock:
+            if self._sweeper is None:
+                self._stop_sweeper.clear()
+                self._sweeper = threading.Thread(
+                    target=self._run_sweeper,
+                    name='InMemoryCache-sweeper',
+                    daemon=True,
+                )
+                self._sweeper.start()
+
+    def _run_sweeper(self):
+        while not self._stop_sweeper.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f'Error while sweeping the cache: {e}')
+
+    def close(self) -> None:
+        """Stops the background sweeper."""
+        with self._lock:
+            sweeper, self._sweeper = self._sweeper, None
+        if sweeper is not None:
+            self._stop_sweeper.set()
+            sweeper.join()
@@ -0,0 +1,35 @@
+"""JSON encoding helpers that use orjson when it is installed."""
+
+import json
+
+from typing import Any
+
+from pydantic import BaseModel
+
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Serializes obj to compact JSON bytes.
+
+    Models are dumped without their None fields, as model_dump_json does.
+    """
+    if orjson is not None:
+        if isinstance(obj, BaseModel):
+            obj = obj.model_dump(mode='json', exclude_none=True)
+        return orjson.dumps(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump_json(exclude_none=True).encode()
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def loads(data: bytes | str) -> Any:
+    """Parses JSON, raising json.JSONDecodeError on invalid input."""
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError.
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,16 +1,21 @@
+import asyncio
+import contextlib
 import hashlib
+import hmac
 import json
 import logging
 import time
 import uuid
 
+from collections import OrderedDict
+from enum import Enum
 from typing import Any
 
 import httpx
 import jwt
 
 from jwcrypto import jwk
-from jwt import PyJWK, PyJWKClient
+from jwt import PyJWK, PyJWKSet
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 
@@ -19,30 +24,79 @@ logger = logging.getLogger(__name__)
 AUTH_HEADER_PREFIX = 'Bearer '
 
 
+class SigningAlgorithm(str, Enum):
+    """JWS algorithms push notifications can be signed with.
+
+    EdDSA (Ed25519) and ES256 sign much faster than RS256 with small keys.
+    """
+
+    RS256 = 'RS256'
+    ES256 = 'ES256'
+    EDDSA = 'EdDSA'
+
+
+SUPPORTED_ALGORITHMS = [algorithm.value for algorithm in SigningAlgorithm]
+
+_KEY_PARAMS = {
+    SigningAlgorithm.RS256: {'kty': 'RSA', 'size': 2048},
+    SigningAlgorithm.ES256: {'kty': 'EC', 'crv': 'P-256'},
+    SigningAlgorithm.EDDSA: {'kty': 'OKP', 'crv': 'Ed25519'},
+}
+
+
 class PushNotificationAuth:
-    def _calculate_request_body_sha256(self, data: dict[str, Any]):
-        """Calculates the SHA256 hash of a request body.
+    def _serialize_request_body(self, data: dict[str, Any]) -> bytes:
+        """Serializes a request body into its canonical bytes.
 
-        This logic needs to be same for both the agent who signs the payload and the client verifier.
+        The sender signs the digest of these bytes and sends the same bytes
+        as the HTTP body.
         """
-        body_str = json.dumps(
+        return json.dumps(
             data,
             ensure_ascii=False,
             allow_nan=False,
             indent=None,
             separators=(',', ':'),
-        )
-        return hashlib.sha256(body_str.encode()).hexdigest()
+        ).encode()
+
+    def _calculate_body_sha256(self, body: bytes) -> str:
+        return hashlib.sha256(body).hexdigest()
+
+    def _calculate_request_body_sha256(self, data: dict[str, Any]):
+        """Calculates the SHA256 hash of a request body.
+
+        This logic needs to be same for both the agent who signs the payload and the client verifier.
+        """
+        return self._calculate_body_sha256(self._serialize_request_body(data))
 
 
 class PushNotificationSenderAuth(PushNotificationAuth):
-    def __init__(self):
+    """Signs push notifications and publishes the keys to verify them.
+
+    Each call of `generate_jwk` (or `rotate_key`) creates a key that signs
+    from then on. Its public key is published in the JWKS endpoint together
+    with the previous ones, up to `max_active_keys`, so receivers can still
+    verify notifications signed just before a rotation.
+    """
+
+    def __init__(
+        self,
+        algorithm: SigningAlgorithm | str = SigningAlgorithm.RS256,
+        max_active_keys: int = 3,
+    ):
+        self.algorithm = SigningAlgorithm(algorithm)
+        self.max_active_keys = max_active_keys
         self.public_keys = []
         self.private_key_jwk: PyJWK = None
 
     @staticmethod
-    async def verify_push_notification_url(url: str) -> bool:
-        async with httpx.AsyncClient(timeout=10) as client:
+    async def verify_push_notification_url(
+        url: str, httpx_client: httpx.AsyncClient | None = None
+    ) -> bool:
+        async with contextlib.AsyncExitStack() as stack:
+            client = httpx_client or await stack.enter_async_context(
+                httpx.AsyncClient(timeout=10)
+            )
             try:
                 validation_token = str(uuid.uuid4())
                 response = await client.get(
@@ -62,43 +116,87 @@ class PushNotificationSenderAuth(PushNotificationAuth):
 
         return False
 
-    def generate_jwk(self):
+    def generate_jwk(self, algorithm: SigningAlgorithm | str | None = None):
+        """Creates a signing key and publishes its public key.
+
+        Args:
+            algorithm: Algorithm of the new key. Defaults to the one the
+                sender was created with, and becomes the sender's algorithm.
+        """
+        if algorithm is not None:
+            self.algorithm = SigningAlgorithm(algorithm)
         key = jwk.JWK.generate(
-            kty='RSA', size=2048, kid=str(uuid.uuid4()), use='sig'
+            kid=str(uuid.uuid4()),
+            use='sig',
+            alg=self.algorithm.value,
+            **_KEY_PARAMS[self.algorithm],
         )
         self.public_keys.append(key.export_public(as_dict=True))
         self.private_key_jwk = PyJWK.from_json(key.export_private())
+        # The oldest keys stop being published once enough newer ones are.
+        del self.public_keys[: -self.max_active_keys]
+
+    def rotate_key(self, algorithm: SigningAlgorithm | str | None = None):
+        """Starts signing with a new key, keeping recent keys published."""
+        self.generate_jwk(algorithm)
+
+    def retire_key(self, kid: str):
+        """Stops publishing a key, e.g. one that may have been compromised."""
+        if self.private_key_jwk is not None and (
+            self.private_key_jwk.key_id == kid
+        ):
+            raise ValueError('Cannot retire the active signing key')
+        self.public_keys = [
+            key for key in self.public_keys if key['kid'] != kid
+        ]
 
     def handle_jwks_endpoint(self, _request: Request):
         """Allow clients to fetch public keys."""
         return JSONResponse({'keys': self.public_keys})
 
-    def _generate_jwt(self, data: dict[str, Any]):
+    def _generate_jwt(self, data: dict[str, Any] | bytes):
         """JWT is generated by signing both the request payload SHA digest and time of token generation.
 
         Payload is signed with private key and it ensures the integrity of payload for client.
-        Including iat prevents from replay attack.
+        Including iat and a unique jti prevents from replay attack.
         """
+        if not isinstance(data, bytes):
+            data = self._serialize_request_body(data)
         iat = int(time.time())
 
         return jwt.encode(
             {
                 'iat': iat,
-                'request_body_sha256': self._calculate_request_body_sha256(
-                    data
-                ),
+                'jti': uuid.uuid4().hex,
+                'request_body_sha256': self._calculate_body_sha256(data),
             },
             key=self.private_key_jwk,
             headers={'kid': self.private_key_jwk.key_id},
-            algorithm='RS256',
+            algorithm=self.private_key_jwk.algorithm_name,
         )
 
+    def sign_request_body(
+        self, data: dict[str, Any]
+    ) -> tuple[bytes, dict[str, str]]:
+        """Serializes a push notification once and signs it.
+
+        Returns:
+            The HTTP body, and the headers to send it with.
+        """
+        body = self._serialize_request_body(data)
+        headers = {
+            'Authorization': f'Bearer {self._generate_jwt(body)}',
+            'Content-Type': 'application/json',
+        }
+        return body, headers
+
     async def send_push_notification(self, url: str, data: dict[str, Any]):
-        jwt_token = self._generate_jwt(data)
-        headers = {'Authorization': f'Bearer {jwt_token}'}
+        body, headers = self.sign_request_body(data)
         async with httpx.AsyncClient(timeout=10) as client:
             try:
-                response = await client.post(url, json=data, headers=headers)
+                response = await client.post(
+                    url, content=body, headers=headers
+                )
                 response.raise_for_status()
                 logger.info(f'Push-notification sent for URL: {url}')
             except Exception as e:
@@ -107,13 +205,110 @@ class PushNotificationSenderAuth(PushNotificationAuth):
                 )
 
 
+class JWKSClient:
+    """Fetches a JWKS asynchronously and caches its keys by kid.
+
+    A token signed with an unknown kid, e.g. after the sender rotated its
+    keys, triggers a refresh, but at most once every `min_refresh_interval`
+    seconds so bogus kids cannot make the receiver hammer the JWKS URL.
+    Keys are refreshed anyway once they are `max_age` seconds old, so
+    retired keys stop being accepted. Concurrent refreshes are coalesced.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        httpx_client: httpx.AsyncClient | None = None,
+        min_refresh_interval: float = 30.0,
+        max_age: float = 3600.0,
+    ):
+        self.jwks_url = jwks_url
+        self.httpx_client = httpx_client
+        self.min_refresh_interval = min_refresh_interval
+        self.max_age = max_age
+        self.keys: dict[str, PyJWK] = {}
+        self._fetched_at: float | None = None
+        self._refresh_lock = asyncio.Lock()
+
+    async def refresh(self):
+        """Fetches the JWKS and replaces the cached keys."""
+        async with self._refresh_lock:
+            await self._refresh()
+
+    async def _refresh(self):
+        self._fetched_at = time.monotonic()
+        if self.httpx_client is None:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(self.jwks_url)
+        else:
+            response = await self.httpx_client.get(self.jwks_url)
+        response.raise_for_status()
+        jwk_set = PyJWKSet.from_dict(response.json())
+        self.keys = {key.key_id: key for key in jwk_set.keys if key.key_id}
+        logger.info(f'Loaded {len(self.keys)} keys from {self.jwks_url}')
+
+    def _is_stale(self) -> bool:
+        return (
+            self._fetched_at is None
+            or time.monotonic() - self._fetched_at >= self.max_age
+        )
+
+    async def get_signing_key(self, kid: str) -> PyJWK:
+        key = self.keys.get(kid)
+        if key is not None and not self._is_stale():
+            return key
+        async with self._refresh_lock:
+            # Another caller may have refreshed while this one waited.
+            key = self.keys.get(kid)
+            if key is not None and not self._is_stale():
+                return key
+            if (
+                self._fetched_at is None
+                or self._is_stale()
+                or time.monotonic() - self._fetched_at
+                >= self.min_refresh_interval
+            ):
+                await self._refresh()
+                key = self.keys.get(kid)
+        if key is None:
+            raise jwt.InvalidTokenError(f'Unknown signing key {kid!r}')
+        return key
+
+
+class ReplayCache:
+    """Remembers the tokens seen within their validity window."""
+
+    def __init__(self, window: float):
+        self.window = window
+        self._seen: OrderedDict[str, float] = OrderedDict()
+
+    def check_and_add(self, token_id: str, iat: float) -> bool:
+        """Returns False if the token was already seen, else records it."""
+        now = time.time()
+        # Tokens are recorded in arrival order, which roughly follows iat,
+        # so expired ones are found at the front.
+        while self._seen and next(iter(self._seen.values())) <= now:
+            self._seen.popitem(last=False)
+        if token_id in self._seen:
+            return False
+        self._seen[token_id] = iat + self.window
+        return True
+
+
 class PushNotificationReceiverAuth(PushNotificationAuth):
-    def __init__(self):
+    def __init__(self, max_token_age: float = 60 * 5):
         self.public_keys_jwks = []
-        self.jwks_client = None
+        self.jwks_client: JWKSClient | None = None
+        self.max_token_age = max_token_age
+        self.replay_cache = ReplayCache(max_token_age)
 
     async def load_jwks(self, jwks_url: str):
-        self.jwks_client = PyJWKClient(jwks_url)
+        self.jwks_client = JWKSClient(jwks_url)
+        try:
+            await self.jwks_client.refresh()
+        except Exception as e:
+            # Keys are fetched again when the first notification arrives.
+            logger.warning(f'Could not load JWKS from {jwks_url}: {e}')
 
     async def verify_push_notification(self, request: Request) -> bool:
         auth_header = request.headers.get('Authorization')
@@ -122,25 +317,39 @@ class PushNotificationReceiverAuth(PushNotificationAuth):
             return False
 
         token = auth_header[len(AUTH_HEADER_PREFIX) :]
-        signing_key = self.jwks_client.get_signing_key_from_jwt(token)
+        kid = jwt.get_unverified_header(token).get('kid')
+        signing_key = await self.jwks_client.get_signing_key(kid)
 
         decode_token = jwt.decode(
             token,
             signing_key,
             options={'require': ['iat', 'request_body_sha256']},
-            algorithms=['RS256'],
+            algorithms=[signing_key.algorithm_name],
         )
 
-        actual_body_sha256 = self._calculate_request_body_sha256(
-            await request.json()
-        )
-        if actual_body_sha256 != decode_token['request_body_sha256']:
+        # The digest covers the bytes as received. Bodies serialized
+        # differently from the digest are checked in canonical form.
+        body = await request.body()
+        expected_sha256 = decode_token['request_body_sha256']
+        if not hmac.compare_digest(
+            self._calculate_body_sha256(body), expected_sha256
+        ) and not hmac.compare_digest(
+            self._calculate_request_body_sha256(json.loads(body)),
+            expected_sha256,
+        ):
             # Payload signature does not match the digest in signed token.
             raise ValueError('Invalid request body')
 
-        if time.time() - decode_token['iat'] > 60 * 5:
+        if time.time() - decode_token['iat'] > self.max_token_age:
             # Do not allow push-notifications older than 5 minutes.
             # This is to prevent replay attack.
             raise ValueError('Token is expired')
 
+        # Tokens without a jti are identified by what they sign.
+        token_id = decode_token.get('jti') or (
+            f'{decode_token["iat"]}:{expected_sha256}'
+        )
+        if not self.replay_cache.check_and_add(token_id, decode_token['iat']):
+            raise ValueError('Token has already been used')
+
         return True
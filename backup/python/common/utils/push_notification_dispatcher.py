@@ -0,0 +1,342 @@
+import asyncio
+import logging
+import random
+import time
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+
+from common.utils.push_notification_auth import PushNotificationSenderAuth
+
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying. Other client errors will not go away.
+_RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class DeliveryStats:
+    """Counters describing push-notification delivery to one destination."""
+
+    enqueued: int = 0
+    delivered: int = 0
+    failed: int = 0
+    retried: int = 0
+    coalesced: int = 0
+    dropped: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+
+    @property
+    def latency_mean(self) -> float:
+        """Mean seconds from enqueueing to delivery."""
+        return self.latency_total / self.delivered if self.delivered else 0.0
+
+
+@dataclass
+class _Delivery:
+    url: str
+    data: dict[str, Any]
+    enqueued_at: float
+    attempts: int = 0
+
+
+@dataclass
+class _DestinationLimit:
+    semaphore: asyncio.Semaphore
+    # Deliveries holding or waiting for the semaphore.
+    users: int = 0
+
+
+def _destination(url: str) -> str:
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}'
+
+
+class PushNotificationDispatcher:
+    """Delivers push notifications in the background.
+
+    `enqueue` returns at once and worker tasks send the notification,
+    signed by `sender_auth`, over connections pooled per destination. At
+    most `max_concurrency` notifications are sent at once, and at most
+    `max_per_destination` to any one host, so a slow webhook does not slow
+    down the agent or the other webhooks.
+
+    Each task has at most one notification pending per URL: a task update
+    enqueued before the previous one was sent replaces it, since a
+    notification carries the whole task. Updates of a task are sent in
+    order. Failed deliveries are retried with exponential backoff and
+    jitter, up to `max_attempts` times, unless a newer update replaces
+    them. Notifications beyond `max_queue_size` pending ones are dropped.
+
+    The per-destination limit is dropped as soon as nothing is sent to the
+    destination, and stats are kept for the `max_destinations` most
+    recently notified destinations only.
+    """
+
+    def __init__(
+        self,
+        sender_auth: PushNotificationSenderAuth,
+        max_queue_size: int = 10_000,
+        max_concurrency: int = 32,
+        max_per_destination: int = 8,
+        max_attempts: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 10.0,
+        verification_ttl: float = 3600.0,
+        failed_verification_ttl: float = 60.0,
+        max_destinations: int = 1000,
+    ):
+        self.sender_auth = sender_auth
+        self.max_queue_size = max_queue_size
+        self.max_concurrency = max_concurrency
+        self.max_per_destination = max_per_destination
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.verification_ttl = verification_ttl
+        self.failed_verification_ttl = failed_verification_ttl
+        self.max_destinations = max_destinations
+        self._client: httpx.AsyncClient | None = None
+        self._workers: list[asyncio.Task] = []
+        self._ready: asyncio.Queue | None = None
+        # Notifications waiting to be sent, and the ones being sent or
+        # waiting for a retry, by (url, task id).
+        self._pending: dict[tuple[str, str], _Delivery] = {}
+        self._in_flight: dict[tuple[str, str], _Delivery] = {}
+        self._destination_limits: dict[str, _DestinationLimit] = {}
+        self._idle: asyncio.Event | None = None
+        self._verified: dict[str, tuple[bool, float]] = {}
+        self._verifying: dict[str, asyncio.Task] = {}
+        # Ordered from least to most recently used, for LRU eviction.
+        self._stats: OrderedDict[str, DeliveryStats] = OrderedDict()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of notifications not delivered yet."""
+        return len(self._pending) + len(self._in_flight)
+
+    def _ensure_workers(self):
+        if self._workers:
+            return
+        self._ready = asyncio.Queue()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+        loop = asyncio.get_running_loop()
+        self._workers = [
+            loop.create_task(self._run_worker())
+            for _ in range(self.max_concurrency)
+        ]
+
+    def _stats_for(self, url: str) -> DeliveryStats:
+        destination = _destination(url)
+        stats = self._stats.get(destination)
+        if stats is None:
+            stats = self._stats[destination] = DeliveryStats()
+            if len(self._stats) > self.max_destinations:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(destination)
+        return stats
+
+    def enqueue(
+        self, url: str, data: dict[str, Any], task_id: str | None = None
+    ) -> bool:
+        """Schedules a notification about a task to be sent to `url`.
+
+        Args:
+            url: The webhook to notify.
+            data: The task, as sent in the notification.
+            task_id: The task's ID. Defaults to data['id'].
+
+        Returns:
+            False if the notification was dropped because the queue is full.
+        """
+        self._ensure_workers()
+        stats = self._stats_for(url)
+        key = (url, task_id or data['id'])
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.data = data
+            stats.coalesced += 1
+            return True
+        if len(self._pending) >= self.max_queue_size:
+            stats.dropped += 1
+            logger.warning(
+                f'Push-notification queue full, dropping notification for URL {url}'
+            )
+            return False
+        stats.enqueued += 1
+        self._pending[key] = _Delivery(url, data, time.monotonic())
+        self._idle.clear()
+        # A notification for a task that is still being sent waits for it,
+        # so the updates of a task arrive in order.
+        if key not in self._in_flight:
+            self._ready.put_nowait(key)
+        return True
+
+    async def _run_worker(self):
+        while True:
+            key = await self._ready.get()
+            delivery = self._pending.pop(key, None)
+            retry = self._in_flight.get(key)
+            if delivery is None:
+                delivery = retry
+            elif retry is not None:
+                # A newer update replaces the one waiting for a retry.
+                self._stats_for(key[0]).coalesced += 1
+            self._in_flight[key] = delivery
+            try:
+                retry_after = await self._deliver(delivery)
+            except Exception as e:
+                self._stats_for(key[0]).failed += 1
+                logger.error(f'Error while sending push-notification: {e}')
+                retry_after = None
+            if retry_after is not None:
+                asyncio.get_running_loop().call_later(
+                    retry_after, self._ready.put_nowait, key
+                )
+                continue
+            del self._in_flight[key]
+            if key in self._pending:
+                self._ready.put_nowait(key)
+            elif not self._pending and not self._in_flight:
+                self._idle.set()
+
+    async def _deliver(self, delivery: _Delivery) -> float | None:
+        """Sends a notification once.
+
+        Returns:
+            Seconds to wait before retrying it, or None if it is done.
+        """
+        url = delivery.url
+        stats = self._stats_for(url)
+        body, headers = self.sender_auth.sign_request_body(delivery.data)
+        destination = _destination(url)
+        limit = self._destination_limits.get(destination)
+        if limit is None:
+            limit = self._destination_limits[destination] = _DestinationLimit(
+                asyncio.Semaphore(self.max_per_destination)
+            )
+        delivery.attempts += 1
+        retry_after = None
+        limit.users += 1
+        try:
+            async with limit.semaphore:
+                response = await self._client.post(
+                    url, content=body, headers=headers
+                )
+            if response.status_code < 400:
+                latency = time.monotonic() - delivery.enqueued_at
+                stats.delivered += 1
+                stats.latency_total += latency
+                stats.latency_max = max(stats.latency_max, latency)
+                logger.info(f'Push-notification sent for URL: {url}')
+                return None
+            error = f'HTTP {response.status_code}'
+            retryable = response.status_code in _RETRYABLE_STATUS_CODES
+            retry_after = response.headers.get('Retry-After')
+        except httpx.HTTPError as e:
+            error = str(e) or type(e).__name__
+            retryable = True
+        finally:
+            limit.users -= 1
+            if not limit.users:
+                del self._destination_limits[destination]
+
+        if not retryable or delivery.attempts >= self.max_attempts:
+            stats.failed += 1
+            logger.warning(
+                f'Error during sending push-notification for URL {url}: {error}'
+            )
+            return None
+        stats.retried += 1
+        return self._backoff(delivery.attempts, retry_after)
+
+    def _backoff(self, attempts: int, retry_after: str | None) -> float:
+        if retry_after is not None and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        # Full jitter keeps retries of many notifications from bunching up.
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        )
+
+    async def verify_url(self, url: str) -> bool:
+        """Checks that `url` accepts push notifications.
+
+        Results are cached for `verification_ttl` seconds, failures for
+        `failed_verification_ttl`, and concurrent checks of a URL share one
+        request.
+        """
+        cached = self._verified.get(url)
+        if cached is not None and time.monotonic() < cached[1]:
+            return cached[0]
+        task = self._verifying.get(url)
+        if task is None:
+            self._ensure_workers()
+            task = asyncio.create_task(
+                self.sender_auth.verify_push_notification_url(
+                    url, httpx_client=self._client
+                )
+            )
+            self._verifying[url] = task
+
+            def _store(t: asyncio.Task):
+                self._verifying.pop(url, None)
+                if t.cancelled() or t.exception() is not None:
+                    return
+                ttl = (
+                    self.verification_ttl
+                    if t.result()
+                    else self.failed_verification_ttl
+                )
+                self._verified[url] = (t.result(), time.monotonic() + ttl)
+
+            task.add_done_callback(_store)
+        return await asyncio.shield(task)
+
+    async def join(self):
+        """Waits until every enqueued notification was delivered or failed."""
+        if self._idle is not None:
+            await self._idle.wait()
+
+    async def close(self, timeout: float | None = 10.0):
+        """Stops the workers, first waiting up to `timeout` for the queue."""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except TimeoutError:
+            logger.warning(
+                f'Dropping {self.queue_depth} undelivered push-notifications'
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._pending.clear()
+        self._in_flight.clear()
+        self._destination_limits.clear()
+        await self._client.aclose()
+        self._client = None
+
+    def stats(self) -> dict[str, DeliveryStats]:
+        """Returns delivery counters by destination (scheme and host)."""
+        return {
+            destination: DeliveryStats(**vars(stats))
+            for destination, stats in self._stats.items()
+        }
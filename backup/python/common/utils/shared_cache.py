@@ -0,0 +1,337 @@
+"""Cache shared by the processes of one host."""
+
+import contextlib
+import mmap
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+
+from typing import Any
+
+from common.utils.in_memory_cache import (
+    _MISSING,
+    BaseCache,
+    CacheStats,
+    InMemoryCache,
+)
+
+
+SHARED_CACHE_PATH_ENV = 'A2A_SHARED_CACHE_PATH'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB,
+    blob TEXT,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_updated_at ON cache (updated_at);
+"""
+
+
+class SharedCache(BaseCache):
+    """A cache in a local SQLite database, shared by every process using it.
+
+    Agents served by several uvicorn workers see each other's entries, so a
+    follow-up request for a session can land on any worker. It has the same
+    API as InMemoryCache. Values are pickled; values of at least
+    `blob_threshold` bytes are kept in their own file next to the database
+    and unpickled straight from a memory map of it, so reading them never
+    copies the whole payload into an intermediate buffer.
+
+    Expired entries are never returned. They are deleted, and the oldest
+    entries evicted beyond `max_entries` or `max_bytes`, at most once every
+    `sweep_interval` seconds when a value is written, so the limits are
+    soft. Concurrent `get_or_compute` calls are coalesced within a process,
+    not across processes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int | None = 100_000,
+        max_bytes: int | None = 1024 * 1024 * 1024,
+        blob_threshold: int = 64 * 1024,
+        sweep_interval: float = 10.0,
+        stripes: int = 16,
+    ):
+        self.path = path
+        self.blob_dir = f'{path}.blobs'
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.blob_threshold = blob_threshold
+        self.sweep_interval = sweep_interval
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._last_sweep = 0.0
+        self._stats: dict[str, CacheStats] = {}
+        self._stats_lock = threading.Lock()
+        self._flight_stripes = [
+            (threading.Lock(), {}, {}) for _ in range(stripes)
+        ]
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections cannot be shared between threads, so every
+        # thread gets its own. WAL lets readers run alongside a writer.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _record(self, namespace: str, counter: str, count: int = 1):
+        with self._stats_lock:
+            stats = self._stats.setdefault(namespace, CacheStats())
+            setattr(stats, counter, getattr(stats, counter) + count)
+
+    def _blob_path(self, name: str) -> str:
+        return os.path.join(self.blob_dir, name)
+
+    def _unlink_blobs(self, names):
+        for name in names:
+            if name is not None:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(self._blob_path(name))
+
+    def _set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        ttl: int | None,
+        size: int | None,
+    ):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        blob = None
+        if len(data) >= self.blob_threshold:
+            blob = uuid.uuid4().hex
+            # Written under a temporary name and renamed, so other
+            # processes never see a partial file.
+            tmp_path = self._blob_path(f'{blob}.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._blob_path(blob))
+        now = time.time()
+        conn = self._connection()
+        try:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                old = conn.execute(
+                    'SELECT blob FROM cache WHERE namespace = ? AND key = ?',
+                    (namespace, key),
+                ).fetchone()
+                conn.execute(
+                    'INSERT OR REPLACE INTO cache (namespace, key, value, '
+                    'blob, size, expires_at, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (
+                        namespace,
+                        key,
+                        None if blob else data,
+                        blob,
+                        len(data),
+                        None if ttl is None else now + ttl,
+                        now,
+                    ),
+                )
+        except Exception:
+            self._unlink_blobs([blob])
+            raise
+        if old is not None:
+            self._unlink_blobs([old[0]])
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            self.sweep()
+
+    def _read(self, namespace: str, key: str) -> Any:
+        row = (
+            self._connection()
+            .execute(
+                'SELECT value, blob, expires_at FROM cache '
+                'WHERE namespace = ? AND key = ?',
+                (namespace, key),
+            )
+            .fetchone()
+        )
+        if row is None:
+            self._record(namespace, 'misses')
+            return _MISSING
+        data, blob, expires_at = row
+        if expires_at is not None and time.time() >= expires_at:
+            self._record(namespace, 'misses')
+            return _MISSING
+        if blob is not None:
+            try:
+                with (
+                    open(self._blob_path(blob), 'rb') as f,
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+                ):
+                    value = pickle.loads(mm)
+            except FileNotFoundError:
+                # Replaced or deleted by another process since the read.
+                self._record(namespace, 'misses')
+                return _MISSING
+        else:
+            value = pickle.loads(data)
+        self._record(namespace, 'hits')
+        return value
+
+    def _get(self, namespace: str, key: str, default: Any) -> Any:
+        value = self._read(namespace, key)
+        return default if value is _MISSING else value
+
+    def _flight_scope(self, cache_key: tuple[str, str]):
+        stripes = self._flight_stripes
+        return stripes[hash(cache_key) % len(stripes)]
+
+    def _lookup(self, cache_key: tuple[str, str]) -> Any:
+        return self._read(*cache_key)
+
+    def _record_coalesced(self, cache_key: tuple[str, str]):
+        self._record(cache_key[0], 'coalesced')
+
+    def _delete(self, namespace: str, key: str) -> bool:
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT blob FROM cache WHERE namespace = ? AND key = ?',
+                (namespace, key),
+            ).fetchone()
+            conn.execute(
+                'DELETE FROM cache WHERE namespace = ? AND key = ?',
+                (namespace, key),
+            )
+        if row is None:
+            return False
+        self._unlink_blobs([row[0]])
+        return True
+
+    def _clear(self, namespace: str | None) -> bool:
+        where, params = ('', ()) if namespace is None else (
+            ' WHERE namespace = ?',
+            (namespace,),
+        )
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            blobs = [
+                blob
+                for (blob,) in conn.execute(
+                    f'SELECT blob FROM cache{where}', params
+                )
+            ]
+            conn.execute(f'DELETE FROM cache{where}', params)
+        self._unlink_blobs(blobs)
+        return True
+
+    def sweep(self) -> int:
+        """Deletes expired entries, then the oldest ones beyond the limits.
+
+        Returns the number of entries deleted.
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            expired = conn.execute(
+                'SELECT namespace, key, blob FROM cache '
+                'WHERE expires_at IS NOT NULL AND expires_at <= ?',
+                (time.time(),),
+            ).fetchall()
+            evicted = self._over_limits(conn)
+            conn.executemany(
+                'DELETE FROM cache WHERE namespace = ? AND key = ?',
+                [(ns, key) for ns, key, _ in expired + evicted],
+            )
+        for namespace, _, _ in expired:
+            self._record(namespace, 'expirations')
+        for namespace, _, _ in evicted:
+            self._record(namespace, 'evictions')
+        self._unlink_blobs(blob for _, _, blob in expired + evicted)
+        return len(expired) + len(evicted)
+
+    def _over_limits(self, conn: sqlite3.Connection) -> list[tuple]:
+        entries, total = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache'
+        ).fetchone()
+        excess_entries = (
+            entries - self.max_entries if self.max_entries is not None else 0
+        )
+        excess_bytes = (
+            total - self.max_bytes if self.max_bytes is not None else 0
+        )
+        evicted = []
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return evicted
+        for namespace, key, size, blob in conn.execute(
+            'SELECT namespace, key, size, blob FROM cache ORDER BY updated_at'
+        ):
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            evicted.append((namespace, key, blob))
+            excess_entries -= 1
+            excess_bytes -= size
+        return evicted
+
+    def stats(self) -> dict[str, CacheStats]:
+        """Returns this process's counters, and the entries of every process."""
+        with self._stats_lock:
+            totals = {
+                name: CacheStats(**vars(stats))
+                for name, stats in self._stats.items()
+            }
+        for namespace, entries, size in self._connection().execute(
+            'SELECT namespace, COUNT(*), SUM(size) FROM cache '
+            'GROUP BY namespace'
+        ):
+            stats = totals.setdefault(namespace, CacheStats())
+            stats.entries = entries
+            stats.bytes = size
+        return totals
+
+    def close(self) -> None:
+        """Closes the database connections of every thread."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+_shared_caches: dict[str, SharedCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_cache() -> BaseCache:
+    """Returns the cache agents should use for session data.
+
+    That is the SharedCache at the path in the A2A_SHARED_CACHE_PATH
+    environment variable when it is set, so every worker process of the
+    agent shares it, and the InMemoryCache singleton otherwise.
+    """
+    path = os.environ.get(SHARED_CACHE_PATH_ENV)
+    if not path:
+        return InMemoryCache()
+    cache = _shared_caches.get(path)
+    if cache is None:
+        with _shared_caches_lock:
+            cache = _shared_caches.get(path)
+            if cache is None:
+                cache = _shared_caches[path] = SharedCache(path)
+    return cache
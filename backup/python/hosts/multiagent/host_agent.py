@@ -23,6 +23,8 @@ from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
 
+from common.client.fan_out import fan_out
+
 from .remote_agent_connection import RemoteAgentConnections, TaskUpdateCallback
 
 
@@ -38,8 +40,12 @@ class HostAgent:
         remote_agent_addresses: list[str],
         http_client: httpx.AsyncClient,
         task_callback: TaskUpdateCallback | None = None,
+        fan_out_concurrency: int = 8,
+        fan_out_timeout: float | None = 120.0,
     ):
         self.task_callback = task_callback
+        self.fan_out_concurrency = fan_out_concurrency
+        self.fan_out_timeout = fan_out_timeout
         self.httpx_client = http_client
         self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
         self.cards: dict[str, AgentCard] = {}
@@ -68,10 +74,10 @@ class HostAgent:
         remote_connection = RemoteAgentConnections(self.httpx_client, card)
         self.remote_agent_connections[card.name] = remote_connection
         self.cards[card.name] = card
-        agent_info = []
-        for ra in self.list_remote_agents():
-            agent_info.append(json.dumps(ra))
-        self.agents = '\n'.join(agent_info)
+        self.agents = self._describe_agents()
+
+    def _describe_agents(self) -> str:
+        return '\n'.join(json.dumps(ra) for ra in self.list_remote_agents())
 
     def create_agent(self) -> Agent:
         return Agent(
@@ -86,6 +92,7 @@ class HostAgent:
             tools=[
                 self.list_remote_agents,
                 self.send_message,
+                self.send_message_to_agents,
             ],
         )
 
@@ -100,6 +107,8 @@ can use to delegate the task.
 
 Execution:
 - For actionable requests, you can use `send_message` to interact with remote agents to take action.
+- When several agents can answer the same request independently, you can use
+`send_message_to_agents` to ask all of them at once.
 
 Be sure to include the remote agent name when you respond to the user.
 
@@ -107,7 +116,7 @@ Please rely on tools to address the request, and don't make up the response. If
 Focus on the most recent parts of the conversation primarily.
 
 Agents:
-{self.agents}
+{self._describe_agents()}
 
 Current agent: {current_agent['active_agent']}
 """
@@ -137,6 +146,10 @@ Current agent: {current_agent['active_agent']}
 
         remote_agent_info = []
         for card in self.cards.values():
+            # Agents ejected by their circuit breaker are hidden until they
+            # are allowed a probe call again.
+            if not self.remote_agent_connections[card.name].is_available:
+                continue
             remote_agent_info.append(
                 {'name': card.name, 'description': card.description}
             )
@@ -220,6 +233,78 @@ Current agent: {current_agent['active_agent']}
                 )
         return response
 
+    async def send_message_to_agents(
+        self, agent_names: list[str], message: str, tool_context: ToolContext
+    ):
+        """Sends the same message to several remote agents concurrently.
+
+        Each agent starts a new task for the message, independently of the
+        conversation's active task.
+
+        Args:
+          agent_names: The names of the agents to send the message to.
+          message: The message to send to the agents.
+          tool_context: The tool context this method runs in.
+
+        Returns:
+          A dictionary mapping each agent name to its response or error.
+        """
+        for agent_name in agent_names:
+            if agent_name not in self.remote_agent_connections:
+                raise ValueError(f'Agent {agent_name} not found')
+        results = await fan_out(
+            {
+                agent_name: (
+                    lambda agent_name=agent_name: self._send_new_task(
+                        agent_name, message, tool_context
+                    )
+                )
+                for agent_name in agent_names
+            },
+            concurrency=self.fan_out_concurrency,
+            timeout=self.fan_out_timeout,
+        )
+        return {
+            agent_name: (
+                result.result
+                if result.succeeded
+                else f'Error: {result.error!r}'
+            )
+            for agent_name, result in results.items()
+        }
+
+    async def _send_new_task(
+        self, agent_name: str, message: str, tool_context: ToolContext
+    ):
+        client = self.remote_agent_connections[agent_name]
+        request = MessageSendParams(
+            id=str(uuid.uuid4()),
+            message=Message(
+                role='user',
+                parts=[TextPart(text=message)],
+                messageId=str(uuid.uuid4()),
+            ),
+            configuration=MessageSendConfiguration(
+                acceptedOutputModes=['text', 'text/plain', 'image/png'],
+            ),
+        )
+        response = await client.send_message(request, self.task_callback)
+        if isinstance(response, Message):
+            return await convert_parts(response.parts, tool_context)
+        if not isinstance(response, Task):
+            # A JSON-RPC error, or a stream that ended without a task.
+            raise ValueError(f'Agent {agent_name} returned {response!r}')
+        if response.status.state == TaskState.failed:
+            raise ValueError(f'Agent {agent_name} task {response.id} failed')
+        parts = []
+        if response.status.message:
+            parts.extend(
+                await convert_parts(response.status.message.parts, tool_context)
+            )
+        for artifact in response.artifacts or []:
+            parts.extend(await convert_parts(artifact.parts, tool_context))
+        return parts
+
 
 async def convert_parts(parts: list[Part], tool_context: ToolContext):
     rval = []
@@ -0,0 +1,50 @@
+"""Shared helpers for the tests of the common package."""
+
+from common.server.task_manager import InMemoryTaskManager
+from common.types import (
+    AgentCapabilities,
+    AgentCard,
+    Message,
+    TaskSendParams,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+
+
+class StubTaskManager(InMemoryTaskManager):
+    """An InMemoryTaskManager whose agent is driven by the test itself."""
+
+    async def on_send_task(self, request):
+        raise NotImplementedError
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+def send_params(task_id: str, text: str = 'hello') -> TaskSendParams:
+    return TaskSendParams(
+        id=task_id, message=Message(role='user', parts=[TextPart(text=text)])
+    )
+
+
+def status_event(
+    task_id: str, state: TaskState = TaskState.WORKING, final: bool = False
+) -> TaskStatusUpdateEvent:
+    return TaskStatusUpdateEvent(
+        id=task_id, status=TaskStatus(state=state), final=final
+    )
+
+
+def agent_card(**kwargs) -> AgentCard:
+    return AgentCard(
+        **{
+            'name': 'Test Agent',
+            'url': 'http://localhost/',
+            'version': '1.0.0',
+            'capabilities': AgentCapabilities(streaming=True),
+            'skills': [],
+            **kwargs,
+        }
+    )
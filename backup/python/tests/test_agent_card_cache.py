@@ -0,0 +1,102 @@
+import gzip
+import json
+
+from starlette.testclient import TestClient
+
+from common.server import A2AServer
+from tests.helpers import StubTaskManager, agent_card
+
+
+CARD_PATH = '/.well-known/agent.json'
+
+
+def _client(server: A2AServer | None = None) -> TestClient:
+    server = server or A2AServer(
+        agent_card=agent_card(), task_manager=StubTaskManager()
+    )
+    return TestClient(server.app)
+
+
+def test_each_coding_has_its_own_etag():
+    client = _client()
+
+    identity = client.get(CARD_PATH, headers={'Accept-Encoding': 'identity'})
+    compressed = client.get(CARD_PATH, headers={'Accept-Encoding': 'gzip'})
+
+    assert identity.status_code == compressed.status_code == 200
+    assert 'content-encoding' not in identity.headers
+    assert compressed.headers['content-encoding'] == 'gzip'
+    assert json.loads(identity.content)['name'] == 'Test Agent'
+    # httpx decodes the body, the raw bytes were gzip.
+    assert compressed.content == identity.content
+    assert compressed.headers['etag'] == (
+        identity.headers['etag'][:-1] + '-gzip"'
+    )
+    assert identity.headers['vary'] == 'Accept-Encoding'
+    assert identity.headers['cache-control'] == 'public, max-age=300'
+
+
+def test_if_none_match_accepts_any_coding_etag():
+    client = _client()
+    identity_etag = client.get(
+        CARD_PATH, headers={'Accept-Encoding': 'identity'}
+    ).headers['etag']
+    gzip_etag = client.get(
+        CARD_PATH, headers={'Accept-Encoding': 'gzip'}
+    ).headers['etag']
+
+    # A gzip ETag revalidates a request that would be served uncompressed,
+    # and the 304 carries the ETag of the variant it stands in for.
+    response = client.get(
+        CARD_PATH,
+        headers={'Accept-Encoding': 'identity', 'If-None-Match': gzip_etag},
+    )
+    assert response.status_code == 304
+    assert response.content == b''
+    assert response.headers['etag'] == identity_etag
+
+    response = client.get(
+        CARD_PATH,
+        headers={
+            'Accept-Encoding': 'gzip',
+            'If-None-Match': f'"other", W/{identity_etag}',
+        },
+    )
+    assert response.status_code == 304
+    assert response.headers['etag'] == gzip_etag
+
+    response = client.get(CARD_PATH, headers={'If-None-Match': '*'})
+    assert response.status_code == 304
+
+
+def test_stale_etag_gets_the_updated_card():
+    server = A2AServer(agent_card=agent_card(), task_manager=StubTaskManager())
+    client = _client(server)
+    etag = client.get(CARD_PATH).headers['etag']
+
+    server.agent_card = agent_card(name='Renamed Agent')
+    response = client.get(CARD_PATH, headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.json()['name'] == 'Renamed Agent'
+    assert response.headers['etag'] != etag
+
+
+def test_refused_coding_is_not_used():
+    server = A2AServer(agent_card=agent_card(), task_manager=StubTaskManager())
+    cached = server._cached_agent_card
+    client = _client(server)
+
+    response = client.get(
+        CARD_PATH, headers={'Accept-Encoding': 'gzip;q=0, identity'}
+    )
+
+    assert 'content-encoding' not in response.headers
+    assert response.headers['etag'] == cached.etag
+    assert gzip.decompress(cached.variants['gzip']) == cached.body
+
+
+def test_missing_card_is_not_found():
+    client = _client(A2AServer(task_manager=StubTaskManager()))
+
+    assert client.get(CARD_PATH).status_code == 404
@@ -0,0 +1,117 @@
+import asyncio
+
+from common.types import (
+    CancelTaskRequest,
+    TaskIdParams,
+    TaskState,
+    TaskStatus,
+)
+from tests.helpers import StubTaskManager, send_params
+
+
+def _cancel(task_id: str) -> CancelTaskRequest:
+    return CancelTaskRequest(id=1, params=TaskIdParams(id=task_id))
+
+
+def test_cancel_stops_agent_and_ends_streams():
+    async def run():
+        manager = StubTaskManager()
+        await manager.upsert_task(send_params('t'))
+        agent_cancelled = asyncio.Event()
+
+        async def agent():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                agent_cancelled.set()
+                raise
+
+        manager.track_agent_task('t', agent())
+        queue = await manager.setup_sse_consumer('t')
+        await asyncio.sleep(0)
+
+        response = await manager.on_cancel_task(_cancel('t'))
+
+        assert response.error is None
+        assert response.result.status.state == TaskState.CANCELED
+        assert agent_cancelled.is_set()
+        assert 't' not in manager.running_agent_tasks
+        final = await queue.get()
+        assert final.event.status.state == TaskState.CANCELED
+        assert final.is_terminal
+        assert manager.cancel_stats['canceled'] == 1
+        assert manager.cancel_stats['agents_stopped'] == 1
+
+    asyncio.run(run())
+
+
+def test_cancel_rejects_unknown_and_terminal_tasks():
+    async def run():
+        manager = StubTaskManager()
+        await manager.upsert_task(send_params('t'))
+        await manager.update_store(
+            't', TaskStatus(state=TaskState.COMPLETED), None
+        )
+
+        assert (await manager.on_cancel_task(_cancel('t'))).error.code == (
+            -32002
+        )
+        missing = await manager.on_cancel_task(_cancel('missing'))
+        assert missing.error.code == -32001
+        assert manager.cancel_stats['not_cancelable'] == 1
+
+    asyncio.run(run())
+
+
+def test_task_finished_while_stopping_agent_is_not_canceled():
+    async def run():
+        manager = StubTaskManager()
+        await manager.upsert_task(send_params('t'))
+
+        async def agent():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                # The agent gets to record its result while unwinding.
+                await manager.update_store(
+                    't', TaskStatus(state=TaskState.COMPLETED), None
+                )
+                raise
+
+        manager.track_agent_task('t', agent())
+        await asyncio.sleep(0)
+
+        response = await manager.on_cancel_task(_cancel('t'))
+
+        assert response.error.code == -32002
+        assert manager.tasks['t'].status.state == TaskState.COMPLETED
+        assert manager.cancel_stats['canceled'] == 0
+        assert manager.cancel_stats['not_cancelable'] == 1
+
+    asyncio.run(run())
+
+
+def test_unresponsive_agent_does_not_block_cancel():
+    async def run():
+        manager = StubTaskManager(cancel_grace_period=0.01)
+        await manager.upsert_task(send_params('t'))
+        release = asyncio.Event()
+
+        async def agent():
+            while not release.is_set():
+                try:
+                    await release.wait()
+                except asyncio.CancelledError:
+                    pass
+
+        agent_task = manager.track_agent_task('t', agent())
+        await asyncio.sleep(0)
+
+        response = await manager.on_cancel_task(_cancel('t'))
+
+        assert response.result.status.state == TaskState.CANCELED
+        assert manager.cancel_stats['agents_unresponsive'] == 1
+        release.set()
+        await agent_task
+
+    asyncio.run(run())
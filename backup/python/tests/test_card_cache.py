@@ -0,0 +1,171 @@
+import asyncio
+
+import httpx
+
+from common.client import A2ACardResolver
+from common.client.card_resolver import _parse_agent_card
+from common.server import A2AServer
+from common.utils.card_cache import AgentCardCache
+from tests.helpers import StubTaskManager, agent_card
+
+
+BASE_URL = 'http://agent.test'
+
+
+def _agent(max_age: int = 300) -> tuple[A2AServer, httpx.AsyncClient, list]:
+    """An agent served in process, and the requests made for its card."""
+    server = A2AServer(
+        agent_card=agent_card(),
+        task_manager=StubTaskManager(),
+        agent_card_max_age=max_age,
+    )
+    requests = []
+
+    async def record(request: httpx.Request):
+        requests.append(request.headers.get('if-none-match'))
+
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=server.app),
+        event_hooks={'request': [record]},
+    )
+    return server, client, requests
+
+
+def _resolver(client: httpx.AsyncClient, cache: AgentCardCache):
+    return A2ACardResolver(BASE_URL, httpx_client=client, cache=cache)
+
+
+def test_fresh_card_is_served_without_requests():
+    async def run():
+        _, client, requests = _agent()
+        cache = AgentCardCache(_parse_agent_card)
+        resolver = _resolver(client, cache)
+
+        cards = [await resolver.get_agent_card_async() for _ in range(3)]
+
+        assert [card.name for card in cards] == ['Test Agent'] * 3
+        assert requests == [None]
+        assert cache.stats['hits'] == 2
+
+    asyncio.run(run())
+
+
+def test_callers_get_their_own_copy():
+    async def run():
+        _, client, _ = _agent()
+        resolver = _resolver(client, AgentCardCache(_parse_agent_card))
+
+        card = await resolver.get_agent_card_async()
+        card.url = 'http://elsewhere/'
+        card.skills.append(None)
+
+        again = await resolver.get_agent_card_async()
+        assert again.url == 'http://localhost/'
+        assert again.skills == []
+        assert again is not card
+
+    asyncio.run(run())
+
+
+def test_expired_card_is_revalidated_with_its_etag():
+    async def run():
+        server, client, requests = _agent(max_age=0)
+        cache = AgentCardCache(_parse_agent_card, stale_while_revalidate=0)
+        resolver = _resolver(client, cache)
+
+        await resolver.get_agent_card_async()
+        await resolver.get_agent_card_async()
+        assert requests[1] is not None
+        assert cache.stats['not_modified'] == 1
+
+        server.agent_card = agent_card(name='Renamed Agent')
+        card = await resolver.get_agent_card_async()
+        assert card.name == 'Renamed Agent'
+        assert cache.stats['not_modified'] == 1
+
+    asyncio.run(run())
+
+
+def test_stale_card_is_served_while_revalidating():
+    async def run():
+        server, client, requests = _agent(max_age=0)
+        cache = AgentCardCache(_parse_agent_card)
+        resolver = _resolver(client, cache)
+        await resolver.get_agent_card_async()
+
+        server.agent_card = agent_card(name='Renamed Agent')
+        stale = await resolver.get_agent_card_async()
+        assert stale.name == 'Test Agent'
+        assert cache.stats['stale_hits'] == 1
+
+        # The background fetch picked up the new card.
+        await asyncio.sleep(0.05)
+        assert len(requests) == 2
+        assert cache._entries[resolver.card_url].card.name == 'Renamed Agent'
+
+    asyncio.run(run())
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def run():
+        _, client, requests = _agent()
+        cache = AgentCardCache(_parse_agent_card)
+        resolver = _resolver(client, cache)
+
+        cards = await asyncio.gather(
+            *(resolver.get_agent_card_async() for _ in range(5))
+        )
+
+        assert requests == [None]
+        assert len({id(card) for card in cards}) == 5
+
+    asyncio.run(run())
+
+
+def test_stale_card_is_not_refreshed_through_a_closed_client():
+    async def run():
+        server, client, requests = _agent(max_age=0)
+        cache = AgentCardCache(_parse_agent_card)
+        await _resolver(client, cache).get_agent_card_async()
+
+        async with httpx.AsyncClient(
+            transport=client._transport
+        ) as short_lived:
+            stale = await _resolver(short_lived, cache).get_agent_card_async()
+        assert stale.name == 'Test Agent'
+
+        await asyncio.sleep(0.05)
+        assert len(requests) == 1
+        assert cache.stats['skipped_refreshes'] == 1
+        assert cache.stats['errors'] == 0
+
+    asyncio.run(run())
+
+
+def test_blocking_lookups_share_the_cache():
+    etags = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        etags.append(request.headers.get('if-none-match'))
+        if etags[-1] == '"v1"':
+            return httpx.Response(304, headers={'cache-control': 'max-age=0'})
+        return httpx.Response(
+            200,
+            content=agent_card().model_dump_json(),
+            headers={'etag': '"v1"', 'cache-control': 'max-age=0'},
+        )
+
+    cache = AgentCardCache(_parse_agent_card)
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    url = BASE_URL + '/.well-known/agent.json'
+
+    assert cache.get_sync(url, client).name == 'Test Agent'
+    # Expired, so revalidated before it is returned.
+    assert cache.get_sync(url, client).name == 'Test Agent'
+    assert etags == [None, '"v1"']
+
+    cache._entries[url].ttl = 300
+    resolver = A2ACardResolver(BASE_URL, cache=cache)
+    assert resolver.get_agent_card().name == 'Test Agent'
+    assert cache.stats['hits'] == 1
+    assert len(etags) == 2
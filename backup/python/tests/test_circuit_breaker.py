@@ -0,0 +1,188 @@
+import asyncio
+
+import httpx
+import pytest
+
+from a2a.types import (
+    AgentCapabilities,
+    AgentCard,
+    InternalError,
+    JSONRPCErrorResponse,
+    Message,
+    MessageSendParams,
+    Part,
+    Role,
+    SendMessageResponse,
+    SendMessageSuccessResponse,
+    Task,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+
+from hosts.multiagent.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+from hosts.multiagent.remote_agent_connection import RemoteAgentConnections
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    return CircuitBreaker(
+        'agent', **{'window_size': 4, 'min_calls': 4, **kwargs}
+    )
+
+
+def test_opens_on_failure_rate_and_fails_fast():
+    breaker = _breaker()
+    for failed in (False, True, False):
+        breaker.before_call()
+        breaker.record(failed, 0.1)
+    assert breaker.state == CircuitState.CLOSED
+
+    breaker.before_call()
+    breaker.record(True, 0.1)
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.is_available
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats == {'rejected': 1, 'opened': 1, 'closed': 0}
+
+
+def test_opens_on_slow_calls():
+    breaker = _breaker(slow_call_seconds=1, slow_call_rate_threshold=0.75)
+    for duration in (2, 2, 0.1, 2):
+        breaker.before_call()
+        breaker.record(False, duration)
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = _breaker(open_seconds=0)
+    breaker._open()
+
+    assert breaker.is_available
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.before_call()
+    # Only one probe at a time.
+    assert not breaker.is_available
+    breaker.record(True, 0.1)
+    assert breaker.state == CircuitState.OPEN
+
+    breaker.before_call()
+    breaker.record(False, 0.1)
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_release_frees_the_probe_slot():
+    breaker = _breaker(open_seconds=0)
+    breaker._open()
+    breaker.before_call()
+    assert not breaker.is_available
+
+    breaker.release()
+
+    assert breaker.is_available
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+class StubA2AClient:
+    """Stands in for the SDK client, answering with a given response."""
+
+    def __init__(self, response=None, delay: float = 0):
+        self.response = response
+        self.delay = delay
+
+    async def send_message(self, request):
+        await asyncio.sleep(self.delay)
+        return self.response
+
+
+def _connection(agent_client: StubA2AClient) -> RemoteAgentConnections:
+    card = AgentCard(
+        name='agent',
+        description='',
+        url='http://agent.test/',
+        version='1.0.0',
+        capabilities=AgentCapabilities(streaming=False),
+        defaultInputModes=['text'],
+        defaultOutputModes=['text'],
+        skills=[],
+    )
+    connection = RemoteAgentConnections(
+        httpx.AsyncClient(), card, _breaker(min_calls=1, window_size=1)
+    )
+    connection.agent_client = agent_client
+    return connection
+
+
+def _params() -> MessageSendParams:
+    return MessageSendParams(
+        message=Message(
+            role=Role.user,
+            parts=[Part(root=TextPart(text='hi'))],
+            messageId='m',
+        )
+    )
+
+
+def test_error_response_counts_as_failure():
+    async def run():
+        connection = _connection(
+            StubA2AClient(
+                SendMessageResponse(
+                    root=JSONRPCErrorResponse(id='1', error=InternalError())
+                )
+            )
+        )
+
+        result = await connection.send_message(_params(), None)
+
+        assert isinstance(result, InternalError)
+        assert connection.circuit_breaker.state == CircuitState.OPEN
+
+    asyncio.run(run())
+
+
+def test_successful_response_counts_as_success():
+    async def run():
+        task = Task(
+            id='t',
+            contextId='c',
+            status=TaskStatus(state=TaskState.completed),
+        )
+        connection = _connection(
+            StubA2AClient(
+                SendMessageResponse(
+                    root=SendMessageSuccessResponse(id='1', result=task)
+                )
+            )
+        )
+
+        assert (await connection.send_message(_params(), None)).id == 't'
+        assert connection.circuit_breaker.state == CircuitState.CLOSED
+        assert list(connection.circuit_breaker._outcomes) == [(False, False)]
+
+    asyncio.run(run())
+
+
+def test_cancelled_call_is_not_recorded():
+    async def run():
+        connection = _connection(StubA2AClient(delay=60))
+        breaker = connection.circuit_breaker
+        breaker.open_seconds = 0
+        breaker._open()
+
+        call = asyncio.create_task(connection.send_message(_params(), None))
+        await asyncio.sleep(0)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+        # The probe slot is free again and nothing was counted.
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.is_available
+        assert breaker.stats['closed'] == 0
+
+    asyncio.run(run())
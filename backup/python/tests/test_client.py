@@ -0,0 +1,396 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from common.client import A2AClient
+from common.client.retry import HedgePolicy, RetryPolicy
+from common.types import A2AClientHTTPError, A2AClientJSONError
+
+
+URL = 'http://agent.test/'
+
+
+def _task_result(request: httpx.Request, state: str = 'completed') -> dict:
+    body = json.loads(request.content)
+    return {
+        'jsonrpc': '2.0',
+        'id': body['id'],
+        'result': {'id': body['params']['id'], 'status': {'state': state}},
+    }
+
+
+def _mock_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+_STREAM_PARAMS = {
+    'id': 't',
+    'message': {'role': 'user', 'parts': [{'type': 'text', 'text': 'hi'}]},
+}
+
+
+def _sse_body(*events: dict) -> bytes:
+    return b''.join(
+        b'data: %s\n\n' % json.dumps(event).encode() for event in events
+    )
+
+
+def _status_update(state: str, final: bool = False) -> dict:
+    return {
+        'jsonrpc': '2.0',
+        'id': 1,
+        'result': {'id': 't', 'status': {'state': state}, 'final': final},
+    }
+
+
+async def _stream(handler, **kwargs) -> list:
+    async with A2AClient(
+        url=URL, httpx_client=_mock_client(handler), **kwargs
+    ) as client:
+        return [
+            response
+            async for response in client.send_task_streaming(_STREAM_PARAMS)
+        ]
+
+
+def test_owned_pool_is_reused_and_closed():
+    async def run():
+        client = A2AClient(url=URL)
+        pool = client.httpx_client
+        assert client.httpx_client is pool
+
+        await client.aclose()
+        assert pool.is_closed
+        # A closed client opens a new pool on its next call.
+        assert not client.httpx_client.is_closed
+        await client.aclose()
+
+    asyncio.run(run())
+
+
+def test_shared_pool_serves_every_call_and_stays_open():
+    async def run():
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(json.loads(request.content)['method'])
+            return httpx.Response(200, json=_task_result(request))
+
+        pool = _mock_client(handler)
+        async with A2AClient(url=URL, httpx_client=pool) as client:
+            assert client.httpx_client is pool
+            for _ in range(3):
+                response = await client.get_task({'id': 't'})
+                assert response.result.status.state == 'completed'
+            await client.send_task(
+                {
+                    'id': 't',
+                    'message': {
+                        'role': 'user',
+                        'parts': [{'type': 'text', 'text': 'hi'}],
+                    },
+                }
+            )
+
+        assert requests == ['tasks/get'] * 3 + ['tasks/send']
+        assert not pool.is_closed
+        await pool.aclose()
+
+    asyncio.run(run())
+
+
+def test_streaming_parses_each_event():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={'content-type': 'text/event-stream'},
+            content=_sse_body(
+                _status_update('working'),
+                _status_update('completed', final=True),
+            ),
+        )
+
+    responses = asyncio.run(_stream(handler))
+
+    assert [r.result.status.state for r in responses] == [
+        'working',
+        'completed',
+    ]
+    assert responses[-1].result.final
+
+
+def test_streaming_returns_a_rejected_request_as_one_response():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            json={
+                'jsonrpc': '2.0',
+                'id': 1,
+                'error': {'code': -32004, 'message': 'Not supported'},
+            },
+        )
+
+    responses = asyncio.run(_stream(handler))
+
+    assert len(responses) == 1
+    assert responses[0].error.code == -32004
+
+
+def test_streaming_errors_are_client_errors():
+    def failing(status_code: int):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(status_code)
+
+        return handler
+
+    with pytest.raises(A2AClientHTTPError) as e:
+        asyncio.run(_stream(failing(503)))
+    assert e.value.status_code == 503
+
+    def idle(request: httpx.Request) -> httpx.Response:
+        raise httpx.ReadTimeout('no data', request=request)
+
+    with pytest.raises(A2AClientHTTPError) as e:
+        asyncio.run(_stream(idle, stream_idle_timeout=0.1))
+    assert e.value.status_code == 408
+
+    def garbled(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={'content-type': 'text/event-stream'},
+            content=b'data: {not json\n\n',
+        )
+
+    with pytest.raises(A2AClientJSONError):
+        asyncio.run(_stream(garbled))
+
+
+def _retry_policy(**kwargs) -> RetryPolicy:
+    return RetryPolicy(**{'initial_backoff': 0, 'jitter': 0, **kwargs})
+
+
+def _failing_then_ok(failures: int, status_code: int = 503):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content)['method'])
+        if len(calls) <= failures:
+            return httpx.Response(status_code)
+        return httpx.Response(200, json=_task_result(request))
+
+    return handler, calls
+
+
+def test_idempotent_calls_are_retried():
+    async def run():
+        handler, calls = _failing_then_ok(2)
+        client = A2AClient(
+            url=URL,
+            httpx_client=_mock_client(handler),
+            retry_policy=_retry_policy(),
+        )
+
+        response = await client.get_task({'id': 't'})
+
+        assert response.result.id == 't'
+        assert len(calls) == 3
+        assert client.metrics.retries == 2
+
+    asyncio.run(run())
+
+
+def test_calls_that_must_not_be_retried_fail_at_once():
+    async def run():
+        # Not a retryable status.
+        handler, calls = _failing_then_ok(1, status_code=400)
+        client = A2AClient(
+            url=URL,
+            httpx_client=_mock_client(handler),
+            retry_policy=_retry_policy(),
+        )
+        with pytest.raises(A2AClientHTTPError):
+            await client.get_task({'id': 't'})
+        assert len(calls) == 1
+
+        # Not an idempotent method.
+        handler, calls = _failing_then_ok(1)
+        client = A2AClient(
+            url=URL,
+            httpx_client=_mock_client(handler),
+            retry_policy=_retry_policy(),
+        )
+        with pytest.raises(A2AClientHTTPError):
+            await client.cancel_task({'id': 't'})
+        assert calls == ['tasks/cancel']
+        assert client.metrics.retries == 0
+
+    asyncio.run(run())
+
+
+def test_retries_stop_at_max_attempts_and_budget():
+    async def run():
+        handler, calls = _failing_then_ok(10)
+        client = A2AClient(
+            url=URL,
+            httpx_client=_mock_client(handler),
+            retry_policy=_retry_policy(max_attempts=3),
+        )
+        with pytest.raises(A2AClientHTTPError):
+            await client.get_task({'id': 't'})
+        assert len(calls) == 3
+        assert client.metrics.retries_exhausted == 1
+
+        handler, calls = _failing_then_ok(10)
+        client = A2AClient(
+            url=URL,
+            httpx_client=_mock_client(handler),
+            retry_policy=_retry_policy(
+                max_attempts=5, budget_ratio=0, budget_burst=2
+            ),
+        )
+        with pytest.raises(A2AClientHTTPError):
+            await client.get_task({'id': 't'})
+        # The budget allowed two retries, and none are left for later calls.
+        assert len(calls) == 3
+        with pytest.raises(A2AClientHTTPError):
+            await client.get_task({'id': 't'})
+        assert len(calls) == 4
+        assert client.metrics.retry_budget_exhausted == 2
+
+    asyncio.run(run())
+
+
+def _batch_handler(drop: set[str] = frozenset(), failures: int = 0):
+    """Answers batches in reverse order, leaving out the tasks in `drop`."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) <= failures:
+            return httpx.Response(503)
+        return httpx.Response(
+            200,
+            json=[
+                {
+                    'jsonrpc': '2.0',
+                    'id': item['id'],
+                    'result': {
+                        'id': item['params']['id'],
+                        'status': {'state': 'completed'},
+                    },
+                }
+                for item in reversed(json.loads(request.content))
+                if item['params']['id'] not in drop
+            ],
+        )
+
+    return handler, calls
+
+
+def test_batch_responses_are_matched_to_requests():
+    async def run():
+        handler, calls = _batch_handler(failures=1)
+        client = A2AClient(
+            url=URL,
+            httpx_client=_mock_client(handler),
+            retry_policy=_retry_policy(),
+        )
+
+        responses = await client.get_tasks([{'id': 'a'}, {'id': 'b'}])
+
+        assert [response.result.id for response in responses] == ['a', 'b']
+        # The batch only reads tasks, so it is retried like get_task.
+        assert len(calls) == 2
+        assert client.metrics.retries == 1
+
+    asyncio.run(run())
+
+
+def test_batch_response_missing_a_reply_is_an_error():
+    async def run():
+        handler, _ = _batch_handler(drop={'b'})
+        client = A2AClient(url=URL, httpx_client=_mock_client(handler))
+
+        with pytest.raises(A2AClientJSONError, match='no reply'):
+            await client.get_tasks([{'id': 'a'}, {'id': 'b'}])
+
+    asyncio.run(run())
+
+
+def _slow_first_call(delay: float):
+    calls = []
+    cancelled = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(len(calls))
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        return httpx.Response(200, json=_task_result(request))
+
+    return handler, calls, cancelled
+
+
+def test_slow_read_is_hedged():
+    async def run():
+        handler, calls, cancelled = _slow_first_call(5)
+        client = A2AClient(
+            url=URL,
+            httpx_client=_mock_client(handler),
+            hedge_policy=HedgePolicy(delay=0.01),
+        )
+
+        response = await client.get_task({'id': 't'})
+        await asyncio.sleep(0)
+
+        assert response.result.id == 't'
+        assert len(calls) == 2
+        assert cancelled == [True]
+        assert client.metrics.hedges == client.metrics.hedge_wins == 1
+
+    asyncio.run(run())
+
+
+def test_fast_read_is_not_hedged():
+    async def run():
+        handler, calls, _ = _slow_first_call(0)
+        client = A2AClient(
+            url=URL,
+            httpx_client=_mock_client(handler),
+            hedge_policy=HedgePolicy(delay=1),
+        )
+
+        await client.get_task({'id': 't'})
+
+        assert len(calls) == 1
+        assert client.metrics.hedges == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_caller_cancels_pending_attempt():
+    async def run():
+        handler, calls, cancelled = _slow_first_call(5)
+        client = A2AClient(
+            url=URL,
+            httpx_client=_mock_client(handler),
+            hedge_policy=HedgePolicy(delay=1),
+        )
+
+        call = asyncio.create_task(client.get_task({'id': 't'}))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        await asyncio.sleep(0)
+
+        # Cancelled during the hedge delay, before a hedge was sent.
+        assert len(calls) == 1
+        assert cancelled == [True]
+
+    asyncio.run(run())
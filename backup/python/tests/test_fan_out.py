@@ -0,0 +1,174 @@
+import asyncio
+import json
+
+import httpx
+
+from common.client import A2AClient, FanOutMode, fan_out, send_task_to_agents
+
+
+def _call(result, delay: float = 0, log: list | None = None):
+    async def call():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(result)
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return call
+
+
+def test_all_waits_for_every_call():
+    async def run():
+        results = await fan_out(
+            {
+                'a': _call('a', 0.02),
+                'b': _call(ValueError('b')),
+                'c': _call('c', 0.01),
+            }
+        )
+
+        assert results['a'].result == 'a' and results['a'].succeeded
+        assert isinstance(results['b'].error, ValueError)
+        assert not results['b'].succeeded
+        assert results['c'].latency > 0
+        assert not any(r.canceled for r in results.values())
+
+    asyncio.run(run())
+
+
+def test_call_that_cancels_itself_is_recorded_as_canceled():
+    async def run():
+        async def cancel_itself():
+            raise asyncio.CancelledError
+
+        results = await fan_out({'a': cancel_itself, 'b': _call('b')})
+
+        assert results['a'].canceled and results['a'].error is None
+        assert results['b'].succeeded
+
+    asyncio.run(run())
+
+
+def test_first_success_cancels_the_losers():
+    async def run():
+        cancelled = []
+        results = await fan_out(
+            {
+                'slow': _call('slow', 5, cancelled),
+                'failing': _call(ValueError('failing')),
+                'fast': _call('fast', 0.01),
+            },
+            mode=FanOutMode.FIRST_SUCCESS,
+        )
+
+        assert results['fast'].succeeded
+        assert results['slow'].canceled
+        assert cancelled == ['slow']
+        assert results['failing'].error is not None
+
+    asyncio.run(run())
+
+
+def test_quorum_stops_once_met_or_out_of_reach():
+    async def run():
+        cancelled = []
+        results = await fan_out(
+            {
+                'a': _call('a', 0.01),
+                'b': _call('b', 0.02),
+                'c': _call('c', 5, cancelled),
+            },
+            mode=FanOutMode.QUORUM,
+        )
+        assert [k for k, r in results.items() if r.succeeded] == ['a', 'b']
+        assert cancelled == ['c']
+
+        # Two failures leave a quorum of two out of reach.
+        results = await fan_out(
+            {
+                'a': _call(ValueError('a')),
+                'b': _call(ValueError('b')),
+                'c': _call('c', 5, cancelled),
+            },
+            mode=FanOutMode.QUORUM,
+            quorum=2,
+        )
+        assert results['c'].canceled
+        assert cancelled == ['c', 'c']
+
+    asyncio.run(run())
+
+
+def test_concurrency_and_timeout_are_applied():
+    async def run():
+        running = 0
+        peak = 0
+
+        def tracked():
+            async def call():
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                return True
+
+            return call
+
+        await fan_out({str(i): tracked() for i in range(6)}, concurrency=2)
+        assert peak == 2
+
+        results = await fan_out({'slow': _call('slow', 5)}, timeout=0.01)
+        assert isinstance(results['slow'].error, TimeoutError)
+
+    asyncio.run(run())
+
+
+def test_send_task_to_agents_counts_error_responses_as_failures():
+    async def run():
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            if request.url.host == 'bad.test':
+                return httpx.Response(
+                    200,
+                    json={
+                        'jsonrpc': '2.0',
+                        'id': body['id'],
+                        'error': {'code': -32603, 'message': 'boom'},
+                    },
+                )
+            return httpx.Response(
+                200,
+                json={
+                    'jsonrpc': '2.0',
+                    'id': body['id'],
+                    'result': {'id': 't', 'status': {'state': 'completed'}},
+                },
+            )
+
+        pool = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        clients = {
+            name: A2AClient(url=f'http://{name}.test/', httpx_client=pool)
+            for name in ('good', 'bad')
+        }
+        payload = {
+            'id': 't',
+            'message': {
+                'role': 'user',
+                'parts': [{'type': 'text', 'text': 'hi'}],
+            },
+        }
+
+        results = await send_task_to_agents(clients, payload)
+
+        assert results['good'].succeeded
+        assert results['good'].result.result.id == 't'
+        assert not results['bad'].succeeded
+        assert results['bad'].result.error.code == -32603
+        await pool.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from common.server.frames import LoggedEvent, SSEFrameEncoder
+from common.types import InternalError, TaskState
+from common.utils import json_utils
+from tests.helpers import status_event
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def json_backend(request, monkeypatch):
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(json_utils, 'orjson', None)
+    return request.param
+
+
+def test_dumps_models_like_model_dump_json(json_backend):
+    event = status_event('t', TaskState.COMPLETED, final=True)
+    assert json.loads(json_utils.dumps(event)) == json.loads(
+        event.model_dump_json(exclude_none=True)
+    )
+    assert json_utils.dumps({'text': 'héllo'}) == '{"text":"héllo"}'.encode()
+
+
+def test_models_go_through_orjson(monkeypatch):
+    orjson = pytest.importorskip('orjson')
+    dumped = []
+
+    class SpyOrjson:
+        @staticmethod
+        def dumps(obj):
+            dumped.append(obj)
+            return orjson.dumps(obj)
+
+    monkeypatch.setattr(json_utils, 'orjson', SpyOrjson)
+    json_utils.dumps(status_event('t'))
+    assert len(dumped) == 1
+    assert dumped[0]['id'] == 't'
+    assert 'metadata' not in dumped[0]
+
+
+def test_payload_is_serialized_once_and_shared(json_backend):
+    logged = LoggedEvent.from_event(status_event('t'), event_id=3)
+    frames = [SSEFrameEncoder(rid).encode(logged) for rid in (1, 'b', None)]
+
+    for frame, request_id in zip(frames, (1, 'b', None)):
+        assert frame.frame.startswith(b'id: 3\ndata: ')
+        assert frame.frame.endswith(b'}\n\n')
+        payload = json.loads(frame.frame.split(b'data: ', 1)[1])
+        assert payload.get('id') == request_id
+        assert payload['result'] == json.loads(logged.payload)
+        assert frame.logged_event is logged
+        assert frame.response.result == logged.event
+
+
+def test_error_events_are_terminal(json_backend):
+    logged = LoggedEvent.from_event(InternalError())
+    frame = SSEFrameEncoder(1).encode(logged)
+    assert logged.is_terminal
+    assert b'"error":' in frame.frame
+    assert frame.response.error == logged.event
@@ -0,0 +1,240 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from common.utils.in_memory_cache import (
+    EvictionPolicy,
+    InMemoryCache,
+    estimate_size,
+)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """A fresh InMemoryCache instead of the process-wide singleton."""
+    monkeypatch.setattr(InMemoryCache, '_instance', None)
+    monkeypatch.setattr(InMemoryCache, 'stripes', 1)
+    cache = InMemoryCache()
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def striped_cache(monkeypatch):
+    """A fresh InMemoryCache with the default lock striping."""
+    monkeypatch.setattr(InMemoryCache, '_instance', None)
+    cache = InMemoryCache()
+    assert len(cache._stores) > 1
+    yield cache
+    cache.close()
+
+
+def test_lru_evicts_least_recently_used(cache):
+    cache.configure(max_entries=3)
+    for key in 'abc':
+        cache.set(key, key)
+    cache.get('a')
+    cache.set('d', 'd')
+
+    assert cache.get('b') is None
+    assert [cache.get(key) for key in 'acd'] == ['a', 'c', 'd']
+    assert cache.stats()['default'].evictions == 1
+
+
+def test_lfu_evicts_least_frequently_used(cache):
+    cache.configure(max_entries=3, policy=EvictionPolicy.LFU)
+    for key in 'abc':
+        cache.set(key, key)
+    for _ in range(2):
+        cache.get('a')
+        cache.get('c')
+    cache.set('d', 'd')
+
+    assert cache.get('b') is None
+    assert [cache.get(key) for key in 'acd'] == ['a', 'c', 'd']
+
+
+def test_byte_budget_evicts_until_it_fits(cache):
+    cache.configure(max_bytes=100)
+    cache.set('a', 'x', size=40)
+    cache.set('b', 'x', size=40)
+    cache.set('c', 'x', size=40)
+
+    assert cache.get('a') is None
+    assert cache.stats()['default'].bytes == 80
+
+    # A value larger than the whole budget is not cached at all.
+    cache.set('huge', 'x', size=101)
+    assert cache.get('huge') is None
+    assert cache.get('c') == 'x'
+
+
+def test_sizes_are_estimated(cache):
+    cache.set('image', {'data': 'x' * 10_000})
+
+    assert cache.stats()['default'].bytes >= 10_000
+    assert estimate_size(b'x' * 500) == 500
+
+
+def test_expired_entries_are_not_returned(cache, monkeypatch):
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now)
+    cache.set('a', 'a', ttl=10)
+    cache.set('b', 'b', ttl=20)
+    assert cache.get('a') == 'a'
+
+    now += 15
+    assert cache.get('a') is None
+    assert cache.sweep() == 0
+    now += 10
+    assert cache.sweep() == 1
+    assert cache.stats()['default'].expirations == 2
+
+
+def test_namespaces_keep_keys_and_stats_apart(cache):
+    sessions = cache.namespace('sessions')
+    images = cache.namespace('images')
+    sessions.set('k', 'session')
+    images.set('k', 'image')
+
+    assert sessions.get('k') == 'session'
+    assert images.get('k') == 'image'
+    assert cache.get('k') is None
+
+    images.clear()
+    assert images.get('k') is None
+    assert sessions.get('k') == 'session'
+    assert sessions.stats().hits == 2
+    assert images.stats().entries == 0
+
+
+def _entries(cache: InMemoryCache) -> int:
+    return sum(stats.entries for stats in cache.stats().values())
+
+
+@pytest.mark.parametrize('max_entries', [2, 100])
+def test_entry_limit_is_exact_across_stripes(striped_cache, max_entries):
+    striped_cache.configure(max_entries=max_entries)
+    for i in range(max_entries):
+        striped_cache.set(f'k{i}', i)
+    assert _entries(striped_cache) == max_entries
+    assert striped_cache.stats()['default'].evictions == 0
+
+    for i in range(max_entries, max_entries + 10):
+        striped_cache.set(f'k{i}', i)
+    assert _entries(striped_cache) == max_entries
+    # The oldest keys went first, whichever stripe they were in.
+    assert striped_cache.get('k9') is None
+    assert striped_cache.get(f'k{max_entries + 9}') == max_entries + 9
+    if max_entries > 10:
+        assert striped_cache.get('k10') == 10
+
+
+def test_eviction_order_is_cache_wide(striped_cache):
+    striped_cache.configure(max_entries=20)
+    for i in range(20):
+        striped_cache.set(f'k{i}', i)
+    for i in range(10):
+        striped_cache.get(f'k{i}')
+    for i in range(20, 30):
+        striped_cache.set(f'k{i}', i)
+
+    assert [striped_cache.get(f'k{i}') for i in range(10, 20)] == [None] * 10
+    assert all(striped_cache.get(f'k{i}') == i for i in range(10))
+
+
+def test_lfu_evicts_past_the_new_key(striped_cache):
+    striped_cache.configure(max_entries=3, policy=EvictionPolicy.LFU)
+    for key in 'abc':
+        striped_cache.set(key, key)
+        striped_cache.get(key)
+    striped_cache.get('a')
+
+    # 'd' is the least frequently used, but it is the key being written.
+    striped_cache.set('d', 'd')
+
+    assert _entries(striped_cache) == 3
+    assert striped_cache.get('b') is None
+    assert [striped_cache.get(key) for key in 'acd'] == ['a', 'c', 'd']
+
+
+def test_byte_budget_is_cache_wide(striped_cache):
+    striped_cache.configure(max_bytes=100)
+    for i in range(10):
+        striped_cache.set(f'k{i}', i, size=20)
+
+    assert striped_cache.stats()['default'].bytes == 100
+    assert [striped_cache.get(f'k{i}') for i in range(5)] == [None] * 5
+
+
+def test_get_or_compute_shares_one_computation(striped_cache):
+    calls = 0
+    release = threading.Event()
+
+    def compute():
+        nonlocal calls
+        calls += 1
+        release.wait()
+        return 'value'
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                striped_cache.get_or_compute('k', compute)
+            )
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    while striped_cache.stats().get('default', None) is None or (
+        striped_cache.stats()['default'].coalesced < 4
+    ):
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['value'] * 5
+    assert calls == 1
+    assert striped_cache.get_or_compute('k', compute) == 'value'
+    assert calls == 1
+
+
+def test_get_or_compute_does_not_cache_errors(striped_cache):
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        striped_cache.get_or_compute('k', fail)
+    assert striped_cache.get_or_compute('k', lambda: 'ok') == 'ok'
+
+    # None results are only cached with a negative TTL.
+    assert striped_cache.get_or_compute('none', lambda: None) is None
+    assert striped_cache.get_or_compute('none', lambda: 1) == 1
+    striped_cache.get_or_compute('missing', lambda: None, negative_ttl=60)
+    assert striped_cache.get_or_compute('missing', lambda: 1) is None
+
+
+def test_aget_or_compute_shares_one_computation(striped_cache):
+    async def run():
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 'value'
+
+        results = await asyncio.gather(
+            *(striped_cache.aget_or_compute('k', compute) for _ in range(5))
+        )
+
+        assert results == ['value'] * 5
+        assert calls == 1
+        assert striped_cache.stats()['default'].coalesced == 4
+
+    asyncio.run(run())
@@ -0,0 +1,85 @@
+import hashlib
+
+import jwt
+import pytest
+
+from jwt import PyJWK
+
+from common.utils.push_notification_auth import (
+    PushNotificationSenderAuth,
+    SigningAlgorithm,
+)
+
+
+NOTIFICATION = {'id': 'task-1', 'status': {'state': 'completed'}}
+
+
+def _decode(sender: PushNotificationSenderAuth, token: str) -> dict:
+    """Verifies a token against the keys the sender publishes."""
+    kid = jwt.get_unverified_header(token)['kid']
+    (public_key,) = [
+        PyJWK(key) for key in sender.public_keys if key['kid'] == kid
+    ]
+    return jwt.decode(
+        token, public_key, algorithms=[public_key.algorithm_name]
+    )
+
+
+@pytest.mark.parametrize('algorithm', list(SigningAlgorithm))
+def test_notifications_are_signed_with_the_chosen_algorithm(algorithm):
+    sender = PushNotificationSenderAuth(algorithm)
+    sender.generate_jwk()
+
+    body, headers = sender.sign_request_body(NOTIFICATION)
+    token = headers['Authorization'].removeprefix('Bearer ')
+
+    assert jwt.get_unverified_header(token)['alg'] == algorithm.value
+    claims = _decode(sender, token)
+    assert claims['request_body_sha256'] == hashlib.sha256(body).hexdigest()
+    assert claims['jti']
+    assert headers['Content-Type'] == 'application/json'
+
+
+def test_each_token_has_its_own_id():
+    sender = PushNotificationSenderAuth(SigningAlgorithm.EDDSA)
+    sender.generate_jwk()
+
+    tokens = [sender._generate_jwt(NOTIFICATION) for _ in range(2)]
+
+    assert len({_decode(sender, token)['jti'] for token in tokens}) == 2
+
+
+def test_rotation_keeps_recent_keys_published():
+    sender = PushNotificationSenderAuth(max_active_keys=2)
+    sender.generate_jwk(SigningAlgorithm.ES256)
+    old_token = sender._generate_jwt(NOTIFICATION)
+    first_kid = sender.private_key_jwk.key_id
+
+    sender.rotate_key(SigningAlgorithm.EDDSA)
+    new_token = sender._generate_jwt(NOTIFICATION)
+
+    # Both tokens verify, each with its own key.
+    assert sender.algorithm == SigningAlgorithm.EDDSA
+    assert _decode(sender, old_token)['request_body_sha256']
+    assert _decode(sender, new_token)['request_body_sha256']
+    assert jwt.get_unverified_header(new_token)['kid'] != first_kid
+
+    # The oldest key goes once max_active_keys newer ones are published.
+    sender.rotate_key()
+    assert len(sender.public_keys) == 2
+    assert first_kid not in [key['kid'] for key in sender.public_keys]
+
+
+def test_retired_keys_are_no_longer_published():
+    sender = PushNotificationSenderAuth(SigningAlgorithm.EDDSA)
+    sender.generate_jwk()
+    old_kid = sender.private_key_jwk.key_id
+    sender.rotate_key()
+
+    with pytest.raises(ValueError):
+        sender.retire_key(sender.private_key_jwk.key_id)
+    sender.retire_key(old_kid)
+
+    assert [key['kid'] for key in sender.public_keys] == [
+        sender.private_key_jwk.key_id
+    ]
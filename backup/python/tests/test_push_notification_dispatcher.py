@@ -0,0 +1,223 @@
+import asyncio
+import json
+
+import httpx
+
+from common.utils.push_notification_auth import (
+    PushNotificationSenderAuth,
+    SigningAlgorithm,
+)
+from common.utils.push_notification_dispatcher import (
+    PushNotificationDispatcher,
+)
+
+
+URL = 'http://webhook.test/notify'
+DESTINATION = 'http://webhook.test'
+
+
+def _task(task_id: str, state: str = 'working') -> dict:
+    return {'id': task_id, 'status': {'state': state}}
+
+
+async def _dispatcher(handler, **kwargs) -> PushNotificationDispatcher:
+    """A dispatcher whose notifications are answered by `handler`."""
+    sender = PushNotificationSenderAuth(SigningAlgorithm.EDDSA)
+    sender.generate_jwk()
+    dispatcher = PushNotificationDispatcher(
+        sender, **{'backoff_base': 0, **kwargs}
+    )
+    dispatcher._ensure_workers()
+    await dispatcher._client.aclose()
+    dispatcher._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler)
+    )
+    return dispatcher
+
+
+def test_notifications_are_signed_and_delivered():
+    async def run():
+        received = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.headers['authorization'].startswith('Bearer ')
+            received.append(json.loads(request.content)['id'])
+            return httpx.Response(200)
+
+        dispatcher = await _dispatcher(handler)
+        for task_id in 'abc':
+            assert dispatcher.enqueue(URL, _task(task_id))
+        await dispatcher.join()
+
+        assert sorted(received) == ['a', 'b', 'c']
+        stats = dispatcher.stats()[DESTINATION]
+        assert stats.enqueued == stats.delivered == 3
+        assert dispatcher.queue_depth == 0
+        await dispatcher.close()
+
+    asyncio.run(run())
+
+
+def test_updates_of_a_task_are_coalesced_and_in_order():
+    async def run():
+        received = []
+        release = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            received.append(json.loads(request.content)['status']['state'])
+            await release.wait()
+            return httpx.Response(200)
+
+        dispatcher = await _dispatcher(handler)
+        dispatcher.enqueue(URL, _task('t', 'submitted'))
+        while not received:
+            await asyncio.sleep(0)
+
+        # Both wait for the first one, and the last replaces the other.
+        dispatcher.enqueue(URL, _task('t', 'working'))
+        dispatcher.enqueue(URL, _task('t', 'completed'))
+        release.set()
+        await dispatcher.join()
+
+        assert received == ['submitted', 'completed']
+        assert dispatcher.stats()[DESTINATION].coalesced == 1
+        await dispatcher.close()
+
+    asyncio.run(run())
+
+
+def test_failed_deliveries_are_retried():
+    async def run():
+        responses = {'flaky': [503, 503, 200], 'rejected': [400], 'down': []}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            codes = responses[json.loads(request.content)['id']]
+            return httpx.Response(codes.pop(0) if codes else 500)
+
+        dispatcher = await _dispatcher(handler, max_attempts=3)
+        for task_id in responses:
+            dispatcher.enqueue(URL, _task(task_id))
+        await dispatcher.join()
+
+        stats = dispatcher.stats()[DESTINATION]
+        assert stats.delivered == 1
+        # 'rejected' is not retried, 'down' runs out of attempts.
+        assert stats.failed == 2
+        assert stats.retried == 4
+        await dispatcher.close()
+
+    asyncio.run(run())
+
+
+def test_full_queue_drops_notifications():
+    async def run():
+        dispatcher = await _dispatcher(
+            lambda _: httpx.Response(200), max_queue_size=1
+        )
+
+        assert dispatcher.enqueue(URL, _task('a'))
+        assert not dispatcher.enqueue(URL, _task('b'))
+        # An update of a queued task still fits.
+        assert dispatcher.enqueue(URL, _task('a', 'completed'))
+        await dispatcher.join()
+
+        stats = dispatcher.stats()[DESTINATION]
+        assert (stats.delivered, stats.dropped) == (1, 1)
+        await dispatcher.close()
+
+    asyncio.run(run())
+
+
+def test_concurrency_per_destination_is_limited():
+    async def run():
+        running = 0
+        peak = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return httpx.Response(200)
+
+        dispatcher = await _dispatcher(handler, max_per_destination=2)
+        for i in range(6):
+            dispatcher.enqueue(URL, _task(str(i)))
+        await dispatcher.join()
+
+        assert peak == 2
+        await dispatcher.close()
+
+    asyncio.run(run())
+
+
+def test_close_waits_for_the_queue():
+    async def run():
+        received = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(0.01)
+            received.append(request)
+            return httpx.Response(200)
+
+        dispatcher = await _dispatcher(handler)
+        dispatcher.enqueue(URL, _task('a'))
+
+        await dispatcher.close()
+
+        assert len(received) == 1
+        assert dispatcher._workers == []
+        assert dispatcher._client is None
+
+    asyncio.run(run())
+
+
+def test_url_verification_is_shared_and_cached():
+    async def run():
+        checks = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            checks.append(request.url.host)
+            await asyncio.sleep(0.01)
+            if request.url.host == 'bad.test':
+                return httpx.Response(404)
+            token = request.url.params['validationToken']
+            return httpx.Response(200, text=token)
+
+        dispatcher = await _dispatcher(handler)
+
+        results = await asyncio.gather(
+            *(dispatcher.verify_url(URL) for _ in range(3))
+        )
+        assert results == [True] * 3
+        assert await dispatcher.verify_url(URL)
+        assert not await dispatcher.verify_url('http://bad.test/notify')
+        assert not await dispatcher.verify_url('http://bad.test/notify')
+        assert checks == ['webhook.test', 'bad.test']
+        await dispatcher.close()
+
+    asyncio.run(run())
+
+
+def test_idle_destinations_are_forgotten():
+    async def run():
+        dispatcher = await _dispatcher(
+            lambda _: httpx.Response(200), max_destinations=2
+        )
+        for host in ('a', 'b', 'c'):
+            dispatcher.enqueue(f'http://{host}.test/notify', _task(host))
+        await dispatcher.join()
+
+        assert dispatcher._destination_limits == {}
+        assert list(dispatcher.stats()) == ['http://b.test', 'http://c.test']
+
+        # Notifying a destination again keeps its stats.
+        dispatcher.enqueue('http://b.test/notify', _task('b'))
+        dispatcher.enqueue('http://d.test/notify', _task('d'))
+        await dispatcher.join()
+        assert list(dispatcher.stats()) == ['http://b.test', 'http://d.test']
+        assert dispatcher.stats()['http://b.test'].delivered == 2
+        await dispatcher.close()
+
+    asyncio.run(run())
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from starlette.applications import Starlette
+
+from common.utils.push_notification_auth import (
+    JWKSClient,
+    PushNotificationReceiverAuth,
+    PushNotificationSenderAuth,
+    ReplayCache,
+    SigningAlgorithm,
+)
+from hosts.cli.push_notification_listener import PushNotificationListener
+
+
+BASE_URL = 'http://receiver.test'
+NOTIFICATION = {'id': 'task-1', 'status': {'state': 'completed'}}
+
+
+class Receiver:
+    """A listener served in process, with the sender whose JWKS it trusts."""
+
+    def __init__(self):
+        self.sender = PushNotificationSenderAuth(SigningAlgorithm.EDDSA)
+        self.sender.generate_jwk()
+        self.auth = PushNotificationReceiverAuth()
+        self.listener = PushNotificationListener('localhost', 0, self.auth)
+        self.jwks_requests = 0
+
+        app = Starlette()
+        app.add_route('/jwks', self.sender.handle_jwks_endpoint)
+        app.add_route(
+            '/notify', self.listener.handle_notification, methods=['POST']
+        )
+
+        async def count(request: httpx.Request):
+            if request.url.path == '/jwks':
+                self.jwks_requests += 1
+
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url=BASE_URL,
+            event_hooks={'request': [count]},
+        )
+        self.auth.jwks_client = JWKSClient(
+            f'{BASE_URL}/jwks', httpx_client=self.client
+        )
+
+    async def notify(
+        self, body: bytes | None = None, headers: dict | None = None
+    ) -> int:
+        if body is None:
+            body, headers = self.sender.sign_request_body(NOTIFICATION)
+        response = await self.client.post(
+            '/notify', content=body, headers=headers
+        )
+        return response.status_code
+
+    def close(self):
+        self.listener.loop.call_soon_threadsafe(self.listener.loop.stop)
+
+
+@pytest.fixture
+def receiver():
+    receiver = Receiver()
+    yield receiver
+    receiver.close()
+
+
+def test_signed_notification_is_accepted_once(receiver):
+    async def run():
+        body, headers = receiver.sender.sign_request_body(NOTIFICATION)
+
+        assert await receiver.notify(body, headers) == 200
+        # The same token again is a replay.
+        assert await receiver.notify(body, headers) == 401
+        assert await receiver.notify() == 200
+
+    asyncio.run(run())
+
+
+def test_raw_body_is_verified_as_received(receiver):
+    async def run():
+        body = json.dumps(NOTIFICATION, indent=2).encode()
+        token = receiver.sender._generate_jwt(body)
+        headers = {'Authorization': f'Bearer {token}'}
+        assert await receiver.notify(body, headers) == 200
+
+        body, headers = receiver.sender.sign_request_body(NOTIFICATION)
+        tampered = body.replace(b'completed', b'failed')
+        assert await receiver.notify(tampered, headers) == 401
+
+    asyncio.run(run())
+
+
+def test_missing_or_expired_tokens_are_rejected(receiver, monkeypatch):
+    async def run():
+        body, _ = receiver.sender.sign_request_body(NOTIFICATION)
+        assert await receiver.notify(body, {}) == 401
+
+        now = time.time()
+        _, headers = receiver.sender.sign_request_body(NOTIFICATION)
+        monkeypatch.setattr(
+            time, 'time', lambda: now + receiver.auth.max_token_age + 1
+        )
+        assert await receiver.notify(body, headers) == 401
+
+    asyncio.run(run())
+
+
+def test_keys_are_fetched_again_only_for_new_kids(receiver):
+    async def run():
+        for _ in range(3):
+            assert await receiver.notify() == 200
+        assert receiver.jwks_requests == 1
+
+        # A rotated key is unknown until the JWKS is fetched again.
+        receiver.auth.jwks_client.min_refresh_interval = 0
+        receiver.sender.rotate_key()
+        assert await receiver.notify() == 200
+        assert receiver.jwks_requests == 2
+
+        # Unknown kids cannot trigger a fetch per notification.
+        receiver.auth.jwks_client.min_refresh_interval = 60
+        other = PushNotificationSenderAuth(SigningAlgorithm.EDDSA)
+        other.generate_jwk()
+        body, headers = other.sign_request_body(NOTIFICATION)
+        for _ in range(3):
+            assert await receiver.notify(body, headers) == 401
+        assert receiver.jwks_requests == 2
+
+    asyncio.run(run())
+
+
+def test_concurrent_misses_share_one_fetch(receiver):
+    async def run():
+        statuses = await asyncio.gather(
+            *(receiver.notify() for _ in range(5))
+        )
+
+        assert statuses == [200] * 5
+        assert receiver.jwks_requests == 1
+
+    asyncio.run(run())
+
+
+def test_replay_cache_forgets_tokens_after_the_window(monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now)
+    cache = ReplayCache(window=10)
+
+    assert cache.check_and_add('a', now)
+    assert not cache.check_and_add('a', now)
+
+    now += 11
+    assert cache.check_and_add('b', now)
+    assert 'a' not in cache._seen
@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+from starlette.testclient import TestClient
+
+from common.server import A2AServer
+from common.server.event_log import TaskEventLog
+from common.types import TaskState, TaskStatus
+from tests.helpers import (
+    StubTaskManager,
+    agent_card,
+    send_params,
+    status_event,
+)
+
+
+def test_event_log_replays_events_after_id():
+    log = TaskEventLog(maxlen=3)
+    for _ in range(5):
+        log.append(status_event('t'))
+
+    assert [e.event_id for e in log.since(3)] == [4, 5]
+    assert log.since(5) == []
+    # Events 1 and 2 fell out of the ring buffer.
+    assert [e.event_id for e in log.since(0)] == [3, 4, 5]
+    assert not log.is_complete_since(1)
+    assert log.is_complete_since(2)
+
+
+def test_event_log_closes_on_final_event():
+    log = TaskEventLog()
+    log.append(status_event('t'))
+    assert not log.closed
+    log.append(status_event('t', TaskState.COMPLETED, final=True))
+    assert log.closed
+
+
+async def _stream_task(manager: StubTaskManager, task_id: str, updates: int):
+    await manager.upsert_task(send_params(task_id))
+    for i in range(updates):
+        final = i == updates - 1
+        state = TaskState.COMPLETED if final else TaskState.WORKING
+        await manager.update_store(task_id, TaskStatus(state=state), None)
+        await manager.enqueue_events_for_sse(
+            task_id, status_event(task_id, state, final)
+        )
+
+
+def test_resubscriber_gets_missed_then_live_events():
+    async def run():
+        manager = StubTaskManager()
+        await manager.upsert_task(send_params('t'))
+        for _ in range(3):
+            await manager.enqueue_events_for_sse('t', status_event('t'))
+
+        queue, missed = await manager.setup_sse_resubscriber('t', 1)
+        assert [e.event_id for e in missed] == [2, 3]
+        stream = manager.dequeue_events_for_sse('r', 't', queue, missed)
+        await manager.enqueue_events_for_sse(
+            't', status_event('t', TaskState.COMPLETED, final=True)
+        )
+        assert [r.event_id async for r in stream] == [2, 3, 4]
+
+    asyncio.run(run())
+
+
+def test_resubscribe_honours_last_event_id_header():
+    manager = StubTaskManager()
+    asyncio.run(_stream_task(manager, 't', updates=5))
+    client = TestClient(
+        A2AServer(agent_card=agent_card(), task_manager=manager).app
+    )
+
+    with client.stream(
+        'POST',
+        '/',
+        json={
+            'jsonrpc': '2.0',
+            'id': 7,
+            'method': 'tasks/resubscribe',
+            'params': {'id': 't'},
+        },
+        headers={'Last-Event-ID': '3'},
+    ) as response:
+        lines = [line for line in response.iter_lines() if line]
+
+    ids = [int(line[4:]) for line in lines if line.startswith('id: ')]
+    data = [
+        json.loads(line[6:]) for line in lines if line.startswith('data: ')
+    ]
+    assert ids == [4, 5]
+    assert [d['id'] for d in data] == [7, 7]
+    assert data[-1]['result']['final'] is True
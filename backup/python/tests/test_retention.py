@@ -0,0 +1,99 @@
+import asyncio
+
+from common.server import RetentionPolicy
+from common.types import GetTaskRequest, TaskQueryParams, TaskState, TaskStatus
+from tests.helpers import StubTaskManager, send_params
+
+
+async def _add_task(
+    manager: StubTaskManager, task_id: str, state: TaskState
+) -> None:
+    await manager.upsert_task(send_params(task_id))
+    await manager.update_store(task_id, TaskStatus(state=state), None)
+
+
+async def _get(manager: StubTaskManager, task_id: str):
+    return await manager.on_get_task(
+        GetTaskRequest(params=TaskQueryParams(id=task_id))
+    )
+
+
+def test_nothing_is_evicted_by_default():
+    async def run():
+        manager = StubTaskManager()
+        for i in range(5):
+            await _add_task(manager, f't{i}', TaskState.COMPLETED)
+        await manager.enforce_retention()
+        assert len(manager.tasks) == 5
+        assert (await _get(manager, 't0')).result is not None
+        assert manager._retention_sweeper is None
+
+    asyncio.run(run())
+
+
+def test_ttl_evicts_only_terminal_tasks():
+    async def run():
+        manager = StubTaskManager(
+            retention=RetentionPolicy(terminal_ttl=0, sweep_interval=3600)
+        )
+        await _add_task(manager, 'done', TaskState.COMPLETED)
+        await _add_task(manager, 'busy', TaskState.WORKING)
+        await manager.enforce_retention()
+        await manager.stop_retention_sweeper()
+
+        assert list(manager.tasks) == ['busy']
+        assert (await _get(manager, 'done')).error is not None
+        assert manager.get_retention_stats()['evicted_ttl'] == 1
+
+    asyncio.run(run())
+
+
+def test_max_tasks_evicts_least_recently_used_terminal_task():
+    async def run():
+        manager = StubTaskManager(retention=RetentionPolicy(max_tasks=3))
+        for task_id in ('a', 'b', 'c'):
+            await _add_task(manager, task_id, TaskState.COMPLETED)
+        # Reading a refreshes it, so b is now the least recently used.
+        await _get(manager, 'a')
+        await _add_task(manager, 'd', TaskState.WORKING)
+
+        assert set(manager.tasks) == {'a', 'c', 'd'}
+        assert manager.get_retention_stats()['evicted_lru'] == 1
+
+    asyncio.run(run())
+
+
+def test_max_tasks_never_evicts_running_tasks():
+    async def run():
+        manager = StubTaskManager(retention=RetentionPolicy(max_tasks=2))
+        for task_id in ('a', 'b', 'c'):
+            await _add_task(manager, task_id, TaskState.WORKING)
+        assert set(manager.tasks) == {'a', 'b', 'c'}
+
+        await manager.update_store('b', TaskStatus(state=TaskState.FAILED), None)
+        await manager.enforce_retention()
+        assert set(manager.tasks) == {'a', 'c'}
+
+    asyncio.run(run())
+
+
+def test_byte_budget_evicts_until_under_budget():
+    async def run():
+        manager = StubTaskManager(
+            retention=RetentionPolicy(max_bytes=500, sweep_interval=3600)
+        )
+        for i in range(10):
+            await manager.upsert_task(send_params(f't{i}', text='x' * 100))
+            await manager.update_store(
+                f't{i}', TaskStatus(state=TaskState.COMPLETED), None
+            )
+        await manager.enforce_retention()
+        await manager.stop_retention_sweeper()
+
+        stats = manager.get_retention_stats()
+        assert stats['tracked_bytes'] <= 500
+        assert stats['evicted_bytes'] == 10 - len(manager.tasks)
+        # The most recent tasks are the ones kept.
+        assert 't9' in manager.tasks and 't0' not in manager.tasks
+
+    asyncio.run(run())
@@ -0,0 +1,190 @@
+import asyncio
+
+from typing import Literal
+
+from starlette.testclient import TestClient
+
+from common.server import A2AServer
+from common.types import (
+    GetTaskRequest,
+    GetTaskResponse,
+    JSONRPCRequest,
+    Task,
+    TaskQueryParams,
+    TaskStatus,
+)
+from tests.helpers import StubTaskManager, agent_card, send_params
+
+
+class EchoTaskRequest(JSONRPCRequest):
+    method: Literal['tasks/echo'] = 'tasks/echo'
+    params: TaskQueryParams
+
+
+def _client(manager: StubTaskManager | None = None, **kwargs) -> TestClient:
+    server = A2AServer(
+        agent_card=agent_card(),
+        task_manager=manager or StubTaskManager(),
+        **kwargs,
+    )
+    return TestClient(server.app)
+
+
+def _call(method: str, params: dict | None = None, request_id=1) -> dict:
+    return {
+        'jsonrpc': '2.0',
+        'id': request_id,
+        'method': method,
+        'params': params,
+    }
+
+
+def test_dispatches_to_task_manager():
+    manager = StubTaskManager()
+    asyncio.run(manager.upsert_task(send_params('t')))
+    client = _client(manager)
+
+    response = client.post('/', json=_call('tasks/get', {'id': 't'}))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body['id'] == 1
+    assert body['result']['id'] == 't'
+    assert body['result']['status']['state'] == 'submitted'
+
+
+def test_task_manager_errors_are_returned():
+    response = _client().post('/', json=_call('tasks/get', {'id': 'nope'}))
+
+    assert response.json()['error']['code'] == -32001
+
+
+def test_unknown_method_keeps_request_id():
+    response = _client().post('/', json=_call('tasks/unknown', {}, 'abc'))
+
+    assert response.status_code == 400
+    assert response.json()['id'] == 'abc'
+    assert response.json()['error']['code'] == -32601
+
+
+def test_invalid_params_and_bodies_are_rejected():
+    client = _client()
+
+    response = client.post('/', json=_call('tasks/get', {'historyLength': 1}))
+    assert response.json()['error']['code'] == -32600
+
+    response = client.post('/', json='tasks/get')
+    assert response.json()['error']['code'] == -32600
+
+    response = client.post('/', content=b'{not json')
+    assert response.json()['error']['code'] == -32700
+
+
+def test_register_method_adds_and_replaces_handlers():
+    server = A2AServer(agent_card=agent_card(), task_manager=StubTaskManager())
+    seen = []
+
+    async def echo(json_rpc_request, request):
+        seen.append((json_rpc_request, request.url.path))
+        return GetTaskResponse(
+            id=json_rpc_request.id,
+            result=Task(
+                id=json_rpc_request.params.id,
+                status=TaskStatus(state='working'),
+            ),
+        )
+
+    server.register_method('tasks/echo', EchoTaskRequest, echo)
+    # Replacing a default method routes it to the new handler.
+    server.register_method('tasks/get', GetTaskRequest, echo)
+    client = TestClient(server.app)
+
+    for method in ('tasks/echo', 'tasks/get'):
+        response = client.post('/', json=_call(method, {'id': 'x'}))
+        assert response.json()['result']['id'] == 'x'
+    assert [type(r) for r, _ in seen] == [EchoTaskRequest, GetTaskRequest]
+    assert [path for _, path in seen] == ['/', '/']
+
+
+def test_invalid_params_keep_request_id():
+    response = _client().post(
+        '/', json=_call('tasks/get', {'historyLength': 1}, 'abc')
+    )
+
+    assert response.json()['id'] == 'abc'
+    assert response.json()['error']['code'] == -32600
+
+
+def test_batch_answers_each_call():
+    manager = StubTaskManager()
+    asyncio.run(manager.upsert_task(send_params('t')))
+    client = _client(manager)
+
+    response = client.post(
+        '/',
+        json=[
+            _call('tasks/get', {'id': 't'}, 1),
+            _call('tasks/get', {'id': 'missing'}, 2),
+            _call('tasks/get', {'historyLength': 1}, 3),
+            _call('tasks/sendSubscribe', {'id': 't'}, 4),
+            _call('tasks/unknown', {}, 5),
+            'not a call',
+        ],
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [r.get('id') for r in body] == [1, 2, 3, 4, 5, None]
+    assert body[0]['result']['id'] == 't'
+    assert [r['error']['code'] for r in body[1:]] == [
+        -32001,
+        -32600,
+        -32600,
+        -32601,
+        -32600,
+    ]
+
+
+def test_batch_does_not_answer_notifications():
+    server = A2AServer(agent_card=agent_card(), task_manager=StubTaskManager())
+    seen = []
+
+    async def record(json_rpc_request, request):
+        seen.append(json_rpc_request.params.id)
+        return GetTaskResponse(id=json_rpc_request.id)
+
+    server.register_method('tasks/echo', EchoTaskRequest, record)
+    client = TestClient(server.app)
+    notification = {'jsonrpc': '2.0', 'method': 'tasks/echo'}
+
+    response = client.post(
+        '/',
+        json=[
+            {**notification, 'params': {'id': 'a'}},
+            _call('tasks/echo', {'id': 'b'}, 1),
+            # A failing notification is not answered either.
+            {**notification, 'params': {}},
+        ],
+    )
+    assert [r['id'] for r in response.json()] == [1]
+
+    response = client.post(
+        '/', json=[{**notification, 'params': {'id': 'c'}}]
+    )
+    assert response.status_code == 204
+    assert response.content == b''
+    assert sorted(seen) == ['a', 'b', 'c']
+
+
+def test_batch_size_is_limited():
+    client = _client(max_batch_size=2)
+
+    response = client.post('/', json=[])
+    assert response.status_code == 400
+    assert response.json()['error']['code'] == -32600
+
+    response = client.post(
+        '/', json=[_call('tasks/get', {'id': 't'}, i) for i in range(3)]
+    )
+    assert response.status_code == 400
+    assert response.json()['error']['code'] == -32600
@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from common.utils import shared_cache
+from common.utils.in_memory_cache import InMemoryCache
+from common.utils.shared_cache import (
+    SHARED_CACHE_PATH_ENV,
+    SharedCache,
+    get_cache,
+)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'cache.db')
+
+
+@pytest.fixture
+def cache(path):
+    cache = SharedCache(path, blob_threshold=1024)
+    yield cache
+    cache.close()
+
+
+def test_processes_share_entries(path, cache):
+    cache.set('session', {'user': 'alice'})
+    script = (
+        'import sys\n'
+        'from common.utils.shared_cache import SharedCache\n'
+        'cache = SharedCache(sys.argv[1])\n'
+        'assert cache.get("session") == {"user": "alice"}\n'
+        'cache.set("reply", [1, 2, 3])\n'
+    )
+    subprocess.run(
+        [sys.executable, '-c', script, path],
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+
+    assert cache.get('reply') == [1, 2, 3]
+
+
+def test_large_values_are_kept_in_blob_files(cache):
+    image = b'x' * 10_000
+    cache.set('image', image)
+    assert cache.get('image') == image
+    assert len(os.listdir(cache.blob_dir)) == 1
+
+    # Replacing or deleting the value removes its file.
+    cache.set('image', image + b'y')
+    assert cache.get('image') == image + b'y'
+    assert len(os.listdir(cache.blob_dir)) == 1
+    assert cache.delete('image')
+    assert os.listdir(cache.blob_dir) == []
+    assert cache.get('image') is None
+
+
+def test_expired_entries_are_not_returned(cache, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now)
+    cache.set('a', 'a', ttl=10)
+    cache.set('b', 'b', ttl=20)
+    assert cache.get('a') == 'a'
+
+    now += 15
+    assert cache.get('a', 'default') == 'default'
+    assert cache.get('b') == 'b'
+    assert cache.sweep() == 1
+    assert cache.stats()['default'].expirations == 1
+    assert cache.stats()['default'].entries == 1
+
+
+def test_oldest_entries_are_evicted_beyond_the_limits(path):
+    cache = SharedCache(path, max_entries=3, sweep_interval=0)
+    for i in range(5):
+        cache.set(f'k{i}', i)
+
+    assert [cache.get(f'k{i}') for i in range(5)] == [None, None, 2, 3, 4]
+    assert cache.stats()['default'].evictions == 2
+    cache.close()
+
+
+def test_namespaces_are_cleared_separately(cache):
+    sessions = cache.namespace('sessions')
+    images = cache.namespace('images')
+    sessions.set('k', 'session')
+    images.set('k', b'x' * 2048)
+
+    images.clear()
+
+    assert images.get('k') is None
+    assert sessions.get('k') == 'session'
+    assert os.listdir(cache.blob_dir) == []
+    assert cache.stats()['sessions'].entries == 1
+
+
+def test_get_or_compute_caches_the_result(cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 'value'
+
+    assert cache.get_or_compute('k', compute) == 'value'
+    assert cache.get_or_compute('k', compute) == 'value'
+    assert len(calls) == 1
+
+
+def test_get_cache_follows_the_environment(path, monkeypatch):
+    monkeypatch.setattr(shared_cache, '_shared_caches', {})
+    monkeypatch.delenv(SHARED_CACHE_PATH_ENV, raising=False)
+    assert isinstance(get_cache(), InMemoryCache)
+
+    monkeypatch.setenv(SHARED_CACHE_PATH_ENV, path)
+    cache = get_cache()
+    assert isinstance(cache, SharedCache)
+    assert get_cache() is cache
+    cache.close()
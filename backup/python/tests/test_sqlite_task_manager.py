@@ -0,0 +1,313 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from common.server.retention import RetentionPolicy
+from common.server.sqlite_task_manager import SQLiteTaskManager
+from common.types import (
+    Artifact,
+    InternalError,
+    PushNotificationConfig,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from tests.helpers import send_params, status_event
+
+
+class StubSQLiteTaskManager(SQLiteTaskManager):
+    """A SQLiteTaskManager whose agent is driven by the test itself."""
+
+    async def on_send_task(self, request):
+        raise NotImplementedError
+
+    async def on_send_task_subscribe(self, request):
+        raise NotImplementedError
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'tasks.db')
+
+
+def test_reload_restores_tasks_and_push_configs(db_path):
+    async def run():
+        manager = StubSQLiteTaskManager(db_path=db_path)
+        await manager.upsert_task(send_params('t1', 'first'))
+        await manager.upsert_task(send_params('t1', 'second'))
+        await manager.update_store(
+            't1',
+            TaskStatus(state=TaskState.COMPLETED),
+            [Artifact(parts=[TextPart(text='result')])],
+        )
+        await manager.upsert_task(send_params('t2'))
+        await manager.set_push_notification_info(
+            't2', PushNotificationConfig(url='http://localhost/notify')
+        )
+        await manager.close()
+
+        reloaded = StubSQLiteTaskManager(db_path=db_path)
+        task = reloaded.tasks['t1']
+        assert task.status.state == TaskState.COMPLETED
+        assert [m.parts[0].text for m in task.history] == ['first', 'second']
+        assert task.artifacts[0].parts[0].text == 'result'
+        # t2 was never finished, and nothing is left to finish it.
+        assert reloaded.tasks['t2'].status.state == TaskState.FAILED
+        assert (
+            reloaded.push_notification_infos['t2'].url
+            == 'http://localhost/notify'
+        )
+        # Terminal tasks are known to retention again after a restart.
+        assert reloaded._lru_terminal_tasks(10) == ['t1', 't2']
+        await reloaded.close()
+
+    asyncio.run(run())
+
+
+def test_resubscribe_replays_events_after_restart(db_path):
+    async def run():
+        manager = StubSQLiteTaskManager(db_path=db_path)
+        await manager.upsert_task(send_params('t'))
+        await manager.enqueue_events_for_sse('t', status_event('t'))
+        await manager.enqueue_events_for_sse(
+            't',
+            TaskArtifactUpdateEvent(
+                id='t', artifact=Artifact(parts=[TextPart(text='a')])
+            ),
+        )
+        await manager.enqueue_events_for_sse('t', status_event('t'))
+        await manager.close()
+
+        # An agent that resumes its tasks keeps the stream open.
+        reloaded = StubSQLiteTaskManager(
+            db_path=db_path, fail_interrupted_tasks=False
+        )
+        queue, missed = await reloaded.setup_sse_resubscriber('t', 1)
+        assert queue is not None
+        assert [e.event_id for e in missed] == [2, 3]
+        assert isinstance(missed[0].event, TaskArtifactUpdateEvent)
+        original = manager.task_event_logs['t'].since(1)
+        assert [e.payload for e in missed] == [e.payload for e in original]
+
+        # Ids continue where the log left off before the restart.
+        logged = await reloaded.enqueue_events_for_sse(
+            't', status_event('t', TaskState.COMPLETED, final=True)
+        )
+        assert logged.event_id == 4
+        assert (await queue.get()).event_id == 4
+        await reloaded.close()
+
+        # A stream that ended before the restart stays ended.
+        reloaded = StubSQLiteTaskManager(db_path=db_path)
+        queue, missed = await reloaded.setup_sse_resubscriber('t', 3)
+        assert queue is None
+        assert [e.event_id for e in missed] == [4]
+        await reloaded.close()
+
+    asyncio.run(run())
+
+
+def test_error_events_survive_restart(db_path):
+    async def run():
+        manager = StubSQLiteTaskManager(db_path=db_path)
+        await manager.upsert_task(send_params('t'))
+        await manager.enqueue_events_for_sse('t', InternalError(message='x'))
+        await manager.close()
+
+        reloaded = StubSQLiteTaskManager(db_path=db_path)
+        queue, missed = await reloaded.setup_sse_resubscriber('t', 0)
+        assert queue is None
+        assert missed[0].is_error
+        assert missed[0].event.message == 'x'
+        await reloaded.close()
+
+    asyncio.run(run())
+
+
+def test_persisted_events_are_trimmed_to_log_size(db_path):
+    async def run():
+        manager = StubSQLiteTaskManager(db_path=db_path, event_log_size=3)
+        await manager.upsert_task(send_params('t'))
+        for _ in range(5):
+            await manager.enqueue_events_for_sse('t', status_event('t'))
+        await manager.close()
+
+        conn = sqlite3.connect(db_path)
+        event_ids = [
+            row[0]
+            for row in conn.execute(
+                'SELECT event_id FROM task_events ORDER BY event_id'
+            )
+        ]
+        conn.close()
+        assert event_ids == [3, 4, 5]
+
+    asyncio.run(run())
+
+
+def test_failed_write_is_retried(db_path, monkeypatch):
+    async def run():
+        manager = StubSQLiteTaskManager(db_path=db_path, flush_interval=0.01)
+        write_batch = manager._write_batch
+        attempts = 0
+
+        def flaky_write_batch(batch):
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise sqlite3.OperationalError('database is locked')
+            write_batch(batch)
+
+        monkeypatch.setattr(manager, '_write_batch', flaky_write_batch)
+        await manager.upsert_task(send_params('t'))
+        await manager.enqueue_events_for_sse('t', status_event('t'))
+        for _ in range(100):
+            if manager.write_stats['batches']:
+                break
+            await asyncio.sleep(0.01)
+
+        assert attempts == 2
+        assert manager.write_stats['failures'] == 1
+        await manager.close()
+
+        reloaded = StubSQLiteTaskManager(
+            db_path=db_path, fail_interrupted_tasks=False
+        )
+        assert 't' in reloaded.tasks
+        assert len(reloaded.task_event_logs['t']) == 1
+        await reloaded.close()
+
+    asyncio.run(run())
+
+
+def test_failed_flush_keeps_changes_pending(db_path, monkeypatch):
+    async def run():
+        manager = StubSQLiteTaskManager(db_path=db_path)
+        await manager.upsert_task(send_params('t'))
+
+        def failing_write_batch(batch):
+            raise sqlite3.OperationalError('disk I/O error')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(manager, '_write_batch', failing_write_batch)
+            with pytest.raises(sqlite3.OperationalError):
+                await manager.flush()
+        assert manager._dirty_tasks == {'t'}
+
+        await manager.close()
+        reloaded = StubSQLiteTaskManager(db_path=db_path)
+        assert 't' in reloaded.tasks
+        await reloaded.close()
+
+    asyncio.run(run())
+
+
+def test_evicted_task_is_deleted_from_database(db_path):
+    async def run():
+        manager = StubSQLiteTaskManager(db_path=db_path)
+        await manager.upsert_task(send_params('t'))
+        await manager.enqueue_events_for_sse('t', status_event('t'))
+        await manager.flush()
+        await manager.evict_task('t')
+        await manager.close()
+
+        reloaded = StubSQLiteTaskManager(db_path=db_path)
+        assert 't' not in reloaded.tasks
+        assert 't' not in reloaded.task_event_logs
+        await reloaded.close()
+
+    asyncio.run(run())
+
+
+def test_interrupted_tasks_are_failed_on_reload(db_path):
+    async def run():
+        manager = StubSQLiteTaskManager(db_path=db_path)
+        await manager.upsert_task(send_params('t'))
+        await manager.enqueue_events_for_sse('t', status_event('t'))
+        await manager.close()
+
+        reloaded = StubSQLiteTaskManager(db_path=db_path)
+        task = reloaded.tasks['t']
+        assert task.status.state == TaskState.FAILED
+        assert task.history[-1] == task.status.message
+        assert reloaded._lru_terminal_tasks(10) == ['t']
+        # Resubscribing clients get the end of the stream instead of waiting.
+        queue, missed = await reloaded.setup_sse_resubscriber('t', 1)
+        assert queue is None
+        assert [e.event_id for e in missed] == [2]
+        assert missed[0].event.final
+        await reloaded.close()
+
+        # The failure was persisted, and is not recorded twice.
+        reloaded = StubSQLiteTaskManager(db_path=db_path)
+        assert reloaded.tasks['t'].status.state == TaskState.FAILED
+        assert reloaded.task_event_logs['t'].last_event_id == 2
+        await reloaded.close()
+
+    asyncio.run(run())
+
+
+def test_reloaded_tasks_count_towards_the_byte_budget(db_path):
+    async def run():
+        retention = RetentionPolicy(max_bytes=10_000_000)
+        manager = StubSQLiteTaskManager(db_path=db_path, retention=retention)
+        for task_id in ('t1', 't2'):
+            await manager.upsert_task(send_params(task_id, 'x' * 1000))
+            await manager.update_store(
+                task_id,
+                TaskStatus(state=TaskState.COMPLETED),
+                [Artifact(parts=[TextPart(text='y' * 1000)])],
+            )
+            # Separate commits, so t1 reloads as the least recently used.
+            await manager.flush()
+        tracked = manager.get_retention_stats()['tracked_bytes']
+        await manager.close()
+
+        retention = RetentionPolicy(max_bytes=tracked // 2 + 1)
+        reloaded = StubSQLiteTaskManager(db_path=db_path, retention=retention)
+        assert reloaded.get_retention_stats()['tracked_bytes'] == tracked
+
+        await reloaded.enforce_retention()
+        assert list(reloaded.tasks) == ['t2']
+        await reloaded.close()
+
+    asyncio.run(run())
+
+
+def test_close_waits_for_the_write_in_progress(db_path, monkeypatch):
+    async def run():
+        manager = StubSQLiteTaskManager(db_path=db_path, flush_interval=0)
+        write_batch = manager._write_batch
+        writing = threading.Lock()
+        started = threading.Event()
+        written = []
+
+        def slow_write_batch(batch):
+            # Two threads must never write on the connection at once.
+            assert writing.acquire(blocking=False)
+            try:
+                started.set()
+                time.sleep(0.2)
+                write_batch(batch)
+                written.extend(row[0] for row in batch.task_rows)
+            finally:
+                writing.release()
+
+        monkeypatch.setattr(manager, '_write_batch', slow_write_batch)
+        await manager.upsert_task(send_params('t'))
+        await asyncio.to_thread(started.wait)
+
+        await manager.close()
+
+        assert written == ['t']
+        assert manager.write_stats['batches'] == 1
+        assert manager.write_stats['failures'] == 0
+        reloaded = StubSQLiteTaskManager(db_path=db_path)
+        assert 't' in reloaded.tasks
+        await reloaded.close()
+
+    asyncio.run(run())
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from common.server.frames import LoggedEvent
+from common.server.sse_queue import OverflowPolicy, SubscriberQueue
+from common.types import Artifact, TaskArtifactUpdateEvent, TextPart
+from tests.helpers import StubTaskManager, send_params, status_event
+
+
+def _status(event_id: int) -> LoggedEvent:
+    return LoggedEvent.from_event(status_event('t'), event_id=event_id)
+
+
+def _artifact(event_id: int) -> LoggedEvent:
+    event = TaskArtifactUpdateEvent(
+        id='t', artifact=Artifact(parts=[TextPart(text=str(event_id))])
+    )
+    return LoggedEvent.from_event(event, event_id=event_id)
+
+
+async def _drain(queue: SubscriberQueue) -> list[LoggedEvent]:
+    return [await queue.get() for _ in range(queue.qsize())]
+
+
+def test_rejects_non_positive_size():
+    with pytest.raises(ValueError):
+        SubscriberQueue(maxsize=0)
+
+
+def test_drop_oldest_keeps_newest_events():
+    queue = SubscriberQueue(maxsize=3, policy=OverflowPolicy.DROP_OLDEST)
+    for i in range(1, 6):
+        assert queue.put_nowait(_status(i))
+
+    events = asyncio.run(_drain(queue))
+    assert [e.event_id for e in events] == [3, 4, 5]
+    assert queue.dropped == 2
+    assert queue.max_lag == 3
+
+
+def test_coalesce_replaces_pending_status():
+    queue = SubscriberQueue(maxsize=2, policy=OverflowPolicy.COALESCE)
+    queue.put_nowait(_artifact(1))
+    queue.put_nowait(_status(2))
+    queue.put_nowait(_status(3))
+    queue.put_nowait(_status(4))
+
+    events = asyncio.run(_drain(queue))
+    # The artifact is never lost; the statuses collapse into the newest.
+    assert [e.event_id for e in events] == [1, 4]
+    assert queue.coalesced == 2
+    assert queue.dropped == 0
+
+
+def test_coalesce_drops_oldest_when_tail_is_not_a_status():
+    queue = SubscriberQueue(maxsize=2, policy=OverflowPolicy.COALESCE)
+    for i in range(1, 4):
+        queue.put_nowait(_artifact(i))
+
+    events = asyncio.run(_drain(queue))
+    assert [e.event_id for e in events] == [2, 3]
+    assert queue.dropped == 1
+
+
+def test_disconnect_ends_stream_with_error():
+    queue = SubscriberQueue(maxsize=2, policy=OverflowPolicy.DISCONNECT)
+    queue.put_nowait(_status(1))
+    queue.put_nowait(_status(2))
+    assert not queue.put_nowait(_status(3))
+    assert queue.disconnected
+    assert not queue.put_nowait(_status(4))
+
+    events = asyncio.run(_drain(queue))
+    assert len(events) == 1
+    assert events[0].is_error and events[0].is_terminal
+    assert queue.dropped == 2
+
+
+def test_slow_subscriber_does_not_hold_back_others():
+    async def run():
+        manager = StubTaskManager(sse_queue_size=4)
+        await manager.upsert_task(send_params('t'))
+        slow = await manager.setup_sse_consumer('t')
+        fast = await manager.setup_sse_consumer('t')
+        received = []
+
+        async def consume():
+            async for response in manager.dequeue_events_for_sse(
+                't', 't', fast
+            ):
+                received.append(response.event_id)
+                if len(received) == 100:
+                    break
+
+        consumer = asyncio.create_task(consume())
+        for _ in range(100):
+            await manager.enqueue_events_for_sse('t', status_event('t'))
+            await asyncio.sleep(0)
+        await asyncio.wait_for(consumer, timeout=1)
+
+        assert received == list(range(1, 101))
+        assert slow.lag == 4
+        stats = await manager.get_subscriber_stats('t')
+        assert stats['t'][0]['dropped'] == 96
+
+    asyncio.run(run())
@@ -0,0 +1,80 @@
+import asyncio
+
+from common.types import TaskState, TaskStatus
+from tests.helpers import StubTaskManager, send_params, status_event
+
+
+def _ids_in_different_stripes(manager: StubTaskManager) -> tuple[str, str]:
+    first = 'task-0'
+    for i in range(1, 1000):
+        other = f'task-{i}'
+        if manager.task_lock(other) is not manager.task_lock(first):
+            return first, other
+    raise AssertionError('all ids share a stripe')
+
+
+def test_task_lock_is_stable_per_task():
+    manager = StubTaskManager()
+    assert manager.task_lock('a') is manager.task_lock('a')
+    assert manager.subscriber_lock('a') is manager.subscriber_lock('a')
+
+
+def test_update_is_not_blocked_by_another_tasks_lock():
+    async def run():
+        manager = StubTaskManager()
+        first, other = _ids_in_different_stripes(manager)
+        await manager.upsert_task(send_params(first))
+        await manager.upsert_task(send_params(other))
+        async with manager.task_lock(first):
+            task = await asyncio.wait_for(
+                manager.update_store(
+                    other, TaskStatus(state=TaskState.WORKING), None
+                ),
+                timeout=1,
+            )
+        assert task.status.state == TaskState.WORKING
+
+    asyncio.run(run())
+
+
+def test_concurrent_tasks_stream_every_update_in_order():
+    updates = 20
+
+    async def drive(manager: StubTaskManager, task_id: str) -> list[str]:
+        await manager.upsert_task(send_params(task_id))
+        queue = await manager.setup_sse_consumer(task_id)
+        received = []
+
+        async def consume():
+            async for response in manager.dequeue_events_for_sse(
+                task_id, task_id, queue
+            ):
+                received.append(response.event_id)
+
+        consumer = asyncio.create_task(consume())
+        for i in range(updates):
+            final = i == updates - 1
+            state = TaskState.COMPLETED if final else TaskState.WORKING
+            await manager.update_store(task_id, TaskStatus(state=state), None)
+            await manager.enqueue_events_for_sse(
+                task_id, status_event(task_id, state, final)
+            )
+            await asyncio.sleep(0)
+        await consumer
+        return received
+
+    async def run():
+        manager = StubTaskManager(lock_stripes=4)
+        results = await asyncio.gather(
+            *(drive(manager, f'task-{i}') for i in range(50))
+        )
+        for received in results:
+            assert received == list(range(1, updates + 1))
+        assert all(
+            task.status.state == TaskState.COMPLETED
+            for task in manager.tasks.values()
+        )
+        # Ended streams release their subscriber lists.
+        assert manager.task_sse_subscribers == {}
+
+    asyncio.run(run())
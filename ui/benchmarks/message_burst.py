@@ -0,0 +1,100 @@
+"""Threads and time needed to process a burst of UI messages.
+
+Sends a burst of messages, spread over several conversations, through the
+previous thread-per-message dispatch of ConversationServer and through
+MessageScheduler, and reports the peak number of threads and the time
+until every message was processed. Each message is processed by a stand-in
+for `process_message` that awaits a model call. The scheduler rows differ
+in their concurrency limit; the scheduler also processes the messages of a
+conversation one at a time, which the threads did not.
+
+Run from the ui directory:
+
+    python -m benchmarks.message_burst
+"""
+
+import asyncio
+import threading
+import time
+
+from service.server.message_scheduler import MessageScheduler
+
+
+MESSAGES = 1000
+CONVERSATIONS = 100
+PROCESS_SECONDS = 0.05
+
+
+async def process_message():
+    await asyncio.sleep(PROCESS_SECONDS)
+
+
+class _PeakThreads:
+    """Samples the number of live threads from the event loop."""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    async def _sample(self):
+        while True:
+            self.peak = max(self.peak, threading.active_count())
+            await asyncio.sleep(0.001)
+
+    def stop(self) -> int:
+        self._task.cancel()
+        return self.peak
+
+
+async def thread_per_message() -> tuple[float, int]:
+    done = threading.Semaphore(0)
+
+    def run():
+        # As the in-memory manager did: a new event loop in a new thread.
+        asyncio.run(process_message())
+        done.release()
+
+    threads = _PeakThreads()
+    start = time.perf_counter()
+    for _ in range(MESSAGES):
+        threading.Thread(target=run).start()
+        await asyncio.sleep(0)
+    for _ in range(MESSAGES):
+        while not done.acquire(blocking=False):
+            await asyncio.sleep(0.001)
+    return time.perf_counter() - start, threads.stop()
+
+
+async def scheduled(max_concurrency: int) -> tuple[float, int]:
+    scheduler = MessageScheduler(
+        max_concurrency=max_concurrency, max_queue_depth=MESSAGES
+    )
+    threads = _PeakThreads()
+    start = time.perf_counter()
+    for i in range(MESSAGES):
+        scheduler.submit(f'conversation-{i % CONVERSATIONS}', process_message)
+        await asyncio.sleep(0)
+    await scheduler.join()
+    return time.perf_counter() - start, threads.stop()
+
+
+async def run():
+    for name, dispatch in [
+        ('thread per message', thread_per_message),
+        ('scheduler, 32', lambda: scheduled(32)),
+        (f'scheduler, {CONVERSATIONS}', lambda: scheduled(CONVERSATIONS)),
+    ]:
+        elapsed, peak = await dispatch()
+        print(f'{name:<20} {elapsed:7.3f} s, peak {peak} threads')
+
+
+def main():
+    print(
+        f'{MESSAGES} messages over {CONVERSATIONS} conversations, '
+        f'{PROCESS_SECONDS * 1e3:.0f} ms each'
+    )
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
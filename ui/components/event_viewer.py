@@ -1,9 +1,50 @@
 import asyncio
+import dataclasses
 
 import mesop as me
 import pandas as pd
 
+from service.types import GetEventResponse
 from state.host_agent_service import GetEvents, convert_event_to_state
+from state.state import StateEvent
+
+
+@me.stateclass
+class EventListState:
+    """Events fetched so far in this session"""
+
+    events: list[StateEvent] = dataclasses.field(default_factory=list)
+    # Sequence number of the last event fetched. Each render only fetches
+    # the events recorded since.
+    last_sequence: int = 0
+    # Epoch of the server event log `last_sequence` belongs to.
+    epoch: str = ''
+
+
+def _restarted(state: EventListState, response: GetEventResponse) -> bool:
+    if response.epoch is not None and state.epoch:
+        return response.epoch != state.epoch
+    # Servers that send no epoch are only caught once they have recorded
+    # fewer events than this session has seen.
+    return (
+        response.last_sequence is not None
+        and response.last_sequence < state.last_sequence
+    )
+
+
+def fetch_new_events(state: EventListState):
+    """Adds the events recorded since the last fetch to `state`."""
+    response = asyncio.run(GetEvents(state.last_sequence))
+    if _restarted(state, response):
+        # The server restarted and numbers its events from 1 again.
+        state.events = []
+        state.last_sequence = 0
+        response = asyncio.run(GetEvents(0))
+    if response.epoch is not None:
+        state.epoch = response.epoch
+    state.events.extend(convert_event_to_state(e) for e in response.result)
+    if response.result:
+        state.last_sequence = response.result[-1].sequence
 
 
 def flatten_content(content: list[tuple[str, str]]) -> str:
@@ -27,9 +68,9 @@ def event_list():
         'Id': [],
         'Content': [],
     }
-    events = asyncio.run(GetEvents())
-    for e in events:
-        event = convert_event_to_state(e)
+    state = me.state(EventListState)
+    fetch_new_events(state)
+    for event in state.events:
         df_data['Conversation ID'].append(event.context_id)
         df_data['Role'].append(event.role)
         df_data['Id'].append(event.id)
@@ -0,0 +1,141 @@
+import enum
+import logging
+import time
+
+from collections import deque
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(enum.Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a remote agent whose circuit is open."""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(
+            f'Agent {name} is unavailable, retry in {retry_after:.0f}s'
+        )
+
+
+class CircuitBreaker:
+    """Tracks the health of one remote agent endpoint.
+
+    The breaker opens when, over the last `window_size` calls (and at least
+    `min_calls` of them), the share of failed calls reaches
+    `failure_rate_threshold` or the share of calls slower than
+    `slow_call_seconds` reaches `slow_call_rate_threshold`. While open, calls
+    fail fast. After `open_seconds` the breaker lets `half_open_calls` probe
+    calls through; if they all succeed it closes again, otherwise it reopens.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 30.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 1,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CircuitState.CLOSED
+        # (failed, slow) outcome of the most recent calls.
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.stats = {'rejected': 0, 'opened': 0, 'closed': 0}
+
+    def _refresh(self):
+        if (
+            self.state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.open_seconds
+        ):
+            self.state = CircuitState.HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+
+    @property
+    def is_available(self) -> bool:
+        """False while calls to the agent would be rejected."""
+        self._refresh()
+        if self.state == CircuitState.OPEN:
+            return False
+        if self.state == CircuitState.HALF_OPEN:
+            return self._probes_in_flight < self.half_open_calls
+        return True
+
+    def before_call(self):
+        """Admits a call, or raises CircuitOpenError to fail it fast."""
+        if not self.is_available:
+            self.stats['rejected'] += 1
+            retry_after = max(
+                self.open_seconds - (time.monotonic() - self._opened_at), 0
+            )
+            raise CircuitOpenError(self.name, retry_after)
+        if self.state == CircuitState.HALF_OPEN:
+            self._probes_in_flight += 1
+
+    def record(self, failed: bool, duration: float):
+        """Records the outcome of an admitted call."""
+        slow = duration >= self.slow_call_seconds
+        if self.state == CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+            if failed or slow:
+                self._open()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._close()
+            return
+
+        self._outcomes.append((failed, slow))
+        if len(self._outcomes) < self.min_calls:
+            return
+        calls = len(self._outcomes)
+        failure_rate = sum(f for f, _ in self._outcomes) / calls
+        slow_rate = sum(s for _, s in self._outcomes) / calls
+        if (
+            failure_rate >= self.failure_rate_threshold
+            or slow_rate >= self.slow_call_rate_threshold
+        ):
+            self._open()
+
+    def release(self):
+        """Releases an admitted call that ended without an outcome.
+
+        Used for calls the caller cancelled, which say nothing about the
+        agent's health but must not hold a half-open probe slot.
+        """
+        if self.state == CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(self._probes_in_flight - 1, 0)
+
+    def _open(self):
+        if self.state != CircuitState.OPEN:
+            logger.warning(f'Opening circuit for agent {self.name}')
+            self.stats['opened'] += 1
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def _close(self):
+        logger.info(f'Closing circuit for agent {self.name}')
+        self.stats['closed'] += 1
+        self.state = CircuitState.CLOSED
+        self._outcomes.clear()
@@ -1,3 +1,6 @@
+import asyncio
+import time
+
 from collections.abc import Callable
 from uuid import uuid4
 
@@ -16,6 +19,8 @@ from a2a.types import (
     TaskStatusUpdateEvent,
 )
 
+from .circuit_breaker import CircuitBreaker
+
 
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
@@ -24,24 +29,77 @@ TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
 class RemoteAgentConnections:
     """A class to hold the connections to the remote agents."""
 
-    def __init__(self, client: httpx.AsyncClient, agent_card: AgentCard):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        agent_card: AgentCard,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
         self.agent_client = A2AClient(client, agent_card)
         self.card = agent_card
         self.pending_tasks = set()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            agent_card.name
+        )
 
     def get_agent(self) -> AgentCard:
         return self.card
 
+    @property
+    def is_available(self) -> bool:
+        """False while the agent is ejected by its circuit breaker."""
+        return self.circuit_breaker.is_available
+
     async def send_message(
         self,
         request: MessageSendParams,
         task_callback: TaskUpdateCallback | None,
+    ) -> Task | Message | None:
+        """Sends a message through the agent's circuit breaker.
+
+        Raises CircuitOpenError without contacting the agent while it is
+        ejected. Transport failures, JSON-RPC error responses and slow
+        responses count against it. Cancelled calls are not counted.
+        """
+        self.circuit_breaker.before_call()
+        start = time.monotonic()
+        first_event_at = None
+        failed = False
+
+        def on_response(is_error: bool):
+            nonlocal first_event_at, failed
+            if first_event_at is None:
+                first_event_at = time.monotonic()
+            failed = failed or is_error
+
+        try:
+            result = await self._send_message(
+                request, task_callback, on_response
+            )
+        except asyncio.CancelledError:
+            self.circuit_breaker.release()
+            raise
+        except Exception:
+            self.circuit_breaker.record(True, time.monotonic() - start)
+            raise
+        # Streams can legitimately run long, so the latency of a streaming
+        # call is the time to its first event.
+        end = first_event_at if first_event_at is not None else time.monotonic()
+        self.circuit_breaker.record(failed, end - start)
+        return result
+
+    async def _send_message(
+        self,
+        request: MessageSendParams,
+        task_callback: TaskUpdateCallback | None,
+        on_response: Callable[[bool], None],
     ) -> Task | Message | None:
         if self.card.capabilities.streaming:
             task = None
             async for response in self.agent_client.send_message_streaming(
                 SendStreamingMessageRequest(id=str(uuid4()), params=request)
             ):
+                on_response(isinstance(response.root, JSONRPCErrorResponse))
                 if not response.root.result:
                     return response.root.error
                 # In the case a message is returned, that is the end of the interaction.
@@ -59,6 +117,7 @@ class RemoteAgentConnections:
         response = await self.agent_client.send_message(
             SendMessageRequest(id=str(uuid4()), params=request)
         )
+        on_response(isinstance(response.root, JSONRPCErrorResponse))
         if isinstance(response.root, JSONRPCErrorResponse):
             return response.root.error
         if isinstance(response.root.result, Message):
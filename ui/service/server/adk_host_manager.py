@@ -1,4 +1,3 @@
-import asyncio
 import base64
 import datetime
 import json
@@ -38,6 +37,7 @@ from hosts.multiagent.remote_agent_connection import (
 from utils.agent_card import get_agent_card
 
 from service.server.application_manager import ApplicationManager
+from service.server.event_log import EventLog
 from service.types import Conversation, Event
 
 
@@ -55,16 +55,21 @@ class ADKHostManager(ApplicationManager):
         api_key: str = '',
         uses_vertex_ai: bool = False,
     ):
-        self._conversations: list[Conversation] = []
-        self._messages: list[Message] = []
-        self._tasks: list[Task] = []
-        self._events: dict[str, Event] = {}
-        self._pending_message_ids: list[str] = []
+        # State is indexed by ID so that streaming updates cost the same
+        # however many tasks have accumulated. Dicts keep insertion order,
+        # which the list views below rely on. Messages are kept in their
+        # conversations.
+        self._conversations: dict[str, Conversation] = {}
+        self._tasks: dict[str, Task] = {}
+        self._events = EventLog()
+        # Used as an ordered set.
+        self._pending_message_ids: dict[str, None] = {}
         self._agents: list[AgentCard] = []
         self._artifact_chunks: dict[str, list[Artifact]] = {}
         self._session_service = InMemorySessionService()
         self._artifact_service = InMemoryArtifactService()
         self._memory_service = InMemoryMemoryService()
+        self._http_client = http_client
         self._host_agent = HostAgent([], http_client, self.task_callback)
         self._context_to_conversation: dict[str, str] = {}
         self.user_id = 'test_user'
@@ -109,7 +114,7 @@ class ADKHostManager(ApplicationManager):
         )
         conversation_id = session.id
         c = Conversation(conversation_id=conversation_id, is_active=True)
-        self._conversations.append(c)
+        self._conversations[conversation_id] = c
         return c
 
     def update_api_key(self, api_key: str):
@@ -134,22 +139,16 @@ class ADKHostManager(ApplicationManager):
             # Check if the last event in the conversation was tied to a task.
             if conversation.messages:
                 task_id = conversation.messages[-1].taskId
-                if task_id and task_still_open(
-                    next(
-                        filter(lambda x: x and x.id == task_id, self._tasks),
-                        None,
-                    )
-                ):
+                if task_id and task_still_open(self._tasks.get(task_id)):
                     message.taskId = task_id
         return message
 
     async def process_message(self, message: Message):
         message_id = message.messageId
         if message_id:
-            self._pending_message_ids.append(message_id)
+            self._pending_message_ids[message_id] = None
         context_id = message.contextId
         conversation = self.get_conversation(context_id)
-        self._messages.append(message)
         if conversation:
             conversation.messages.append(message)
         self.add_event(
@@ -214,20 +213,17 @@ class ADKHostManager(ApplicationManager):
             response = await self.adk_content_to_message(
                 final_event.content, context_id, task_id
             )
-            self._messages.append(response)
 
         if conversation and response:
             conversation.messages.append(response)
-        self._pending_message_ids.remove(message_id)
+        self._pending_message_ids.pop(message_id, None)
 
     def add_task(self, task: Task):
-        self._tasks.append(task)
+        self._tasks[task.id] = task
 
     def update_task(self, task: Task):
-        for i, t in enumerate(self._tasks):
-            if t.id == task.id:
-                self._tasks[i] = task
-                return
+        if task.id in self._tasks:
+            self._tasks[task.id] = task
 
     def task_callback(self, task: TaskCallbackArg, agent_card: AgentCard):
         self.emit_event(task, agent_card)
@@ -244,7 +240,7 @@ class ADKHostManager(ApplicationManager):
             self.update_task(current_task)
             return current_task
         # Otherwise this is a Task, either new or updated
-        if not any(filter(lambda x: x and x.id == task.id, self._tasks)):
+        if task.id not in self._tasks:
             self.attach_message_to_task(task.status.message, task.id)
             self.add_task(task)
             return task
@@ -342,9 +338,7 @@ class ADKHostManager(ApplicationManager):
             task_id = event.taskId
         if not task_id:
             task_id = str(uuid.uuid4())
-        current_task = next(
-            filter(lambda x: x.id == task_id, self._tasks), None
-        )
+        current_task = self._tasks.get(task_id)
         if not current_task:
             context_id = event.contextId
             current_task = Task(
@@ -394,29 +388,20 @@ class ADKHostManager(ApplicationManager):
                 del self._artifact_chunks[artifact.artifactId][-1]
 
     def add_event(self, event: Event):
-        self._events[event.id] = event
+        self._events.append(event)
 
     def get_conversation(
         self, conversation_id: str | None
     ) -> Conversation | None:
         if not conversation_id:
             return None
-        return next(
-            filter(
-                lambda c: c and c.conversation_id == conversation_id,
-                self._conversations,
-            ),
-            None,
-        )
+        return self._conversations.get(conversation_id)
 
     def get_pending_messages(self) -> list[tuple[str, str]]:
         rval = []
         for message_id in self._pending_message_ids:
             if message_id in self._task_map:
-                task_id = self._task_map[message_id]
-                task = next(
-                    filter(lambda x: x.id == task_id, self._tasks), None
-                )
+                task = self._tasks.get(self._task_map[message_id])
                 if not task:
                     rval.append((message_id, ''))
                 elif task.history and task.history[-1].parts:
@@ -436,8 +421,8 @@ class ADKHostManager(ApplicationManager):
                 rval.append((message_id, ''))
         return rval
 
-    def register_agent(self, url):
-        agent_data = get_agent_card(url)
+    async def register_agent(self, url):
+        agent_data = await get_agent_card(url, self._http_client)
         if not agent_data.url:
             agent_data.url = url
         self._agents.append(agent_data)
@@ -451,15 +436,31 @@ class ADKHostManager(ApplicationManager):
 
     @property
     def conversations(self) -> list[Conversation]:
-        return self._conversations
+        return list(self._conversations.values())
 
     @property
     def tasks(self) -> list[Task]:
-        return self._tasks
+        return list(self._tasks.values())
 
     @property
     def events(self) -> list[Event]:
-        return sorted(self._events.values(), key=lambda x: x.timestamp)
+        return self._events.since()
+
+    @property
+    def last_event_sequence(self) -> int:
+        return self._events.last_sequence
+
+    @property
+    def event_epoch(self) -> str:
+        return self._events.epoch
+
+    def get_events(
+        self,
+        since: int = 0,
+        limit: int | None = None,
+        conversation_id: str | None = None,
+    ) -> list[Event]:
+        return self._events.since(since, limit, conversation_id)
 
     def adk_content_from_message(self, message: Message) -> types.Content:
         parts: list[types.Part] = []
@@ -617,17 +618,6 @@ class ADKHostManager(ApplicationManager):
             )
         return parts
 
-    def process_message_threadsafe(
-        self, message: Message, loop: asyncio.AbstractEventLoop
-    ):
-        """Safely run process_message from a thread using the given event loop."""
-        future = asyncio.run_coroutine_threadsafe(
-            self.process_message(message), loop
-        )
-        return (
-            future  # You can call future.result() to get the result if needed
-        )
-
 
 def get_message_id(m: Message | None) -> str | None:
     if not m or not m.metadata or 'message_id' not in m.metadata:
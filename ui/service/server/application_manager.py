@@ -19,7 +19,7 @@ class ApplicationManager(ABC):
         pass
 
     @abstractmethod
-    def register_agent(self, url: str):
+    async def register_agent(self, url: str):
         pass
 
     @abstractmethod
@@ -51,3 +51,34 @@ class ApplicationManager(ABC):
     @abstractmethod
     def events(self) -> list[Event]:
         pass
+
+    @property
+    def last_event_sequence(self) -> int:
+        """Sequence number of the last event recorded, 0 if there is none."""
+        return max((e.sequence for e in self.events), default=0)
+
+    @property
+    def event_epoch(self) -> str | None:
+        """Identifies the log the event sequence numbers belong to.
+
+        None if the manager does not tell.
+        """
+        return None
+
+    def get_events(
+        self,
+        since: int = 0,
+        limit: int | None = None,
+        conversation_id: str | None = None,
+    ) -> list[Event]:
+        """Returns the events after sequence number `since`, oldest first."""
+        events = [
+            e
+            for e in self.events
+            if e.sequence > since
+            and (
+                conversation_id is None
+                or (e.content.contextId or '') == conversation_id
+            )
+        ]
+        return events if limit is None else events[:limit]
@@ -0,0 +1,56 @@
+from bisect import bisect_right
+from uuid import uuid4
+
+from service.types import Event
+
+
+class EventLog:
+    """Append-only log of the events shown in the UI.
+
+    Every appended event is given the next sequence number, starting at 1,
+    so events are kept in the order they were recorded and a poller that
+    passes the last sequence number it saw gets only the events added
+    since. Reads cost the number of events returned, not the size of the
+    log. Every log has its own `epoch`, so a poller can tell when the log it
+    holds a sequence number of was replaced.
+    """
+
+    def __init__(self):
+        self.epoch = uuid4().hex
+        self._events: list[Event] = []
+        self._by_conversation: dict[str, list[Event]] = {}
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def last_sequence(self) -> int:
+        return len(self._events)
+
+    def append(self, event: Event) -> Event:
+        event.sequence = len(self._events) + 1
+        self._events.append(event)
+        conversation_id = event.content.contextId or ''
+        self._by_conversation.setdefault(conversation_id, []).append(event)
+        return event
+
+    def since(
+        self,
+        sequence: int = 0,
+        limit: int | None = None,
+        conversation_id: str | None = None,
+    ) -> list[Event]:
+        """Returns up to `limit` events with a sequence number above `sequence`.
+
+        If `conversation_id` is given, only that conversation's events are
+        returned.
+        """
+        if conversation_id is None:
+            events = self._events
+            # Sequence numbers are list positions plus one.
+            start = max(sequence, 0)
+        else:
+            events = self._by_conversation.get(conversation_id, [])
+            start = bisect_right(events, sequence, key=lambda e: e.sequence)
+        end = None if limit is None else start + limit
+        return events[start:end]
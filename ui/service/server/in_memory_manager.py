@@ -194,8 +194,8 @@ class InMemoryFakeAgentManager(ApplicationManager):
             return rval
         return [(x, '') for x in self._pending_message_ids]
 
-    def register_agent(self, url):
-        agent_data = get_agent_card(url)
+    async def register_agent(self, url):
+        agent_data = await get_agent_card(url)
         if not agent_data.url:
             agent_data.url = url
         self._agents.append(agent_data)
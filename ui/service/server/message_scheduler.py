@@ -0,0 +1,125 @@
+import asyncio
+import collections
+import logging
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerSaturatedError(Exception):
+    """Raised when a message is submitted while the queue is full."""
+
+    def __init__(self, depth: int):
+        self.depth = depth
+        super().__init__(f'{depth} messages are already queued')
+
+
+@dataclass
+class SchedulerStats:
+    """Counters describing the messages a MessageScheduler has handled."""
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    max_depth: int = 0
+
+
+class MessageScheduler:
+    """Processes messages as tasks on the server's event loop.
+
+    Messages of a conversation are processed one at a time, in the order
+    they were submitted, while different conversations run concurrently, at
+    most `max_concurrency` of them at once. Messages without a conversation
+    are not ordered. Once `max_queue_depth` messages are queued or being
+    processed, `submit` raises SchedulerSaturatedError instead of queueing
+    more.
+    """
+
+    def __init__(self, max_concurrency: int = 32, max_queue_depth: int = 1000):
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.stats = SchedulerStats()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queues: dict[str, collections.deque] = {}
+        self._runners: set[asyncio.Task] = set()
+        self._depth = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def depth(self) -> int:
+        """Number of messages queued or being processed."""
+        return self._depth
+
+    def submit(
+        self, conversation_id: str | None, process: Callable[[], Awaitable]
+    ):
+        """Queues `process` to run after the conversation's earlier messages.
+
+        Raises:
+            SchedulerSaturatedError: If the queue is full.
+        """
+        if self._depth >= self.max_queue_depth:
+            self.stats.rejected += 1
+            raise SchedulerSaturatedError(self._depth)
+        self.stats.submitted += 1
+        self._depth += 1
+        self.stats.max_depth = max(self.stats.max_depth, self._depth)
+        self._idle.clear()
+        if not conversation_id:
+            self._start(self._run_one(process))
+            return
+        queue = self._queues.get(conversation_id)
+        if queue is not None:
+            # The conversation's runner picks it up after the earlier ones.
+            queue.append(process)
+            return
+        self._queues[conversation_id] = collections.deque([process])
+        self._start(self._run_conversation(conversation_id))
+
+    def _start(self, coro):
+        runner = asyncio.get_running_loop().create_task(coro)
+        self._runners.add(runner)
+        runner.add_done_callback(self._runners.discard)
+
+    async def _run_conversation(self, conversation_id: str):
+        queue = self._queues[conversation_id]
+        try:
+            while queue:
+                await self._run_one(queue[0])
+                queue.popleft()
+        finally:
+            del self._queues[conversation_id]
+
+    async def _run_one(self, process: Callable[[], Awaitable]):
+        try:
+            async with self._semaphore:
+                await process()
+            self.stats.completed += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats.failed += 1
+            logger.exception(f'Error while processing message: {e}')
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                self._idle.set()
+
+    async def join(self):
+        """Waits until every submitted message has been processed."""
+        await self._idle.wait()
+
+    async def close(self):
+        """Cancels the messages still queued or being processed."""
+        runners = list(self._runners)
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+        self._queues.clear()
+        self._depth = 0
+        self._idle.set()
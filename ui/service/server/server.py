@@ -1,19 +1,20 @@
-import asyncio
 import base64
+import json
 import os
-import threading
 import uuid
 
-from typing import cast
-
 import httpx
 
 from a2a.types import FilePart, FileWithUri, Message, Part
 from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
 
 from service.types import (
     CreateConversationResponse,
+    GetEventParams,
     GetEventResponse,
+    JSONRPCError,
     ListAgentResponse,
     ListConversationResponse,
     ListMessageResponse,
@@ -28,6 +29,7 @@ from .adk_host_manager import ADKHostManager, get_message_id
 from .application_manager import ApplicationManager
 from .in_memory_manager import InMemoryFakeAgentManager
 from .mcp_agent_manager import MCPAgentManager
+from .message_scheduler import MessageScheduler, SchedulerSaturatedError
 
 
 class ConversationServer:
@@ -37,7 +39,13 @@ class ConversationServer:
     agents and provide details about the executions.
     """
 
-    def __init__(self, app: FastAPI, http_client: httpx.AsyncClient):
+    def __init__(
+        self,
+        app: FastAPI,
+        http_client: httpx.AsyncClient,
+        max_concurrent_messages: int = 32,
+        max_queued_messages: int = 1000,
+    ):
         agent_manager = os.environ.get('A2A_HOST', 'ADK')
         self.manager: ApplicationManager
 
@@ -63,6 +71,10 @@ class ConversationServer:
             self.manager = InMemoryFakeAgentManager()
         self._file_cache = {}  # dict[str, FilePart] maps file id to message data
         self._message_to_cache = {}  # dict[str, str] maps message id to cache id
+        self._scheduler = MessageScheduler(
+            max_concurrency=max_concurrent_messages,
+            max_queue_depth=max_queued_messages,
+        )
 
         app.add_api_route(
             '/conversation/create', self._create_conversation, methods=['POST']
@@ -103,20 +115,21 @@ class ConversationServer:
         message_data = await request.json()
         message = Message(**message_data['params'])
         message = self.manager.sanitize_message(message)
-        loop = asyncio.get_event_loop()
-        if isinstance(self.manager, (ADKHostManager, MCPAgentManager)):
-            t = threading.Thread(
-                target=lambda: cast(
-                    ADKHostManager, self.manager
-                ).process_message_threadsafe(message, loop)
+        # Every manager processes messages asynchronously, so they run as
+        # tasks on this loop, one at a time per conversation.
+        try:
+            self._scheduler.submit(
+                message.contextId,
+                lambda: self.manager.process_message(message),
             )
-        else:
-            t = threading.Thread(
-                target=lambda: asyncio.run(
-                    self.manager.process_message(message)
-                )
+        except SchedulerSaturatedError as e:
+            return JSONResponse(
+                status_code=429,
+                headers={'Retry-After': '1'},
+                content=SendMessageResponse(
+                    error=JSONRPCError(code=-32000, message=str(e))
+                ).model_dump(mode='json', exclude_none=True),
             )
-        t.start()
         return SendMessageResponse(
             result=MessageInfo(
                 message_id=message.messageId,
@@ -178,8 +191,26 @@ class ConversationServer:
     def _list_conversation(self):
         return ListConversationResponse(result=self.manager.conversations)
 
-    def _get_events(self):
-        return GetEventResponse(result=self.manager.events)
+    async def _get_events(self, request: Request):
+        # Older clients send no params and get every event.
+        body = await request.body()
+        params = (json.loads(body) if body else {}).get('params')
+        try:
+            params = GetEventParams(**params) if params else GetEventParams()
+        except ValidationError as e:
+            return JSONResponse(
+                status_code=400,
+                content=GetEventResponse(
+                    error=JSONRPCError(code=-32602, message=str(e))
+                ).model_dump(mode='json', exclude_none=True),
+            )
+        return GetEventResponse(
+            result=self.manager.get_events(
+                params.since, params.limit, params.conversation_id
+            ),
+            last_sequence=self.manager.last_event_sequence,
+            epoch=self.manager.event_epoch,
+        )
 
     def _list_tasks(self):
         return ListTaskResponse(result=self.manager.tasks)
@@ -187,7 +218,7 @@ class ConversationServer:
     async def _register_agent(self, request: Request):
         message_data = await request.json()
         url = message_data['params']
-        self.manager.register_agent(url)
+        await self.manager.register_agent(url)
         return RegisterAgentResponse()
 
     async def _list_agents(self):
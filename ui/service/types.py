@@ -44,6 +44,8 @@ class Event(BaseModel):
     # TODO: Extend to support internal concepts for models, like function calls.
     content: Message
     timestamp: float
+    # Position in the server's event log, starting at 1.
+    sequence: int = 0
 
 
 class SendMessageRequest(JSONRPCRequest):
@@ -70,12 +72,26 @@ class SendMessageResponse(JSONRPCResponse):
     result: Message | MessageInfo | None = None
 
 
+class GetEventParams(BaseModel):
+    # Only events with a greater sequence number are returned.
+    since: int = Field(default=0, ge=0)
+    limit: int | None = Field(default=None, ge=1)
+    conversation_id: str | None = None
+
+
 class GetEventRequest(JSONRPCRequest):
     method: Literal['events/get'] = 'events/get'
+    params: GetEventParams | None = None
 
 
 class GetEventResponse(JSONRPCResponse):
     result: list[Event] | None = None
+    # Sequence number of the last event the server recorded. A client whose
+    # `since` is greater is talking to a restarted server.
+    last_sequence: int | None = None
+    # Identifies the server's event log. It changes when the server
+    # restarts, and sequence numbers from another epoch do not apply.
+    epoch: str | None = None
 
 
 class ListConversationRequest(JSONRPCRequest):
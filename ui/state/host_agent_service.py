@@ -12,7 +12,9 @@ from service.types import (
     Conversation,
     CreateConversationRequest,
     Event,
+    GetEventParams,
     GetEventRequest,
+    GetEventResponse,
     ListAgentRequest,
     ListConversationRequest,
     ListMessageRequest,
@@ -88,14 +90,31 @@ async def AddRemoteAgent(path: str):
         print('Failed to register the agent', e)
 
 
-async def GetEvents() -> list[Event]:
+async def GetEvents(
+    since: int = 0,
+    limit: int | None = None,
+    conversation_id: str | None = None,
+) -> GetEventResponse:
+    """Gets the events recorded after sequence number `since`.
+
+    The response also carries the sequence number of the last event the
+    server recorded and the epoch of its event log. If the request fails,
+    it has no events and neither of them.
+    """
     client = ConversationClient(server_url)
     try:
-        response = await client.get_events(GetEventRequest())
-        return response.result if response.result else []
+        response = await client.get_events(
+            GetEventRequest(
+                params=GetEventParams(
+                    since=since, limit=limit, conversation_id=conversation_id
+                )
+            )
+        )
+        response.result = response.result or []
+        return response
     except Exception as e:
         print('Failed to get events', e)
-    return []
+    return GetEventResponse(result=[])
 
 
 async def GetProcessingMessages():
@@ -1,67 +1,102 @@
 import unittest
 
-from a2a.types import DataPart, FilePart, TextPart
+import httpx
+
+from a2a.types import (
+    AgentCapabilities,
+    AgentCard,
+    DataPart,
+    FilePart,
+    Message,
+    Part,
+    Role,
+    Task,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
 from google.genai import types
 from service.server.adk_host_manager import ADKHostManager
 
 
-class ADKHostManagerTest(unittest.TestCase):
+class ADKHostManagerTest(unittest.IsolatedAsyncioTestCase):
     """Tests for ADKHostManager class.
 
     This test suite verifies the conversion of ADK content to message format,
-    handling various content types including text, files, data, and function responses.
+    handling various content types including text, files, data, and function responses,
+    and the lookup of tasks, conversations and messages by their IDs.
     """
 
-    def setUp(self) -> None:
-        """Set up test fixtures."""
-        self.manager = ADKHostManager()
+    async def asyncSetUp(self) -> None:
+        """Set up test fixtures.
+
+        The manager is built inside the test's event loop, since its HostAgent
+        looks up the running loop when it is created.
+        """
+        self.manager = ADKHostManager(httpx.AsyncClient())
         self.conversation_id = "test_conversation"
+        self.agent_card = AgentCard(
+            name="test_agent",
+            description="",
+            url="http://agent.test/",
+            version="1.0.0",
+            capabilities=AgentCapabilities(),
+            defaultInputModes=["text"],
+            defaultOutputModes=["text"],
+            skills=[],
+        )
+
+    async def _to_message(self, content: types.Content) -> Message:
+        return await self.manager.adk_content_to_message(
+            content, self.conversation_id, None
+        )
 
-    def test_adk_content_to_message_text(self) -> None:
+    async def test_adk_content_to_message_text(self) -> None:
         """Test converting ADK content with text part to message."""
         part = types.Part()
         part.text = "Hello"
         content = types.Content(parts=[part], role="user")
-        message = self.manager.adk_content_to_message(content, self.conversation_id)
+        message = await self._to_message(content)
         self.assertEqual(len(message.parts), 1, "Message should have exactly one part")
-        self.assertIsInstance(message.parts[0], TextPart, "Part should be a TextPart")
-        self.assertEqual(message.parts[0].text, "Hello", "Text content should match")
+        self.assertIsInstance(message.parts[0].root, TextPart, "Part should be a TextPart")
+        self.assertEqual(message.parts[0].root.text, "Hello", "Text content should match")
         self.assertEqual(message.role, "user", "Role should be preserved")
         self.assertEqual(
-            message.metadata["conversation_id"],
+            message.contextId,
             self.conversation_id,
             "Conversation ID should be preserved",
         )
 
-    def test_adk_content_to_message_file(self):
+    async def test_adk_content_to_message_file(self):
         """Test converting ADK content with file part to message."""
         part = types.Part()
         part.file_data = types.FileData(
             file_uri="gs://test-bucket/test.txt", mime_type="text/plain"
         )
         content = types.Content(parts=[part], role="user")
-        message = self.manager.adk_content_to_message(content, self.conversation_id)
+        message = await self._to_message(content)
         self.assertEqual(len(message.parts), 1)
-        self.assertIsInstance(message.parts[0], FilePart)
-        self.assertEqual(message.parts[0].kind, "file")
-        self.assertEqual(message.parts[0].file.uri, "gs://test-bucket/test.txt")
-        self.assertEqual(message.parts[0].file.mimeType, "text/plain")
+        self.assertIsInstance(message.parts[0].root, FilePart)
+        self.assertEqual(message.parts[0].root.kind, "file")
+        self.assertEqual(message.parts[0].root.file.uri, "gs://test-bucket/test.txt")
+        self.assertEqual(message.parts[0].root.file.mimeType, "text/plain")
         self.assertEqual(message.role, "user")
-        self.assertEqual(message.metadata["conversation_id"], self.conversation_id)
+        self.assertEqual(message.contextId, self.conversation_id)
 
-    def test_adk_content_to_message_data(self):
+    async def test_adk_content_to_message_data(self):
         """Test converting ADK content with data part to message."""
         part = types.Part()
         part.text = '{"key": "value"}'
         content = types.Content(parts=[part], role="user")
-        message = self.manager.adk_content_to_message(content, self.conversation_id)
+        message = await self._to_message(content)
         self.assertEqual(len(message.parts), 1)
-        self.assertIsInstance(message.parts[0], DataPart)
-        self.assertEqual(message.parts[0].data, {"key": "value"})
+        self.assertIsInstance(message.parts[0].root, DataPart)
+        self.assertEqual(message.parts[0].root.data, {"key": "value"})
         self.assertEqual(message.role, "user")
-        self.assertEqual(message.metadata["conversation_id"], self.conversation_id)
+        self.assertEqual(message.contextId, self.conversation_id)
 
-    def test_adk_content_to_message_function_response(self):
+    async def test_adk_content_to_message_function_response(self):
         """Test converting ADK content with function response to message."""
         part = types.Part()
         part.function_response = types.FunctionResponse(
@@ -69,42 +104,42 @@ class ADKHostManagerTest(unittest.TestCase):
             response={"result": [{"kind": "text", "text": "Hello"}]},
         )
         content = types.Content(parts=[part], role="user")
-        message = self.manager.adk_content_to_message(content, self.conversation_id)
+        message = await self._to_message(content)
         self.assertEqual(len(message.parts), 1)
-        self.assertIsInstance(message.parts[0], DataPart)
-        self.assertEqual(message.parts[0].data, {"kind": "text", "text": "Hello"})
+        self.assertIsInstance(message.parts[0].root, DataPart)
+        self.assertEqual(message.parts[0].root.data, {"kind": "text", "text": "Hello"})
         self.assertEqual(message.role, "user")
-        self.assertEqual(message.metadata["conversation_id"], self.conversation_id)
+        self.assertEqual(message.contextId, self.conversation_id)
 
-    def test_adk_content_to_message_function_response_error(self):
+    async def test_adk_content_to_message_function_response_error(self):
         """Test error handling when converting function response to message."""
         part = types.Part()
         part.function_response = types.FunctionResponse(
             name="test_function", response={"result": None}
         )
         content = types.Content(parts=[part], role="user")
-        message = self.manager.adk_content_to_message(content, self.conversation_id)
+        message = await self._to_message(content)
         self.assertEqual(len(message.parts), 1)
-        self.assertIsInstance(message.parts[0], DataPart)
+        self.assertIsInstance(message.parts[0].root, DataPart)
         self.assertEqual(message.role, "user")
-        self.assertEqual(message.metadata["conversation_id"], self.conversation_id)
+        self.assertEqual(message.contextId, self.conversation_id)
 
-    def test_adk_content_to_message_empty_parts(self):
+    async def test_adk_content_to_message_empty_parts(self):
         """Test converting ADK content with empty parts to message."""
         content = types.Content(parts=[], role="user")
-        message = self.manager.adk_content_to_message(content, self.conversation_id)
+        message = await self._to_message(content)
         self.assertEqual(len(message.parts), 0)
         self.assertEqual(message.role, "user")
-        self.assertEqual(message.metadata["conversation_id"], self.conversation_id)
+        self.assertEqual(message.contextId, self.conversation_id)
 
-    def test_adk_content_to_message_unknown_type(self):
+    async def test_adk_content_to_message_unknown_type(self):
         """Test handling unknown content type in ADK content."""
         part = types.Part()
         content = types.Content(parts=[part], role="user")
         with self.assertRaisesRegex(ValueError, "Unexpected content, unknown type"):
-            self.manager.adk_content_to_message(content, self.conversation_id)
+            await self._to_message(content)
 
-    def test_adk_content_to_message_multiple_files(self) -> None:
+    async def test_adk_content_to_message_multiple_files(self) -> None:
         """Test converting ADK content with multiple file parts to message."""
         file1 = types.Part()
         file1.file_data = types.FileData(
@@ -117,18 +152,18 @@ class ADKHostManagerTest(unittest.TestCase):
         )
 
         content = types.Content(parts=[file1, file2], role="user")
-        message = self.manager.adk_content_to_message(content, self.conversation_id)
+        message = await self._to_message(content)
         self.assertEqual(len(message.parts), 2, "Message should have two parts")
         self.assertIsInstance(
-            message.parts[0], FilePart, "First part should be a FilePart"
+            message.parts[0].root, FilePart, "First part should be a FilePart"
         )
         self.assertIsInstance(
-            message.parts[1], FilePart, "Second part should be a FilePart"
+            message.parts[1].root, FilePart, "Second part should be a FilePart"
         )
-        self.assertEqual(message.parts[0].file.uri, "gs://test-bucket/file1.txt")
-        self.assertEqual(message.parts[1].file.uri, "gs://test-bucket/file2.jpg")
+        self.assertEqual(message.parts[0].root.file.uri, "gs://test-bucket/file1.txt")
+        self.assertEqual(message.parts[1].root.file.uri, "gs://test-bucket/file2.jpg")
 
-    def test_adk_content_to_message_mixed_content(self) -> None:
+    async def test_adk_content_to_message_mixed_content(self) -> None:
         """Test converting ADK content with mixed content types to message."""
         text_part = types.Part()
         text_part.text = "Hello"
@@ -142,17 +177,154 @@ class ADKHostManagerTest(unittest.TestCase):
         data_part.text = '{"key": "value"}'
 
         content = types.Content(parts=[text_part, file_part, data_part], role="user")
-        message = self.manager.adk_content_to_message(content, self.conversation_id)
+        message = await self._to_message(content)
         self.assertEqual(len(message.parts), 3, "Message should have three parts")
         self.assertIsInstance(
-            message.parts[0], TextPart, "First part should be TextPart"
+            message.parts[0].root, TextPart, "First part should be TextPart"
         )
         self.assertIsInstance(
-            message.parts[1], FilePart, "Second part should be FilePart"
+            message.parts[1].root, FilePart, "Second part should be FilePart"
         )
         self.assertIsInstance(
-            message.parts[2], DataPart, "Third part should be DataPart"
+            message.parts[2].root, DataPart, "Third part should be DataPart"
+        )
+
+    def _status_update(
+        self, task_id: str, state: TaskState, message_id: str, text: str
+    ) -> TaskStatusUpdateEvent:
+        return TaskStatusUpdateEvent(
+            taskId=task_id,
+            contextId=self.conversation_id,
+            final=False,
+            status=TaskStatus(
+                state=state,
+                message=Message(
+                    role=Role.agent,
+                    parts=[Part(root=TextPart(text=text))],
+                    messageId=message_id,
+                    taskId=task_id,
+                    contextId=self.conversation_id,
+                ),
+            ),
+        )
+
+    async def test_tasks_are_found_by_id_and_keep_their_order(self) -> None:
+        """Test that task updates find their task without reordering."""
+        for task_id in ["t1", "t2", "t3"]:
+            self.manager.task_callback(
+                Task(
+                    id=task_id,
+                    contextId=self.conversation_id,
+                    status=TaskStatus(state=TaskState.submitted),
+                ),
+                self.agent_card,
+            )
+
+        updated = self.manager.task_callback(
+            self._status_update("t2", TaskState.working, "m1", "Working"),
+            self.agent_card,
+        )
+
+        self.assertEqual([t.id for t in self.manager.tasks], ["t1", "t2", "t3"])
+        self.assertIs(self.manager.tasks[1], updated)
+        self.assertEqual(updated.status.state, TaskState.working)
+        self.assertIs(self.manager.add_or_get_task(updated), updated)
+
+        # An update for an unknown task adds it at the end.
+        self.manager.task_callback(
+            self._status_update("t4", TaskState.working, "m2", "Working"),
+            self.agent_card,
+        )
+        self.assertEqual(self.manager.tasks[-1].id, "t4")
+        self.assertEqual(len(self.manager.tasks), 4)
+
+    async def test_conversations_are_found_by_id_and_keep_their_order(
+        self,
+    ) -> None:
+        """Test conversation lookup and the order of the conversation list."""
+        created = [await self.manager.create_conversation() for _ in range(3)]
+
+        self.assertEqual(
+            [c.conversation_id for c in self.manager.conversations],
+            [c.conversation_id for c in created],
+        )
+        for conversation in created:
+            self.assertIs(
+                self.manager.get_conversation(conversation.conversation_id),
+                conversation,
+            )
+        self.assertIsNone(self.manager.get_conversation("missing"))
+        self.assertIsNone(self.manager.get_conversation(None))
+
+    async def test_pending_messages_are_found_by_message_id(self) -> None:
+        """Test that pending messages report the progress of their task."""
+        self.manager._pending_message_ids["m1"] = None
+        self.manager._pending_message_ids["unknown"] = None
+
+        self.manager.task_callback(
+            self._status_update("t1", TaskState.working, "m1", "Started"),
+            self.agent_card,
+        )
+        self.assertEqual(
+            self.manager.get_pending_messages(),
+            [("m1", "Working..."), ("unknown", "")],
+        )
+
+        self.manager.task_callback(
+            self._status_update("t1", TaskState.working, "m2", "Halfway"),
+            self.agent_card,
+        )
+        self.assertEqual(
+            self.manager.get_pending_messages()[0], ("m1", "Halfway")
+        )
+
+    async def test_new_messages_join_the_open_task_of_their_conversation(
+        self,
+    ) -> None:
+        """Test that sanitize_message finds the open task by its ID."""
+        conversation = await self.manager.create_conversation()
+        self.conversation_id = conversation.conversation_id
+        task = self.manager.task_callback(
+            self._status_update("t1", TaskState.input_required, "m1", "?"),
+            self.agent_card,
+        )
+        conversation.messages.append(task.status.message)
+
+        message = self.manager.sanitize_message(
+            Message(
+                role=Role.user,
+                parts=[Part(root=TextPart(text="Answer"))],
+                messageId="m2",
+                contextId=conversation.conversation_id,
+            )
+        )
+        self.assertEqual(message.taskId, "t1")
+
+        task.status.state = TaskState.completed
+        message.taskId = None
+        self.assertIsNone(self.manager.sanitize_message(message).taskId)
+
+    async def test_last_event_sequence_tells_clients_to_start_over(
+        self,
+    ) -> None:
+        """Test that a cursor past the last event can be detected."""
+        self.assertEqual(self.manager.last_event_sequence, 0)
+        for task_id in ["t1", "t2"]:
+            self.manager.task_callback(
+                self._status_update(task_id, TaskState.working, task_id, "."),
+                self.agent_card,
+            )
+
+        self.assertEqual(self.manager.last_event_sequence, 2)
+        self.assertEqual(
+            [e.sequence for e in self.manager.get_events(1)], [2]
         )
+        # A client that saw more events was talking to an earlier server.
+        self.assertEqual(self.manager.get_events(5), [])
+        self.assertLess(self.manager.last_event_sequence, 5)
+        # Even one that saw fewer events can tell by the epoch.
+        restarted = ADKHostManager(httpx.AsyncClient())
+        self.assertNotEqual(restarted.event_epoch, self.manager.event_epoch)
 
 
 if __name__ == "__main__":
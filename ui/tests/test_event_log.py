@@ -0,0 +1,77 @@
+import unittest
+
+from a2a.types import Message, Part, Role, TextPart
+from pydantic import ValidationError
+from service.server.event_log import EventLog
+from service.types import Event, GetEventParams
+
+
+def make_event(i: int, conversation_id: str) -> Event:
+    return Event(
+        id=f'event-{i}',
+        actor='host',
+        content=Message(
+            parts=[Part(root=TextPart(text=str(i)))],
+            role=Role.agent,
+            messageId=f'message-{i}',
+            contextId=conversation_id,
+        ),
+        timestamp=float(i),
+    )
+
+
+class EventLogTest(unittest.TestCase):
+    """Tests for EventLog class."""
+
+    def setUp(self) -> None:
+        """Set up a log with events from two conversations."""
+        self.log = EventLog()
+        for i in range(10):
+            self.log.append(make_event(i, 'a' if i % 2 else 'b'))
+
+    def test_assigns_sequence_numbers(self):
+        """Events are numbered from 1 in the order they were appended."""
+        self.assertEqual(
+            [e.sequence for e in self.log.since()], list(range(1, 11))
+        )
+        self.assertEqual(self.log.last_sequence, 10)
+
+    def test_since_and_limit(self):
+        """Only events after `since` are returned, at most `limit` of them."""
+        self.assertEqual([e.sequence for e in self.log.since(7)], [8, 9, 10])
+        self.assertEqual(
+            [e.sequence for e in self.log.since(2, limit=3)], [3, 4, 5]
+        )
+        self.assertEqual(self.log.since(10), [])
+
+    def test_conversation_filter(self):
+        """Events can be restricted to one conversation."""
+        self.assertEqual(
+            [e.sequence for e in self.log.since(3, conversation_id='a')],
+            [4, 6, 8, 10],
+        )
+        self.assertEqual(
+            [
+                e.sequence
+                for e in self.log.since(0, limit=2, conversation_id='b')
+            ],
+            [1, 3],
+        )
+        self.assertEqual(self.log.since(conversation_id='missing'), [])
+
+    def test_each_log_has_its_own_epoch(self):
+        """A new log, as after a restart, cannot be mistaken for this one."""
+        self.assertTrue(self.log.epoch)
+        self.assertNotEqual(EventLog().epoch, self.log.epoch)
+
+    def test_params_are_bounded(self):
+        """Negative cursors and empty pages are rejected."""
+        with self.assertRaises(ValidationError):
+            GetEventParams(since=-1)
+        with self.assertRaises(ValidationError):
+            GetEventParams(limit=0)
+        self.assertEqual(GetEventParams(limit=1).since, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
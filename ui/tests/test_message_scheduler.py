@@ -0,0 +1,97 @@
+import asyncio
+import unittest
+
+from service.server.message_scheduler import (
+    MessageScheduler,
+    SchedulerSaturatedError,
+)
+
+
+class MessageSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    """Tests for MessageScheduler class."""
+
+    async def test_orders_messages_of_a_conversation(self):
+        """Messages of one conversation are processed in submission order."""
+        scheduler = MessageScheduler()
+        processed = []
+
+        def process(conversation_id, i):
+            async def run():
+                await asyncio.sleep(0.01 * (5 - i))
+                processed.append((conversation_id, i))
+
+            return run
+
+        for i in range(5):
+            for conversation_id in ('a', 'b'):
+                scheduler.submit(conversation_id, process(conversation_id, i))
+        await scheduler.join()
+
+        for conversation_id in ('a', 'b'):
+            self.assertEqual(
+                [i for c, i in processed if c == conversation_id],
+                list(range(5)),
+            )
+        self.assertEqual(scheduler.stats.completed, 10)
+
+    async def test_limits_concurrency(self):
+        """No more than max_concurrency messages are processed at once."""
+        scheduler = MessageScheduler(max_concurrency=3)
+        running = 0
+        peak = 0
+
+        async def process():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        for i in range(10):
+            scheduler.submit(f'conversation-{i}', process)
+        await scheduler.join()
+
+        self.assertEqual(peak, 3)
+
+    async def test_rejects_when_saturated(self):
+        """Messages beyond max_queue_depth are rejected until some finish."""
+        scheduler = MessageScheduler(max_queue_depth=2)
+        release = asyncio.Event()
+
+        async def process():
+            await release.wait()
+
+        scheduler.submit('a', process)
+        scheduler.submit(None, process)
+        with self.assertRaises(SchedulerSaturatedError):
+            scheduler.submit('b', process)
+        self.assertEqual(scheduler.stats.rejected, 1)
+
+        release.set()
+        await scheduler.join()
+        scheduler.submit('b', process)
+        await scheduler.join()
+        self.assertEqual(scheduler.depth, 0)
+
+    async def test_failure_does_not_block_conversation(self):
+        """A message that fails does not stop the ones queued after it."""
+        scheduler = MessageScheduler()
+        processed = []
+
+        async def fail():
+            raise ValueError('boom')
+
+        async def succeed():
+            processed.append('ok')
+
+        with self.assertLogs('service.server.message_scheduler'):
+            scheduler.submit('a', fail)
+            scheduler.submit('a', succeed)
+            await scheduler.join()
+
+        self.assertEqual(processed, ['ok'])
+        self.assertEqual(scheduler.stats.failed, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,19 @@
-import requests
+import httpx
 
 from a2a.types import AgentCard
 
+from utils.card_cache import AgentCardCache
 
-def get_agent_card(remote_agent_address: str) -> AgentCard:
-    """Get the agent card."""
+
+_card_cache = AgentCardCache(AgentCard.model_validate_json)
+
+
+async def get_agent_card(
+    remote_agent_address: str, httpx_client: httpx.AsyncClient | None = None
+) -> AgentCard:
+    """Get the agent card, from the cache when it is still valid."""
     if not remote_agent_address.startswith(('http://', 'https://')):
         remote_agent_address = 'http://' + remote_agent_address
-    agent_card = requests.get(f'{remote_agent_address}/.well-known/agent.json')
-    return AgentCard(**agent_card.json())
+    return await _card_cache.get(
+        f'{remote_agent_address}/.well-known/agent.json', httpx_client
+    )